@@ -0,0 +1,152 @@
+import asyncio
+import logging
+from typing import Any, NamedTuple
+from urllib.parse import urlencode, urlsplit
+
+from fastapi import Request
+from starlette.routing import Match
+from starlette.types import Message
+
+from app.core.cache import encode_json
+from app.core.config import get_settings
+from app.core.observability import request_id_ctx
+from app.schemas.common import ErrorResponse
+
+logger = logging.getLogger("app.batch")
+
+# Headers of the batch request that sub-requests do not inherit: the body framing belongs to
+# the batch itself, and sub-responses must come back uncompressed and unconditional unless
+# the item asks otherwise.
+_SKIPPED_HEADERS = {b"content-length", b"content-type", b"transfer-encoding", b"accept-encoding", b"if-none-match"}
+
+
+class _NonJSONResponse(Exception):
+    """Raised from the sub-request ``send`` to abort a response that cannot be spliced into the batch."""
+
+
+class SubResponse(NamedTuple):
+    status_code: int
+    body: bytes
+    media_type: str | None = None
+    etag: str | None = None
+
+
+def _query_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def build_query_string(path: str, params: dict[str, Any]) -> tuple[str, str]:
+    """Splits ``path`` and merges its query string with ``params`` (lists repeat the parameter)."""
+    parts = urlsplit(path)
+    pairs: list[tuple[str, str]] = []
+    for name, value in params.items():
+        values = value if isinstance(value, list) else [value]
+        pairs.extend((name, _query_value(item)) for item in values)
+    query = "&".join(part for part in (parts.query, urlencode(pairs)) if part)
+    return parts.path, query
+
+
+def _error_response(request: Request, status_code: int, detail: str, code: str) -> SubResponse:
+    request_id = getattr(request.state, "request_id", request_id_ctx.get("-"))
+    body = encode_json(ErrorResponse(detail=detail, request_id=request_id, code=code).model_dump(mode="json"))
+    return SubResponse(status_code=status_code, body=body, media_type="application/json")
+
+
+async def dispatch_get(request: Request, path: str, params: dict[str, Any], headers: dict[str, str]) -> SubResponse:
+    """Runs ``GET <api prefix><path>`` in-process through the matched route of ``request.app``.
+
+    The route's own dependencies (authentication, scopes, validation) and handler run as usual,
+    and errors go through the application's exception handlers; only the middleware stack is
+    skipped, since the batch request already went through it. Each sub-request still counts
+    against the client's rate limit (429 once exhausted), and routes answering with anything
+    but JSON, such as ``/costs/entries/export``, are aborted with a 400.
+    """
+    route_path, query = build_query_string(path, params)
+    full_path = get_settings().api_v1_prefix + route_path
+    forwarded = [(name, value) for name, value in request.scope["headers"] if name not in _SKIPPED_HEADERS]
+    overrides = {name.lower().encode("latin-1"): value.encode("latin-1") for name, value in headers.items()}
+    # Bodies are spliced into the batch response as JSON, so they cannot be content-coded.
+    overrides = {name: value for name, value in overrides.items() if name == b"if-none-match" or name not in _SKIPPED_HEADERS}
+    forwarded = [(name, value) for name, value in forwarded if name not in overrides] + list(overrides.items())
+    scope: dict[str, Any] = {
+        **{key: value for key, value in request.scope.items() if key not in ("endpoint", "route", "path_params")},
+        "method": "GET",
+        "path": full_path,
+        "raw_path": full_path.encode("utf-8"),
+        "query_string": query.encode("latin-1"),
+        "headers": forwarded,
+        "state": dict(request.scope.get("state", {})),
+    }
+
+    limiter = getattr(request.state, "rate_limiter", None)
+    if limiter is not None:
+        allowed, reset_after = limiter.charge(request)
+        if not allowed:
+            return _error_response(request, 429, f"Rate limit exceeded, retry after {reset_after}s", "rate_limited")
+
+    route = None
+    method_mismatch = False
+    for candidate in request.app.router.routes:
+        match, child_scope = candidate.matches(scope)
+        if match == Match.FULL:
+            route = candidate
+            scope.update(child_scope)
+            break
+        method_mismatch = method_mismatch or match == Match.PARTIAL
+    if route is None:
+        if method_mismatch:
+            return _error_response(request, 405, "Only GET routes can be batched", "method_not_allowed")
+        return _error_response(request, 404, "Not Found", "http_error")
+
+    status_code = 500
+    response_headers: dict[str, str] = {}
+    chunks: list[bytes] = []
+    body_sent = False
+    rejected_media_type: str | None = None
+
+    async def receive() -> Message:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Nothing else will arrive; streaming responses wait here until they finish.
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status_code, rejected_media_type
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            response_headers.update((name.decode("latin-1").lower(), value.decode("latin-1")) for name, value in message.get("headers", []))
+            media_type = response_headers.get("content-type", "").split(";")[0].strip()
+            if media_type and media_type != "application/json":
+                # Exports and other streamed bodies would be buffered whole; abort before the first chunk.
+                rejected_media_type = media_type
+                raise _NonJSONResponse(media_type)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await route.handle(scope, receive, send)
+    except Exception as exc:
+        if rejected_media_type is not None:
+            return _error_response(request, 400, f"Only JSON routes can be batched, not {rejected_media_type}", "not_batchable")
+        logger.exception("Unhandled error in batch sub-request %s: %s", full_path, exc)
+        return _error_response(request, 500, "Internal server error", "internal_error")
+
+    media_type = response_headers.get("content-type", "").split(";")[0].strip() or None
+    return SubResponse(status_code=status_code, body=b"".join(chunks), media_type=media_type, etag=response_headers.get("etag"))
+
+
+def encode_batch_result(item_id: str | None, response: SubResponse) -> bytes:
+    """One ``BatchResultItem`` as JSON, splicing a JSON sub-response body in without re-parsing it."""
+    if not response.body:
+        body = b"null"
+    elif response.media_type == "application/json":
+        body = response.body
+    else:
+        body = encode_json(response.body.decode("utf-8", errors="replace"))
+    head = encode_json({"id": item_id, "status": response.status_code, "etag": response.etag})
+    return head[:-1] + b',"body":' + body + b"}"
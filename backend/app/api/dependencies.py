@@ -1,11 +1,12 @@
 from functools import lru_cache
 from datetime import date
 
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import HTTPException, Request, status
 
 from app.core.config import get_settings
 from app.core.security import ApiKeyAuthorizer, ApiPrincipal
 from app.schemas.costs import CostFilters
+from app.schemas.ingestion import IngestionFormat
 
 VALID_GROUPS: set[str] = {"month", "cost_center", "project", "category"}
 MAX_FILTER_IDS = 200
@@ -56,23 +57,32 @@ def validate_group_by(group_by: list[str]) -> list[str]:
     return list(dict.fromkeys(group_by))
 
 
+def resolve_ingestion_format(explicit: IngestionFormat | None, content_type: str | None) -> IngestionFormat:
+    if explicit:
+        return explicit
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/jsonlines"}:
+        return "ndjson"
+    if media_type in {"text/csv", "application/csv", ""}:
+        return "csv"
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Send text/csv or application/x-ndjson, or set the format query parameter",
+    )
+
+
 @lru_cache
 def get_api_authorizer() -> ApiKeyAuthorizer:
     return ApiKeyAuthorizer(get_settings())
 
 
-def require_api_key(
-    request: Request,
-    authorizer: ApiKeyAuthorizer = Depends(get_api_authorizer),
-) -> ApiPrincipal:
-    return authorizer.authenticate(request)
+async def require_api_key(request: Request) -> ApiPrincipal:
+    return get_api_authorizer().authenticate(request)
 
 
 def require_scope(scope: str):
-    def dependency(
-        request: Request,
-        authorizer: ApiKeyAuthorizer = Depends(get_api_authorizer),
-    ) -> ApiPrincipal:
-        return authorizer.require_scope(request, scope)
+    # Async dependency: a plain ``def`` would be dispatched to the threadpool on every request.
+    async def dependency(request: Request) -> ApiPrincipal:
+        return get_api_authorizer().require_scope(request, scope)
 
     return dependency
@@ -0,0 +1,65 @@
+from collections.abc import Awaitable, Callable
+from hashlib import blake2b
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.core.cache import cache
+from app.core.compression import accepts_coding
+from app.core.config import get_settings
+
+
+def entity_tag(key: str) -> str:
+    """Strong ETag of a cached payload: the key hashes the request parameters and data generations."""
+    return f'"{blake2b(key.encode("utf-8"), digest_size=16).hexdigest()}"'
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    """``If-None-Match`` check (weak comparison, as RFC 9110 requires); ignores coding suffixes."""
+    if not if_none_match:
+        return False
+    opaque = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/").strip('"')
+        if candidate == "*" or candidate == opaque or candidate.startswith(f"{opaque}-"):
+            return True
+    return False
+
+
+async def cached_json_response(request: Request, key: str, loader: Callable[[], Awaitable[Any]]) -> Response | Any:
+    """Cached payload of a GET route; ``loader`` must return JSON-ready data (``model_dump(mode="json")``).
+
+    With ``CACHE_RAW_RESPONSES`` the cached JSON bytes go out as a raw ``Response``: FastAPI skips
+    ``response_model`` validation and serialization, which otherwise dominate a cache hit. A
+    compressed entry is sent as stored with its ``Content-Encoding`` when the client accepts it
+    (``GZipMiddleware`` passes such responses through); otherwise it is decompressed and left to
+    the middleware.
+
+    Raw responses carry ``Cache-Control: HTTP_CACHE_CONTROL`` and, while Redis holds the data
+    generations, an ETag derived from ``key``. A matching ``If-None-Match`` is answered with
+    ``304`` before the cache or the database is consulted.
+    """
+    settings = get_settings()
+    if not settings.cache_raw_responses:
+        return await cache.get_or_set_json(key, loader)
+    headers = {"Vary": "Accept-Encoding"}
+    if settings.http_cache_control:
+        headers["Cache-Control"] = settings.http_cache_control
+    # Without Redis, generations are per process and out-of-process ingestion would go unnoticed.
+    etag = entity_tag(key) if settings.http_etags_enabled and cache.enabled else None
+    if etag is not None:
+        headers["ETag"] = etag
+        if _matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+    cached = await cache.get_or_set_body(key, loader)
+    if cached.encoding is None:
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+    if accepts_coding(request.headers.get("accept-encoding"), cached.encoding):
+        headers["Content-Encoding"] = cached.encoding
+        if etag is not None:
+            # Each content coding is a distinct representation and needs its own strong validator.
+            headers["ETag"] = f'{etag[:-1]}-{cached.encoding}"'
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+    return Response(content=cached.decoded(), media_type="application/json", headers=headers)
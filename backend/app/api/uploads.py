@@ -0,0 +1,70 @@
+import asyncio
+import io
+from collections.abc import Callable
+from contextlib import suppress
+from typing import IO, TypeVar
+
+import anyio
+import anyio.from_thread
+from anyio.streams.memory import MemoryObjectReceiveStream
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+
+T = TypeVar("T")
+
+
+class RequestBodyReader(io.RawIOBase):
+    """Blocking file over request body chunks, read from a worker thread as the event loop receives them."""
+
+    def __init__(self, chunks: MemoryObjectReceiveStream[bytes]) -> None:
+        self._chunks = chunks
+        self._pending = memoryview(b"")
+        self._eof = False
+        self.error: BaseException | None = None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        while not self._pending and not self._eof:
+            try:
+                self._pending = memoryview(anyio.from_thread.run(self._chunks.receive))
+            except anyio.EndOfStream:
+                self._eof = True
+        if not self._pending and self.error is not None:
+            # A truncated body must not reach the parser as a clean end of file.
+            raise self.error
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+async def run_with_request_body(request: Request, work: Callable[[IO[bytes]], T], buffered_chunks: int) -> T:
+    """Runs ``work`` on the threadpool with a file that yields the request body as it arrives.
+
+    At most ``buffered_chunks`` received chunks wait for the reader, so a slow consumer pauses the
+    upload instead of buffering it. If the client disconnects, the reader raises instead of
+    returning end of file.
+    """
+    send, receive = anyio.create_memory_object_stream[bytes](max_buffer_size=buffered_chunks)
+    body = RequestBodyReader(receive)
+
+    async def pump() -> None:
+        async with send:
+            try:
+                async for chunk in request.stream():
+                    if chunk:
+                        await send.send(chunk)
+            except Exception as exc:
+                body.error = exc
+
+    pump_task = asyncio.create_task(pump())
+    try:
+        with receive, io.BufferedReader(body) as stream:
+            return await run_in_threadpool(work, stream)
+    finally:
+        # ``work`` may stop early (e.g. a rejected header); drop the rest of the body.
+        pump_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await pump_task
@@ -1,3 +1,11 @@
-from app.api.v1 import routes_analytics, routes_budgets, routes_costs, routes_simulations
+from app.api.v1 import routes_analytics, routes_batch, routes_budgets, routes_cache, routes_costs, routes_dashboard, routes_simulations
 
-__all__ = ["routes_analytics", "routes_budgets", "routes_costs", "routes_simulations"]
+__all__ = [
+    "routes_analytics",
+    "routes_batch",
+    "routes_budgets",
+    "routes_cache",
+    "routes_costs",
+    "routes_dashboard",
+    "routes_simulations",
+]
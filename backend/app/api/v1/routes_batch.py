@@ -0,0 +1,46 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, Request, Response
+
+from app.api.batch import dispatch_get, encode_batch_result
+from app.api.dependencies import require_api_key
+from app.core.config import get_settings
+from app.core.exceptions import DomainValidationError
+from app.repositories import repository_memo
+from app.schemas.batch import BatchRequest, BatchResponse, BatchSubRequest
+from app.schemas.common import ErrorResponse
+
+ERROR_RESPONSES = {
+    401: {"model": ErrorResponse, "description": "Missing/invalid API key"},
+    422: {"model": ErrorResponse, "description": "Validation error"},
+    500: {"model": ErrorResponse, "description": "Internal server error"},
+}
+
+router = APIRouter(tags=["batch"])
+
+
+@router.post("/batch", response_model=BatchResponse, responses=ERROR_RESPONSES)
+async def run_batch(
+    request: Request,
+    payload: BatchRequest,
+    _auth=Depends(require_api_key),
+) -> BatchResponse | Response:
+    settings = get_settings()
+    if len(payload.requests) > settings.batch_max_requests:
+        raise DomainValidationError(
+            f"A batch accepts at most {settings.batch_max_requests} requests.",
+            details={"requests": len(payload.requests)},
+        )
+
+    semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+
+    async def run(item: BatchSubRequest) -> bytes:
+        async with semaphore:
+            response = await dispatch_get(request, item.path, item.params, item.headers)
+        return encode_batch_result(item.id, response)
+
+    # Sub-requests check their own scopes and each goes through RedisCache; tasks inherit the
+    # repository memo, so a query shared by several of them runs once.
+    with repository_memo():
+        results = await asyncio.gather(*(run(item) for item in payload.requests))
+    return Response(content=b'{"results":[' + b",".join(results) + b"]}", media_type="application/json")
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 from datetime import date
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import build_cost_filters, require_scope
+from app.api.responses import cached_json_response
 from app.core.cache import cache
-from app.db.session import get_db
+from app.db.session import DatabaseRunner, get_read_db_runner
 from app.repositories import CostRepository
 from app.schemas.budgets import BudgetVarianceResponse
 from app.schemas.common import ErrorResponse
@@ -24,16 +25,17 @@ router = APIRouter(tags=["budgets"])
 
 
 @router.get("/budgets/variance", response_model=BudgetVarianceResponse, responses=ERROR_RESPONSES)
-def get_budget_variance(
+async def get_budget_variance(
+    request: Request,
     start_date: date = Query(...),
     end_date: date = Query(...),
     cost_center_ids: list[int] | None = Query(default=None),
     tolerance_percent: float = Query(default=3.0, ge=0.0, le=30.0),
     include_on_track: bool = Query(default=True),
     top_n: int | None = Query(default=None, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: DatabaseRunner = Depends(get_read_db_runner),
     _auth=Depends(require_scope("budgets:read")),
-) -> BudgetVarianceResponse | dict:
+) -> BudgetVarianceResponse | Response | dict:
     filters = build_cost_filters(
         start_date=start_date,
         end_date=end_date,
@@ -41,8 +43,9 @@ def get_budget_variance(
         project_ids=None,
         category_ids=None,
     )
-    key = cache.build_key(
+    key = await cache.build_versioned_key(
         "budgets:variance",
+        ("budgets", "costs", "dimensions"),
         start_date=start_date.isoformat(),
         end_date=end_date.isoformat(),
         cost_center_ids=filters.cost_center_ids,
@@ -51,16 +54,18 @@ def get_budget_variance(
         top_n=top_n,
     )
 
-    def loader() -> dict:
-        service = BudgetService(CostRepository(db))
-        response = service.variance_by_center(
-            period_start=start_date,
-            period_end=end_date,
-            cost_center_ids=filters.cost_center_ids,
+    def fetch(session: Session) -> list[dict]:
+        return BudgetService(CostRepository(session)).variance_rows(start_date, end_date, filters.cost_center_ids)
+
+    def build(rows: list[dict]) -> dict:
+        response = BudgetService().variance_from_rows(
+            start_date,
+            end_date,
+            rows,
             tolerance_percent=tolerance_percent,
             include_on_track=include_on_track,
             top_n=top_n,
         )
         return response.model_dump(mode="json")
 
-    return cache.get_or_set_json(key, loader)
+    return await cached_json_response(request, key, lambda: db.run(fetch, build))
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import require_scope
+from app.core.cache import cache
+from app.schemas.cache import CacheInvalidationRequest, CacheInvalidationResponse
+from app.schemas.common import ErrorResponse
+
+ERROR_RESPONSES = {
+    401: {"model": ErrorResponse, "description": "Missing/invalid API key"},
+    403: {"model": ErrorResponse, "description": "Insufficient scope"},
+    422: {"model": ErrorResponse, "description": "Validation error"},
+    500: {"model": ErrorResponse, "description": "Internal server error"},
+}
+
+router = APIRouter(tags=["cache"])
+
+
+@router.post("/cache/invalidate", response_model=CacheInvalidationResponse, responses=ERROR_RESPONSES)
+async def invalidate_cache(
+    payload: CacheInvalidationRequest,
+    _auth=Depends(require_scope("cache:admin")),
+) -> CacheInvalidationResponse:
+    generations = await cache.bump_generations(*dict.fromkeys(payload.domains))
+    return CacheInvalidationResponse(generations=generations)
@@ -1,16 +1,23 @@
+from collections.abc import Iterator
 from datetime import date
 from typing import cast
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.api.dependencies import build_cost_filters, require_scope, validate_group_by
+from app.api.dependencies import build_cost_filters, require_scope, resolve_ingestion_format, validate_group_by
+from app.api.responses import cached_json_response
+from app.api.uploads import run_with_request_body
 from app.core.cache import cache
-from app.db.session import get_db
-from app.repositories import AggregationDimension, CostRepository
-from app.schemas.costs import CostAggregateResponse, CostOverviewResponse, DimensionItem
+from app.core.config import get_settings
+from app.db.session import DatabaseRunner, get_db, get_read_db_runner
+from app.repositories import AggregationDimension, CostIngestionRepository, CostRepository, CostRollupRepository
+from app.schemas.costs import CostAggregateResponse, CostEntryPage, CostOverviewResponse, DimensionItem
 from app.schemas.common import ErrorResponse
-from app.services import CostService
+from app.schemas.ingestion import IngestionFormat, IngestionReport
+from app.services import CostExportService, CostIngestionService, CostService
+from app.services.export_service import EXPORT_MEDIA_TYPES
 
 ERROR_RESPONSES = {
     401: {"model": ErrorResponse, "description": "Missing/invalid API key"},
@@ -23,21 +30,23 @@ router = APIRouter(tags=["costs"])
 
 
 @router.get("/costs/aggregate", response_model=CostAggregateResponse, responses=ERROR_RESPONSES)
-def get_aggregated_costs(
+async def get_aggregated_costs(
+    request: Request,
     start_date: date = Query(...),
     end_date: date = Query(...),
     group_by: list[str] = Query(default=["month"]),
     cost_center_ids: list[int] | None = Query(default=None),
     project_ids: list[int] | None = Query(default=None),
     category_ids: list[int] | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: DatabaseRunner = Depends(get_read_db_runner),
     _auth=Depends(require_scope("costs:read")),
-) -> CostAggregateResponse | dict:
+) -> CostAggregateResponse | Response | dict:
     validate_group_by(group_by)
 
     filters = build_cost_filters(start_date, end_date, cost_center_ids, project_ids, category_ids)
-    key = cache.build_key(
+    key = await cache.build_versioned_key(
         "costs:aggregate",
+        ("costs", "dimensions"),
         start_date=start_date.isoformat(),
         end_date=end_date.isoformat(),
         group_by=group_by,
@@ -45,64 +54,162 @@ def get_aggregated_costs(
         project_ids=filters.project_ids,
         category_ids=filters.category_ids,
     )
-    def loader() -> dict:
-        valid_group_by = cast(list[AggregationDimension], group_by)
-        service = CostService(CostRepository(db))
-        response = service.aggregate_costs(filters, group_by=valid_group_by)
-        return response.model_dump(mode="json")
+    valid_group_by = cast(list[AggregationDimension], group_by)
+
+    def fetch(session: Session) -> list[dict]:
+        return CostService(CostRepository(session)).aggregate_rows(filters, group_by=valid_group_by)
+
+    def build(rows: list[dict]) -> dict:
+        return CostService.aggregate_from_rows(valid_group_by, rows).model_dump(mode="json")
 
-    return cache.get_or_set_json(key, loader)
+    return await cached_json_response(request, key, lambda: db.run(fetch, build))
 
 
 @router.get("/costs/overview", response_model=CostOverviewResponse, responses=ERROR_RESPONSES)
-def get_cost_overview(
+async def get_cost_overview(
+    request: Request,
     start_date: date = Query(...),
     end_date: date = Query(...),
     cost_center_ids: list[int] | None = Query(default=None),
     project_ids: list[int] | None = Query(default=None),
     category_ids: list[int] | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: DatabaseRunner = Depends(get_read_db_runner),
     _auth=Depends(require_scope("costs:read")),
-) -> CostOverviewResponse | dict:
+) -> CostOverviewResponse | Response | dict:
     filters = build_cost_filters(start_date, end_date, cost_center_ids, project_ids, category_ids)
-    key = cache.build_key(
+    key = await cache.build_versioned_key(
         "costs:overview",
+        ("costs", "dimensions"),
         start_date=start_date.isoformat(),
         end_date=end_date.isoformat(),
         cost_center_ids=filters.cost_center_ids,
         project_ids=filters.project_ids,
         category_ids=filters.category_ids,
     )
-    def loader() -> dict:
-        service = CostService(CostRepository(db))
-        response = service.cost_overview(filters)
-        return response.model_dump(mode="json")
+    def fetch(session: Session) -> list[dict]:
+        return CostService(CostRepository(session)).overview_rows(filters)
+
+    def build(rows: list[dict]) -> dict:
+        return CostService.overview_from_rows(filters, rows).model_dump(mode="json")
 
-    return cache.get_or_set_json(key, loader)
+    return await cached_json_response(request, key, lambda: db.run(fetch, build))
 
 
 @router.get("/dimensions/cost-centers", response_model=list[DimensionItem], responses=ERROR_RESPONSES)
-def list_cost_centers(
-    db: Session = Depends(get_db),
+async def list_cost_centers(
+    request: Request,
+    db: DatabaseRunner = Depends(get_read_db_runner),
     _auth=Depends(require_scope("costs:read")),
-) -> list[dict]:
-    key = cache.build_key("dimensions:cost_centers")
-    return cache.get_or_set_json(key, lambda: CostRepository(db).list_cost_centers())
+) -> list[dict] | Response:
+    key = await cache.build_versioned_key("dimensions:cost_centers", ("dimensions",))
+    return await cached_json_response(request, key, lambda: db.run(lambda session: CostRepository(session).list_cost_centers()))
 
 
 @router.get("/dimensions/projects", response_model=list[DimensionItem], responses=ERROR_RESPONSES)
-def list_projects(
-    db: Session = Depends(get_db),
+async def list_projects(
+    request: Request,
+    db: DatabaseRunner = Depends(get_read_db_runner),
     _auth=Depends(require_scope("costs:read")),
-) -> list[dict]:
-    key = cache.build_key("dimensions:projects")
-    return cache.get_or_set_json(key, lambda: CostRepository(db).list_projects())
+) -> list[dict] | Response:
+    key = await cache.build_versioned_key("dimensions:projects", ("dimensions",))
+    return await cached_json_response(request, key, lambda: db.run(lambda session: CostRepository(session).list_projects()))
 
 
 @router.get("/dimensions/categories", response_model=list[DimensionItem], responses=ERROR_RESPONSES)
-def list_categories(
-    db: Session = Depends(get_db),
+async def list_categories(
+    request: Request,
+    db: DatabaseRunner = Depends(get_read_db_runner),
     _auth=Depends(require_scope("costs:read")),
-) -> list[dict]:
-    key = cache.build_key("dimensions:categories")
-    return cache.get_or_set_json(key, lambda: CostRepository(db).list_categories())
+) -> list[dict] | Response:
+    key = await cache.build_versioned_key("dimensions:categories", ("dimensions",))
+    return await cached_json_response(request, key, lambda: db.run(lambda session: CostRepository(session).list_categories()))
+
+
+@router.get("/costs/entries", response_model=CostEntryPage, responses=ERROR_RESPONSES)
+async def list_cost_entries(
+    request: Request,
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    cost_center_ids: list[int] | None = Query(default=None),
+    project_ids: list[int] | None = Query(default=None),
+    category_ids: list[int] | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = Query(default=None, max_length=256),
+    db: DatabaseRunner = Depends(get_read_db_runner),
+    _auth=Depends(require_scope("costs:read")),
+) -> CostEntryPage | Response | dict:
+    filters = build_cost_filters(start_date, end_date, cost_center_ids, project_ids, category_ids)
+    key = await cache.build_versioned_key(
+        "costs:entries",
+        ("costs", "dimensions"),
+        start_date=filters.start_date.isoformat(),
+        end_date=filters.end_date.isoformat(),
+        cost_center_ids=filters.cost_center_ids,
+        project_ids=filters.project_ids,
+        category_ids=filters.category_ids,
+        limit=limit,
+        cursor=cursor,
+    )
+
+    def fetch(session: Session) -> list[dict]:
+        return CostService(CostRepository(session)).entries_rows(filters, limit=limit, cursor=cursor)
+
+    def build(rows: list[dict]) -> dict:
+        return CostService.entries_from_rows(limit, rows).model_dump(mode="json")
+
+    return await cached_json_response(request, key, lambda: db.run(fetch, build))
+
+
+@router.get(
+    "/costs/entries/export",
+    response_class=StreamingResponse,
+    responses={**ERROR_RESPONSES, 200: {"content": {"text/csv": {}, "application/x-ndjson": {}}}},
+)
+async def export_cost_entries(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    cost_center_ids: list[int] | None = Query(default=None),
+    project_ids: list[int] | None = Query(default=None),
+    category_ids: list[int] | None = Query(default=None),
+    data_format: IngestionFormat = Query(default="csv", alias="format"),
+    db: DatabaseRunner = Depends(get_read_db_runner),
+    _auth=Depends(require_scope("costs:read")),
+) -> StreamingResponse:
+    filters = build_cost_filters(start_date, end_date, cost_center_ids, project_ids, category_ids)
+    batch_size = get_settings().export_batch_size
+
+    def content() -> Iterator[str]:
+        with db.open_session() as session:
+            yield from CostExportService(CostRepository(session), batch_size=batch_size).stream(filters, data_format)
+
+    filename = f"cost_entries_{filters.start_date.isoformat()}_{filters.end_date.isoformat()}.{data_format}"
+    return StreamingResponse(
+        content(),
+        media_type=EXPORT_MEDIA_TYPES[data_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/costs/entries/ingest", response_model=IngestionReport, responses=ERROR_RESPONSES)
+async def ingest_cost_entries(
+    request: Request,
+    data_format: IngestionFormat | None = Query(default=None, alias="format"),
+    db: Session = Depends(get_db),
+    _auth=Depends(require_scope("costs:write")),
+) -> IngestionReport:
+    settings = get_settings()
+    resolved_format = resolve_ingestion_format(data_format, request.headers.get("content-type"))
+    service = CostIngestionService(
+        CostIngestionRepository(db),
+        rollup_repository=CostRollupRepository(db),
+        batch_size=settings.ingestion_batch_size,
+    )
+    # Rows are parsed and copied while the body is still arriving; nothing is spooled.
+    report = await run_with_request_body(
+        request,
+        lambda body: service.ingest(body, resolved_format),
+        buffered_chunks=settings.ingestion_stream_buffer_chunks,
+    )
+    if report.rows_inserted:
+        await cache.bump_generations("costs")
+    return report
@@ -0,0 +1,50 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import require_scope
+from app.api.responses import cached_json_response
+from app.core.cache import cache
+from app.db.session import DatabaseRunner, get_read_db_runner
+from app.repositories import CostRepository
+from app.schemas.common import ErrorResponse
+from app.schemas.dashboard import DashboardResponse
+from app.services import DashboardService
+
+ERROR_RESPONSES = {
+    401: {"model": ErrorResponse, "description": "Missing/invalid API key"},
+    403: {"model": ErrorResponse, "description": "Insufficient scope"},
+    422: {"model": ErrorResponse, "description": "Validation error"},
+    500: {"model": ErrorResponse, "description": "Internal server error"},
+}
+
+router = APIRouter(tags=["dashboard"])
+
+
+@router.get("/dashboard", response_model=DashboardResponse, responses=ERROR_RESPONSES)
+async def get_dashboard(
+    request: Request,
+    end_date: date | None = Query(default=None),
+    lookback_months: int = Query(default=12, ge=1, le=36),
+    db: DatabaseRunner = Depends(get_read_db_runner),
+    _costs=Depends(require_scope("costs:read")),
+    _analytics=Depends(require_scope("analytics:read")),
+    _budgets=Depends(require_scope("budgets:read")),
+) -> DashboardResponse | Response | dict:
+    period_end = end_date or date.today()
+
+    key = await cache.build_versioned_key(
+        "analytics:dashboard",
+        ("budgets", "costs", "dimensions"),
+        period_end=period_end.isoformat(),
+        lookback_months=lookback_months,
+    )
+    def fetch(session: Session) -> tuple[list[dict], list[dict]]:
+        return DashboardService(CostRepository(session)).dashboard_rows(period_end, lookback_months)
+
+    def build(rows: tuple[list[dict], list[dict]]) -> dict:
+        response = DashboardService().dashboard_from_rows(period_end, lookback_months, *rows)
+        return response.model_dump(mode="json")
+
+    return await cached_json_response(request, key, lambda: db.run(fetch, build))
@@ -1,17 +1,34 @@
-from fastapi import APIRouter, Depends
+import copy
+import secrets
+from datetime import date
+
+import numpy as np
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import require_scope
-from app.db.session import get_db
+from app.core.cache import CacheUnavailableError, LocalLRUCache, cache
+from app.core.config import get_settings
+from app.core.exceptions import ConflictError, NotFoundError, ServiceUnavailableError
+from app.db.session import DatabaseRunner, get_read_db_runner
 from app.repositories import CostRepository
 from app.schemas.common import ErrorResponse
 from app.schemas.simulations import (
+    SavingsTargetRequest,
+    SavingsTargetResponse,
     SimulationComparisonRequest,
     SimulationComparisonResponse,
     SimulationRequest,
     SimulationResponse,
+    SimulationSessionPatch,
+    SimulationSessionResponse,
+    SimulationSweepRequest,
+    SimulationSweepResponse,
 )
 from app.services import SimulationService
+from app.services.simulation_matrix import SimulationMatrix
+from app.services.simulation_session import SimulationSession
 
 ERROR_RESPONSES = {
     401: {"model": ErrorResponse, "description": "Missing/invalid API key"},
@@ -22,22 +39,249 @@ ERROR_RESPONSES = {
 
 router = APIRouter(tags=["simulations"])
 
+# Edits that lose a compare-and-set race are re-applied on the newer state this many times.
+_SESSION_SAVE_ATTEMPTS = 3
+
+baseline_matrices = LocalLRUCache(
+    max_bytes=get_settings().simulation_matrix_cache_mb * 1024 * 1024,
+    ttl_seconds=get_settings().cache_ttl_seconds,
+)
+
+simulation_sessions = LocalLRUCache(
+    max_bytes=get_settings().simulation_session_cache_mb * 1024 * 1024,
+    ttl_seconds=get_settings().simulation_session_ttl_seconds,
+)
+
+
+async def load_baseline_matrix(start_date: date, end_date: date, db: DatabaseRunner) -> SimulationMatrix:
+    """Baseline matrix for the period: process LRU, then Redis (binary), then Postgres."""
+    key = await cache.build_versioned_key(
+        "simulations:matrix",
+        ("costs", "dimensions"),
+        start_date=start_date.isoformat(),
+        end_date=end_date.isoformat(),
+    )
+    matrix = baseline_matrices.get(key)
+    if matrix is not None:
+        return matrix
+
+    payload = await cache.get_bytes(key)
+    if payload is not None:
+        matrix = SimulationMatrix.from_bytes(payload)
+    else:
+        def fetch(session: Session) -> list[dict]:
+            return SimulationService(CostRepository(session)).matrix_rows(start_date, end_date)
+
+        matrix = await db.run(fetch, SimulationMatrix.from_rows)
+        await cache.set_bytes(key, matrix.to_bytes())
+    baseline_matrices.set(key, matrix, size=matrix.nbytes)
+    return matrix
+
+
+def _session_key(session_id: str) -> str:
+    return f"simulations:session:{session_id}"
+
+
+async def load_session(session_id: str) -> tuple[SimulationSession, int]:
+    """Session state and its version.
+
+    The process copy is used only while Redis still holds the same version; otherwise another
+    worker edited the session and it is reloaded. While Redis is unreachable the process copy is
+    served as is. Callers copy the session before changing it.
+    """
+    key = _session_key(session_id)
+    entry = simulation_sessions.get(key)
+    if cache.enabled:
+        try:
+            if entry is None or entry[0] != await cache.get_version(key):
+                entry = await _load_stored_session(key, entry)
+        except CacheUnavailableError:
+            if entry is None:
+                raise ServiceUnavailableError(
+                    "Simulation session store is unavailable.", details={"session_id": session_id}
+                ) from None
+    if entry is None:
+        raise NotFoundError("Simulation session not found or expired.", details={"session_id": session_id})
+    version, session = entry
+    return session, version
+
+
+async def _load_stored_session(
+    key: str, entry: tuple[int, SimulationSession] | None
+) -> tuple[int, SimulationSession] | None:
+    stored = await cache.get_versioned_bytes(key)
+    if stored is None:
+        # A session saved only here while Redis was down (negative version) is kept until its next save.
+        return entry if entry is not None and entry[0] < 0 else None
+    payload, version = stored
+    try:
+        session = await run_in_threadpool(SimulationSession.from_bytes, payload)
+    except ValueError:
+        return None  # written by an older release; treat as expired
+    simulation_sessions.set(key, (version, session), size=session.nbytes)
+    return version, session
+
+
+async def save_session(
+    session_id: str,
+    session: SimulationSession,
+    version: int,
+    previous: SimulationSession | None = None,
+) -> bool:
+    """Stores the session if it is still at ``version`` (0 = new); False when another edit won.
+
+    With ``previous`` (the state ``version`` holds), only the changed bytes are written to Redis.
+    If Redis is unreachable the session is kept in this process only, under a negative version
+    that never matches one stored in Redis; its next save writes it whole.
+    """
+    key = _session_key(session_id)
+    saved: int | None = None
+    if cache.enabled:
+        try:
+            saved = await _store_session(key, session, version, previous)
+        except CacheUnavailableError:
+            pass
+        else:
+            if saved is None:
+                return False
+    if saved is None:
+        # The process cache is the only copy; the check and the write below run without awaiting.
+        entry = simulation_sessions.get(key)
+        if (entry[0] if entry is not None else 0) != version:
+            return False
+        saved = version + 1 if not cache.enabled else -(abs(version) + 1)
+    simulation_sessions.set(key, (saved, session), size=session.nbytes)
+    return True
+
+
+async def _store_session(
+    key: str, session: SimulationSession, version: int, previous: SimulationSession | None
+) -> int | None:
+    ttl_seconds = get_settings().simulation_session_ttl_seconds
+    patches = None
+    if previous is not None and version > 0:
+        patches = await run_in_threadpool(session.patches_since, previous)
+    if patches is not None:
+        return await cache.compare_and_set_bytes(key, version, ttl_seconds, patches=patches)
+    payload = await run_in_threadpool(session.to_bytes)
+    return await cache.compare_and_set_bytes(key, max(version, 0), ttl_seconds, payload=payload)
+
 
 @router.post("/simulations/run", response_model=SimulationResponse, responses=ERROR_RESPONSES)
-def run_simulation(
+async def run_simulation(
     payload: SimulationRequest,
-    db: Session = Depends(get_db),
+    db: DatabaseRunner = Depends(get_read_db_runner),
     _auth=Depends(require_scope("simulations:write")),
 ) -> SimulationResponse:
-    service = SimulationService(CostRepository(db))
-    return service.run(payload)
+    matrix = await load_baseline_matrix(payload.start_date, payload.end_date, db)
+    return await run_in_threadpool(SimulationService().run, payload, matrix)
 
 
 @router.post("/simulations/compare", response_model=SimulationComparisonResponse, responses=ERROR_RESPONSES)
-def compare_simulations(
+async def compare_simulations(
     payload: SimulationComparisonRequest,
-    db: Session = Depends(get_db),
+    db: DatabaseRunner = Depends(get_read_db_runner),
     _auth=Depends(require_scope("simulations:write")),
 ) -> SimulationComparisonResponse:
-    service = SimulationService(CostRepository(db))
-    return service.compare(payload)
+    matrix = await load_baseline_matrix(payload.start_date, payload.end_date, db)
+    return await run_in_threadpool(SimulationService().compare, payload, matrix)
+
+
+@router.post("/simulations/sweep", response_model=SimulationSweepResponse, responses=ERROR_RESPONSES)
+async def sweep_simulations(
+    payload: SimulationSweepRequest,
+    db: DatabaseRunner = Depends(get_read_db_runner),
+    _auth=Depends(require_scope("simulations:write")),
+) -> SimulationSweepResponse:
+    matrix = await load_baseline_matrix(payload.start_date, payload.end_date, db)
+    return await run_in_threadpool(SimulationService().sweep, payload, matrix)
+
+
+@router.post("/simulations/optimize", response_model=SavingsTargetResponse, responses=ERROR_RESPONSES)
+async def optimize_savings_target(
+    payload: SavingsTargetRequest,
+    db: DatabaseRunner = Depends(get_read_db_runner),
+    _auth=Depends(require_scope("simulations:write")),
+) -> SavingsTargetResponse:
+    matrix = await load_baseline_matrix(payload.start_date, payload.end_date, db)
+    return await run_in_threadpool(SimulationService().optimize, payload, matrix)
+
+
+@router.post(
+    "/simulations/sessions",
+    response_model=SimulationSessionResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses=ERROR_RESPONSES,
+)
+async def start_simulation_session(
+    payload: SimulationRequest,
+    top_n: int = Query(default=20, ge=1, le=500),
+    db: DatabaseRunner = Depends(get_read_db_runner),
+    _auth=Depends(require_scope("simulations:write")),
+) -> SimulationSessionResponse:
+    matrix = await load_baseline_matrix(payload.start_date, payload.end_date, db)
+    service = SimulationService()
+    session = await run_in_threadpool(service.start_session, payload, matrix)
+    session_id = secrets.token_urlsafe(16)
+    if not await save_session(session_id, session, version=0):
+        raise ConflictError("Simulation session could not be stored.", details={"session_id": session_id})
+    return await run_in_threadpool(service.describe_session, session_id, session, matrix, top_n)
+
+
+@router.get(
+    "/simulations/sessions/{session_id}",
+    response_model=SimulationSessionResponse,
+    responses={
+        **ERROR_RESPONSES,
+        404: {"model": ErrorResponse, "description": "Unknown or expired session"},
+        503: {"model": ErrorResponse, "description": "Session store unreachable and session not held by this worker"},
+    },
+)
+async def get_simulation_session(
+    session_id: str,
+    top_n: int = Query(default=20, ge=1, le=500),
+    db: DatabaseRunner = Depends(get_read_db_runner),
+    _auth=Depends(require_scope("simulations:write")),
+) -> SimulationSessionResponse:
+    session, version = await load_session(session_id)
+    matrix = await load_baseline_matrix(session.start_date, session.end_date, db)
+    changed = None
+    if matrix.fingerprint != session.matrix_fingerprint:
+        session = copy.copy(session)
+        await run_in_threadpool(session.refresh, matrix)
+        # Losing the race is fine: the newer edit is already based on current data or refreshes later.
+        await save_session(session_id, session, version)
+    else:
+        changed = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    return await run_in_threadpool(SimulationService().describe_session, session_id, session, matrix, top_n, changed)
+
+
+@router.patch(
+    "/simulations/sessions/{session_id}",
+    response_model=SimulationSessionResponse,
+    responses={
+        **ERROR_RESPONSES,
+        404: {"model": ErrorResponse, "description": "Unknown or expired session"},
+        409: {"model": ErrorResponse, "description": "Concurrent edits kept winning"},
+        503: {"model": ErrorResponse, "description": "Session store unreachable and session not held by this worker"},
+    },
+)
+async def patch_simulation_session(
+    session_id: str,
+    payload: SimulationSessionPatch,
+    top_n: int = Query(default=20, ge=1, le=500),
+    db: DatabaseRunner = Depends(get_read_db_runner),
+    _auth=Depends(require_scope("simulations:write")),
+) -> SimulationSessionResponse:
+    for _ in range(_SESSION_SAVE_ATTEMPTS):
+        previous, version = await load_session(session_id)
+        matrix = await load_baseline_matrix(previous.start_date, previous.end_date, db)
+        session = copy.copy(previous)
+        changed = await run_in_threadpool(session.apply, matrix, payload.center_cuts, payload.category_cuts)
+        if await save_session(session_id, session, version, previous):
+            return await run_in_threadpool(
+                SimulationService().describe_session, session_id, session, matrix, top_n, changed
+            )
+    raise ConflictError(
+        "Simulation session kept changing concurrently; retry the edit.", details={"session_id": session_id}
+    )
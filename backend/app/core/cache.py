@@ -1,59 +1,675 @@
+import asyncio
 import json
 import logging
+import secrets
+import struct
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
 from hashlib import sha256
-from typing import Any, Callable
+from typing import Any, Literal, NamedTuple, get_args
 
-from app.core.config import get_settings
+from app.core.compression import ContentCoding, compress, decompress, resolve_coding
+from app.core.config import Settings, get_settings
 
 try:
-    import redis  # type: ignore
+    import redis.asyncio as redis  # type: ignore
 except ModuleNotFoundError:  # pragma: no cover - environment fallback
     redis = None  # type: ignore
 
+try:
+    import orjson  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore
+
+# Deletes the lease only if it still holds our token, so a slow holder never frees a newer lease.
+_RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+# Writes a versioned binary value only while ``KEYS[2]`` still holds the caller's version
+# (ARGV[1]): the whole value (ARGV[3] == "set", payload in ARGV[4]) or SETRANGE patches as
+# offset/bytes pairs from ARGV[4]. Returns the new version, or nil when another writer won.
+_COMPARE_AND_SET_SCRIPT = """
+if (redis.call('get', KEYS[2]) or '0') ~= ARGV[1] then
+    return nil
+end
+if ARGV[3] == 'set' then
+    redis.call('set', KEYS[1], ARGV[4], 'EX', ARGV[2])
+else
+    if redis.call('exists', KEYS[1]) == 0 then
+        return nil
+    end
+    for index = 4, #ARGV, 2 do
+        redis.call('setrange', KEYS[1], ARGV[index], ARGV[index + 1])
+    end
+    redis.call('expire', KEYS[1], ARGV[2])
+end
+local version = redis.call('incr', KEYS[2])
+redis.call('expire', KEYS[2], ARGV[2])
+return version
+"""
+_LEASE_POLL_SECONDS = 0.05
+# Redis envelope of stale-while-revalidate entries: {"__soft_expires_at": epoch, "value": payload}.
+_SOFT_EXPIRY_FIELD = "__soft_expires_at"
+_GENERATION_KEY_PREFIX = "cache:generation:"
+# Epoch of the last bump of any domain, read together with the counters.
+_BUMPED_AT_KEY = f"{_GENERATION_KEY_PREFIX}bumped_at"
+# Raw (pre-encoded JSON) entries: magic, format version, content coding, soft expiry (epoch,
+# 0 = none), then the body.
+_BODY_MAGIC = b"CJ"
+_BODY_HEADER = struct.Struct("<2sBBd")
+_BODY_VERSION = 2
+_BODY_CODINGS: tuple[ContentCoding | None, ...] = (None, "gzip", "br", "zstd")
+
+DataDomain = Literal["costs", "budgets", "dimensions"]
+DATA_DOMAINS: tuple[DataDomain, ...] = get_args(DataDomain)
+
+
+class CacheUnavailableError(Exception):
+    """Redis could not be reached; raised where a miss and an outage need different handling."""
+
+
+class LocalLRUCache:
+    """Process-local LRU bounded by the total size of its entries, with per-entry expiry."""
+
+    def __init__(self, max_bytes: int, ttl_seconds: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[Any, int, float]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= self._clock():
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def get_stale(self, key: str, max_stale_seconds: float | None = None) -> Any | None:
+        """Returns the entry even if it has expired, up to ``max_stale_seconds`` past its expiry
+        (no limit when None); expired entries stay until evicted or replaced.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if max_stale_seconds is not None and entry[2] + max_stale_seconds <= self._clock():
+                return None
+            return entry[0]
+
+    def set(self, key: str, value: Any, size: int, ttl_seconds: float | None = None) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self._max_bytes:
+                return
+            expires_at = self._clock() + (self._ttl_seconds if ttl_seconds is None else ttl_seconds)
+            self._entries[key] = (value, size, expires_at)
+            self._size += size
+            while self._size > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._size}
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+
+class _SoftEntry(NamedTuple):
+    """L1 value of a stale-while-revalidate key: the payload and its soft expiry (epoch seconds)."""
+
+    value: Any
+    soft_expires_at: float
+
+
+def encode_json(payload: Any) -> bytes:
+    """Compact UTF-8 JSON; orjson when installed (several times faster), stdlib ``json`` otherwise."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_json(value: str | bytes) -> Any:
+    return orjson.loads(value) if orjson is not None else json.loads(value)
+
+
+def _unwrap_json(value: str | bytes) -> tuple[Any, float | None]:
+    payload = decode_json(value)
+    if isinstance(payload, dict) and _SOFT_EXPIRY_FIELD in payload and len(payload) == 2:
+        return payload.get("value"), float(payload[_SOFT_EXPIRY_FIELD])
+    return payload, None
+
+
+class CachedBody(NamedTuple):
+    """Encoded JSON response body, possibly compressed with the ``encoding`` content coding."""
+
+    body: bytes
+    encoding: ContentCoding | None = None
+
+    def decoded(self) -> bytes:
+        return self.body if self.encoding is None else decompress(self.body, self.encoding)
+
+
+def _frame_body(cached: CachedBody, soft_expires_at: float | None) -> bytes:
+    header = _BODY_HEADER.pack(_BODY_MAGIC, _BODY_VERSION, _BODY_CODINGS.index(cached.encoding), soft_expires_at or 0.0)
+    return header + cached.body
+
+
+def _unframe_body(value: bytes) -> tuple[CachedBody, float | None]:
+    if len(value) < _BODY_HEADER.size:
+        raise ValueError("truncated cached body")
+    magic, version, coding, soft_expires_at = _BODY_HEADER.unpack_from(value)
+    if magic != _BODY_MAGIC or version != _BODY_VERSION or coding >= len(_BODY_CODINGS):
+        raise ValueError("not a cached JSON body")
+    return CachedBody(value[_BODY_HEADER.size :], _BODY_CODINGS[coding]), soft_expires_at or None
+
+
+def parse_ttl_policies(raw: str) -> list[tuple[str, int]]:
+    """Parses ``"prefix=seconds,..."`` into (prefix, ttl) pairs, longest prefix first."""
+    policies: list[tuple[str, int]] = []
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        prefix, _, seconds = item.strip().rpartition("=")
+        if not prefix or not seconds.strip().isdigit():
+            raise ValueError(f"Invalid cache TTL policy: {item!r} (expected prefix=seconds).")
+        policies.append((prefix.strip(), int(seconds)))
+    return sorted(policies, key=lambda policy: len(policy[0]), reverse=True)
+
 
 class RedisCache:
-    def __init__(self) -> None:
-        settings = get_settings()
+    """JSON/bytes cache in Redis with an optional in-process L1 tier for JSON payloads.
+
+    L1 holds decoded payloads, so a hit costs neither a round-trip nor a ``json.loads``; callers
+    must treat returned values as read-only. Both tiers use the TTL of the longest matching
+    prefix in ``CACHE_TTL_POLICIES`` (``CACHE_TTL_SECONDS`` otherwise); values promoted from
+    Redis keep only the TTL remaining on the Redis key.
+
+    ``get_or_set_body`` caches the final JSON bytes instead (Redis value framed with the soft
+    expiry), so routes can return a hit as a raw ``Response``. Bodies of at least
+    ``CACHE_COMPRESSION_MIN_BYTES`` are stored compressed with ``CACHE_COMPRESSION``, both in
+    Redis and in L1, ready to be sent with a matching ``Content-Encoding``.
+
+    ``get_or_set_json`` is single-flight: concurrent callers in this process share one loader
+    call, and across workers a ``SET NX`` lease on ``<key>:lease`` lets one worker load while
+    the others serve their stale L1 copy if it expired less than ``CACHE_MAX_STALE_SECONDS`` ago,
+    or poll Redis for up to ``CACHE_LEASE_WAIT_MS`` before loading themselves.
+
+    Keys matching ``CACHE_SWR_POLICIES`` (``prefix=seconds`` of extra stale window) are
+    stale-while-revalidate: the TTL policy sets the soft expiry and the Redis key lives until the
+    hard expiry (soft + window). ``get_or_set_json`` returns a soft-expired value at once and
+    refreshes it in the background, on at most ``CACHE_REFRESH_WORKERS`` concurrent loaders.
+
+    ``build_versioned_key`` folds the data generation of each domain the payload depends on into
+    the key. ``bump_generations`` (ingestion, admin invalidation) increments the counters in
+    Redis, so later reads miss and the old entries simply age out; other workers see the new
+    generation within ``CACHE_GENERATION_CHECK_MS``, together with the time of the bump
+    (``seconds_since_bump``).
+
+    ``compare_and_set_bytes`` keeps a version next to a binary value (``<key>:version``) for
+    state that several workers edit. Unlike the other helpers, the versioned ones raise
+    ``CacheUnavailableError`` on Redis errors, so callers can tell an outage from a conflict.
+    """
+
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        client: Any | None = None,
+        binary_client: Any | None = None,
+    ) -> None:
+        settings = settings or get_settings()
         self._logger = logging.getLogger("app.cache")
-        self._enabled = settings.cache_enabled and redis is not None
+        self._enabled = settings.cache_enabled and (redis is not None or client is not None)
         self._default_ttl = settings.cache_ttl_seconds
-        self._client = redis.Redis.from_url(settings.redis_url, decode_responses=True) if self._enabled else None
+        self._ttl_policies = parse_ttl_policies(settings.cache_ttl_policies)
+        self._swr_policies = parse_ttl_policies(settings.cache_swr_policies)
+        if client is None and self._enabled:
+            client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        self._client = client
+        if binary_client is None and self._enabled and redis is not None:
+            binary_client = redis.Redis.from_url(settings.redis_url)
+        self._binary_client = binary_client
+        self._l1 = (
+            LocalLRUCache(max_bytes=settings.cache_l1_max_mb * 1024 * 1024, ttl_seconds=self._default_ttl)
+            if settings.cache_enabled and settings.cache_l1_enabled
+            else None
+        )
+        self._compression = resolve_coding(settings.cache_compression)
+        self._compression_min_bytes = settings.cache_compression_min_bytes
+        self._lease_ttl_ms = settings.cache_lease_ttl_seconds * 1000
+        self._lease_wait_seconds = settings.cache_lease_wait_ms / 1000
+        self._max_stale_seconds = settings.cache_max_stale_seconds
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+        self._refresh_workers = settings.cache_refresh_workers
+        self._refresh_max_pending = settings.cache_refresh_max_pending
+        self._refresh_slots: asyncio.Semaphore | None = None
+        self._refreshing: dict[str, asyncio.Task[None]] = {}
+        self._generation_check_seconds = settings.cache_generation_check_ms / 1000
+        self._generations: dict[str, int] = dict.fromkeys(DATA_DOMAINS, 0)
+        self._generations_checked_at = float("-inf")
+        self._bumped_at = 0.0
+        self._redis_hits = 0
+        self._redis_misses = 0
+        self._coalesced = 0
+        self._stale_served = 0
+        self._lease_waits = 0
+        self._swr_stale_served = 0
+        self._swr_refreshes = 0
+        self._swr_refresh_skipped = 0
+        self._swr_refresh_failures = 0
 
     @property
     def enabled(self) -> bool:
         return self._enabled
 
-    def get_json(self, key: str) -> Any | None:
-        if not self._enabled or not self._client:
+    def ttl_for(self, key: str) -> int:
+        for prefix, ttl_seconds in self._ttl_policies:
+            if key.startswith(prefix):
+                return ttl_seconds
+        return self._default_ttl
+
+    def stale_window_for(self, key: str) -> int:
+        """Seconds a key stays servable past its soft expiry; 0 when it is not stale-while-revalidate."""
+        for prefix, window_seconds in self._swr_policies:
+            if key.startswith(prefix):
+                return window_seconds
+        return 0
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        tiers = {
+            "redis": {"hits": self._redis_hits, "misses": self._redis_misses},
+            "single_flight": {
+                "coalesced": self._coalesced,
+                "stale_served": self._stale_served,
+                "lease_waits": self._lease_waits,
+            },
+            "stale_while_revalidate": {
+                "stale_served": self._swr_stale_served,
+                "refreshes": self._swr_refreshes,
+                "refresh_skipped": self._swr_refresh_skipped,
+                "refresh_failures": self._swr_refresh_failures,
+                "refreshing": len(self._refreshing),
+            },
+        }
+        if self._l1 is not None:
+            tiers["l1"] = self._l1.stats()
+        return tiers
+
+    async def get_json(self, key: str) -> Any | None:
+        entry = await self._read(key)
+        return entry[0] if entry is not None else None
+
+    async def get_body(self, key: str) -> CachedBody | None:
+        """Encoded JSON stored by ``set_body``/``get_or_set_body``."""
+        entry = await self._read(key, raw=True)
+        return entry[0] if entry is not None else None
+
+    async def _read(self, key: str, raw: bool = False) -> tuple[Any, float | None] | None:
+        """(payload, soft expiry or None) from L1, then Redis; soft-expired values are included.
+
+        Raw entries are read with the binary client and returned as the stored JSON bytes.
+        """
+        if self._l1 is not None:
+            cached = self._l1.get(key)
+            if isinstance(cached, _SoftEntry):
+                return cached
+            if cached is not None:
+                return cached, None
+        client = self._binary_client if raw else self._client
+        if not self._enabled or not client:
             return None
         try:
-            value = self._client.get(key)
+            async with client.pipeline(transaction=False) as pipe:
+                value, remaining_ttl = await pipe.get(key).ttl(key).execute()
         except Exception:
             self._logger.exception("Cache read failed for key=%s", key)
             return None
         if value is None:
+            self._redis_misses += 1
             return None
+        self._redis_hits += 1
         try:
-            return json.loads(value)
-        except json.JSONDecodeError:
+            payload, soft_expires_at = _unframe_body(value) if raw else _unwrap_json(value)
+        except ValueError:
             self._logger.warning("Cache payload decode failed for key=%s", key)
             return None
+        if self._l1 is not None and remaining_ttl and remaining_ttl > 0:
+            l1_value = payload if soft_expires_at is None else _SoftEntry(payload, soft_expires_at)
+            self._l1.set(key, l1_value, size=len(value), ttl_seconds=remaining_ttl)
+        return payload, soft_expires_at
+
+    async def set_json(self, key: str, payload: Any, ttl_seconds: int | None = None) -> None:
+        await self._write(key, payload, ttl_seconds)
 
-    def set_json(self, key: str, payload: Any, ttl_seconds: int | None = None) -> None:
+    async def set_body(self, key: str, payload: Any, ttl_seconds: int | None = None) -> CachedBody:
+        """Encodes (and, when large, compresses) ``payload`` once and caches the result; returns it."""
+        return await self._write(key, payload, ttl_seconds, raw=True)
+
+    async def _write(self, key: str, payload: Any, ttl_seconds: int | None, raw: bool = False) -> Any:
+        """Stores ``payload`` in both tiers; returns what ``_read`` returns for it (``CachedBody`` when raw)."""
+        client = self._binary_client if raw else self._client
+        redis_enabled = self._enabled and client is not None
+        if not raw and self._l1 is None and not redis_enabled:
+            return payload
+        ttl_seconds = ttl_seconds or self.ttl_for(key)
+        stale_window = self.stale_window_for(key)
+        soft_expires_at = time.time() + ttl_seconds if stale_window else None
+        ttl_seconds += stale_window
+        if raw:
+            value: Any = self._encode_body(payload)
+            serialized = _frame_body(value, soft_expires_at)
+        else:
+            value = payload
+            envelope = payload if soft_expires_at is None else {_SOFT_EXPIRY_FIELD: soft_expires_at, "value": payload}
+            serialized = encode_json(envelope)
+        if self._l1 is not None:
+            l1_value = value if soft_expires_at is None else _SoftEntry(value, soft_expires_at)
+            self._l1.set(key, l1_value, size=len(serialized), ttl_seconds=ttl_seconds)
+        if redis_enabled:
+            try:
+                await client.setex(key, ttl_seconds, serialized)
+            except Exception:
+                self._logger.exception("Cache write failed for key=%s", key)
+        return value
+
+    def _encode_body(self, payload: Any) -> CachedBody:
+        body = encode_json(payload)
+        if self._compression is None or len(body) < self._compression_min_bytes:
+            return CachedBody(body)
+        return CachedBody(compress(body, self._compression), self._compression)
+
+    async def get_or_set_json(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: int | None = None,
+    ) -> Any:
+        return await self._get_or_set(key, loader, ttl_seconds, raw=False)
+
+    async def get_or_set_body(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: int | None = None,
+    ) -> CachedBody:
+        """``get_or_set_json`` that caches the encoded JSON bytes, so a hit is returned as stored:
+        no decoding, response-model validation or re-encoding (nor recompression).
+        """
+        return await self._get_or_set(key, loader, ttl_seconds, raw=True)
+
+    async def _get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: int | None,
+        raw: bool,
+    ) -> Any:
+        cached = await self._read(key, raw)
+        if cached is not None:
+            value, soft_expires_at = cached
+            if soft_expires_at is not None and soft_expires_at <= time.time():
+                self._swr_stale_served += 1
+                self._schedule_refresh(key, loader, ttl_seconds, raw)
+            return value
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._fill(key, loader, ttl_seconds, raw))
+            self._inflight[key] = flight
+            flight.add_done_callback(lambda done: self._end_flight(key, done))
+        else:
+            self._coalesced += 1
+        # Shielded so a cancelled caller (client gone) does not cancel the load for the others.
+        return await asyncio.shield(flight)
+
+    async def _fill(self, key: str, loader: Callable[[], Awaitable[Any]], ttl_seconds: int | None, raw: bool) -> Any:
+        lease_key = f"{key}:lease"
+        token = secrets.token_hex(8)
+        if not await self._acquire_lease(lease_key, token):
+            stale = self._l1.get_stale(key, self._max_stale_seconds) if self._l1 is not None else None
+            if isinstance(stale, _SoftEntry):
+                stale = stale.value
+            if stale is not None:
+                self._stale_served += 1
+                return stale
+            self._lease_waits += 1
+            fresh = await self._wait_for_leaseholder(key, lease_key, raw)
+            if fresh is not None:
+                return fresh
+            token = ""
+        try:
+            return await self._write(key, await loader(), ttl_seconds, raw)
+        finally:
+            if token:
+                await self._release_lease(lease_key, token)
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: int | None,
+        raw: bool,
+    ) -> None:
+        """Starts one background refresh per key, dropping it when too many are already queued."""
+        if key in self._refreshing or key in self._inflight:
+            return
+        if len(self._refreshing) >= self._refresh_max_pending:
+            self._swr_refresh_skipped += 1
+            return
+        task = asyncio.ensure_future(self._refresh(key, loader, ttl_seconds, raw))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda done: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: str, loader: Callable[[], Awaitable[Any]], ttl_seconds: int | None, raw: bool) -> None:
+        if self._refresh_slots is None:
+            self._refresh_slots = asyncio.Semaphore(self._refresh_workers)
+        async with self._refresh_slots:
+            lease_key = f"{key}:lease"
+            token = secrets.token_hex(8)
+            if not await self._acquire_lease(lease_key, token):
+                # Another worker is already refreshing; its write reaches us through Redis.
+                self._swr_refresh_skipped += 1
+                return
+            try:
+                await self._write(key, await loader(), ttl_seconds, raw)
+                self._swr_refreshes += 1
+            except Exception:
+                self._swr_refresh_failures += 1
+                self._logger.exception("Background cache refresh failed for key=%s", key)
+            finally:
+                await self._release_lease(lease_key, token)
+
+    async def _acquire_lease(self, lease_key: str, token: str) -> bool:
+        """True when this worker should load: lease taken, or Redis unavailable (no coordination)."""
+        if not self._enabled or not self._client:
+            return True
+        try:
+            return bool(await self._client.set(lease_key, token, nx=True, px=self._lease_ttl_ms))
+        except Exception:
+            self._logger.exception("Cache lease acquire failed for key=%s", lease_key)
+            return True
+
+    async def _release_lease(self, lease_key: str, token: str) -> None:
         if not self._enabled or not self._client:
             return
         try:
-            self._client.setex(key, ttl_seconds or self._default_ttl, json.dumps(payload, default=str))
+            await self._client.eval(_RELEASE_LEASE_SCRIPT, 1, lease_key, token)
+        except Exception:
+            self._logger.exception("Cache lease release failed for key=%s", lease_key)
+
+    async def _wait_for_leaseholder(self, key: str, lease_key: str, raw: bool) -> Any | None:
+        deadline = time.monotonic() + self._lease_wait_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_LEASE_POLL_SECONDS)
+            fresh = await self._read(key, raw)
+            if fresh is not None:
+                return fresh[0]
+            try:
+                if not await self._client.exists(lease_key):
+                    return None
+            except Exception:
+                return None
+        return None
+
+    def _end_flight(self, key: str, flight: asyncio.Future[Any]) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.cancelled():
+            flight.exception()  # mark retrieved when every caller went away
+
+    async def get_bytes(self, key: str) -> bytes | None:
+        if not self._enabled or not self._binary_client:
+            return None
+        try:
+            value = await self._binary_client.get(key)
+        except Exception:
+            self._logger.exception("Cache read failed for key=%s", key)
+            return None
+        if value is None:
+            self._redis_misses += 1
+        else:
+            self._redis_hits += 1
+        return value
+
+    async def set_bytes(self, key: str, payload: bytes, ttl_seconds: int | None = None) -> None:
+        if not self._enabled or not self._binary_client:
+            return
+        try:
+            await self._binary_client.setex(key, ttl_seconds or self.ttl_for(key), payload)
         except Exception:
             self._logger.exception("Cache write failed for key=%s", key)
 
-    def get_or_set_json(self, key: str, loader: Callable[[], Any], ttl_seconds: int | None = None) -> Any:
-        cached = self.get_json(key)
-        if cached is not None:
-            return cached
-        fresh = loader()
-        self.set_json(key, fresh, ttl_seconds=ttl_seconds)
-        return fresh
+    @staticmethod
+    def _version_key(key: str) -> str:
+        return f"{key}:version"
+
+    async def get_version(self, key: str) -> int | None:
+        """Version of a value written with ``compare_and_set_bytes``; None if missing."""
+        if not self._enabled or not self._binary_client:
+            return None
+        try:
+            value = await self._binary_client.get(self._version_key(key))
+        except Exception as exc:
+            self._logger.exception("Cache version read failed for key=%s", key)
+            raise CacheUnavailableError(key) from exc
+        return None if value is None else int(value)
+
+    async def get_versioned_bytes(self, key: str) -> tuple[bytes, int] | None:
+        """Value and version written with ``compare_and_set_bytes``, read together."""
+        if not self._enabled or not self._binary_client:
+            return None
+        try:
+            value, version = await self._binary_client.mget([key, self._version_key(key)])
+        except Exception as exc:
+            self._logger.exception("Cache read failed for key=%s", key)
+            raise CacheUnavailableError(key) from exc
+        if value is None:
+            self._redis_misses += 1
+            return None
+        self._redis_hits += 1
+        return value, int(version or 0)
+
+    async def compare_and_set_bytes(
+        self,
+        key: str,
+        version: int,
+        ttl_seconds: int,
+        payload: bytes | None = None,
+        patches: Iterable[tuple[int, bytes]] = (),
+    ) -> int | None:
+        """Writes ``payload`` (or applies ``(offset, bytes)`` patches) if ``key`` is still at
+        ``version`` (0 = never written). Returns the new version, or None on a conflict.
+        """
+        if not self._enabled or not self._binary_client:
+            return None
+        if payload is not None:
+            args: list[Any] = ["set", payload]
+        else:
+            args = ["patch", *(value for patch in patches for value in patch)]
+        try:
+            result = await self._binary_client.eval(
+                _COMPARE_AND_SET_SCRIPT, 2, key, self._version_key(key), version, ttl_seconds, *args
+            )
+        except Exception as exc:
+            self._logger.exception("Cache compare-and-set failed for key=%s", key)
+            raise CacheUnavailableError(key) from exc
+        return None if result is None else int(result)
+
+    async def data_generations(self) -> dict[str, int]:
+        """Current generation per data domain, re-read from Redis at most every ``CACHE_GENERATION_CHECK_MS``."""
+        if not self._enabled or not self._client:
+            return dict(self._generations)
+        if time.monotonic() - self._generations_checked_at < self._generation_check_seconds:
+            return dict(self._generations)
+        try:
+            values = await self._client.mget([*(f"{_GENERATION_KEY_PREFIX}{domain}" for domain in DATA_DOMAINS), _BUMPED_AT_KEY])
+        except Exception:
+            # Keep the last known generations; retrying on every request would only add latency.
+            self._logger.exception("Cache generation read failed")
+        else:
+            for domain, value in zip(DATA_DOMAINS, values):
+                self._generations[domain] = int(value or 0)
+            self._bumped_at = float(values[-1] or 0)
+        self._generations_checked_at = time.monotonic()
+        return dict(self._generations)
+
+    async def bump_generations(self, *domains: DataDomain) -> dict[str, int]:
+        """Invalidates every cached payload that depends on ``domains`` (all domains if none given)."""
+        domains = domains or DATA_DOMAINS
+        bumped_at = time.time()
+        if self._enabled and self._client:
+            try:
+                async with self._client.pipeline(transaction=True) as pipe:
+                    for domain in domains:
+                        pipe.incr(f"{_GENERATION_KEY_PREFIX}{domain}")
+                    pipe.set(_BUMPED_AT_KEY, repr(bumped_at))
+                    values = await pipe.execute()
+            except Exception:
+                self._logger.exception("Cache generation bump failed for domains=%s", ",".join(domains))
+            else:
+                self._generations.update(zip(domains, (int(value) for value in values)))
+                self._generations_checked_at = time.monotonic()
+                self._bumped_at = bumped_at
+                return dict(self._generations)
+        self._bumped_at = bumped_at
+        for domain in domains:
+            self._generations[domain] += 1
+        if self._l1 is not None:
+            # Without Redis the local counters are all we have; drop L1 so nothing older survives.
+            self._l1.clear()
+        return dict(self._generations)
+
+    async def seconds_since_bump(self) -> float:
+        """Seconds since any domain generation was last bumped, as of the last generation check."""
+        await self.data_generations()
+        return time.time() - self._bumped_at
+
+    async def build_versioned_key(self, prefix: str, domains: Iterable[DataDomain], **kwargs: Any) -> str:
+        """``build_key`` with the current generation of each domain the cached payload is derived from."""
+        generations = await self.data_generations()
+        versions = {domain: generations[domain] for domain in sorted(set(domains))}
+        return self.build_key(prefix, **kwargs, _generations=versions)
 
     @staticmethod
     def build_key(prefix: str, **kwargs: Any) -> str:
@@ -0,0 +1,75 @@
+import gzip
+import logging
+from typing import Literal
+
+try:
+    import brotli  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - optional codec
+    brotli = None  # type: ignore
+
+try:
+    import zstandard  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - optional codec
+    zstandard = None  # type: ignore
+
+ContentCoding = Literal["gzip", "br", "zstd"]
+
+_GZIP_LEVEL = 6
+_BROTLI_QUALITY = 5
+_ZSTD_LEVEL = 3
+
+
+def coding_available(coding: str) -> bool:
+    return coding == "gzip" or (coding == "br" and brotli is not None) or (coding == "zstd" and zstandard is not None)
+
+
+def resolve_coding(configured: str) -> ContentCoding | None:
+    """Coding for ``CACHE_COMPRESSION`` (``gzip``, ``br``, ``zstd`` or ``none``); gzip when the library is missing."""
+    configured = configured.strip().lower()
+    if configured in ("", "none", "identity"):
+        return None
+    if configured not in ("gzip", "br", "zstd"):
+        raise ValueError(f"Unsupported cache compression: {configured!r} (expected gzip, br, zstd or none).")
+    if not coding_available(configured):
+        logging.getLogger("app.cache").warning("%s codec is not installed; compressing cache entries with gzip", configured)
+        return "gzip"
+    return configured  # type: ignore[return-value]
+
+
+def compress(body: bytes, coding: ContentCoding) -> bytes:
+    if coding == "gzip":
+        # mtime=0 keeps the output deterministic for identical bodies.
+        return gzip.compress(body, compresslevel=_GZIP_LEVEL, mtime=0)
+    if coding == "br":
+        return brotli.compress(body, quality=_BROTLI_QUALITY)
+    return zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(body)
+
+
+def decompress(body: bytes, coding: ContentCoding) -> bytes:
+    if coding == "gzip":
+        return gzip.decompress(body)
+    if coding == "br":
+        return brotli.decompress(body)
+    return zstandard.ZstdDecompressor().decompress(body)
+
+
+def accepts_coding(accept_encoding: str | None, coding: str) -> bool:
+    """Whether an ``Accept-Encoding`` header allows ``coding`` (explicitly or via ``*``, with q > 0)."""
+    if not accept_encoding:
+        return False
+    wildcard = False
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name == coding:
+            return quality > 0
+        if name == "*":
+            wildcard = quality > 0
+    return wildcard
@@ -14,9 +14,37 @@ class Settings(BaseSettings):
     db_pool_size: int = 10
     db_max_overflow: int = 20
     db_pool_recycle_seconds: int = 1800
+    db_async_enabled: bool = False
+    database_replica_urls: str = ""
+    db_replica_failure_cooldown_seconds: int = 30
+    db_replica_read_after_write_seconds: int = 5
+    cost_rollup_enabled: bool = True
+    ingestion_batch_size: int = 5000
+    ingestion_stream_buffer_chunks: int = 16
+    export_batch_size: int = 5000
     redis_url: str = "redis://localhost:6379/0"
     cache_enabled: bool = True
-    cache_ttl_seconds: int = 300
+    cache_ttl_seconds: int = 3600
+    cache_ttl_policies: str = "dimensions:=86400,analytics:=3600"
+    cache_l1_enabled: bool = True
+    cache_l1_max_mb: int = 64
+    cache_lease_ttl_seconds: int = 30
+    cache_lease_wait_ms: int = 2000
+    cache_max_stale_seconds: int = 60
+    cache_swr_policies: str = "analytics:=3600"
+    cache_refresh_workers: int = 4
+    cache_refresh_max_pending: int = 256
+    cache_generation_check_ms: int = 1000
+    cache_raw_responses: bool = True
+    cache_compression: str = "gzip"
+    cache_compression_min_bytes: int = 1024
+    http_etags_enabled: bool = True
+    http_cache_control: str = "no-cache"
+    simulation_matrix_cache_mb: int = 256
+    simulation_session_ttl_seconds: int = 1800
+    simulation_session_cache_mb: int = 64
+    batch_max_requests: int = 20
+    batch_max_concurrency: int = 4
 
     allowed_origins: str = "http://localhost:3000"
     allowed_hosts: str = "*"
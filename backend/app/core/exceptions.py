@@ -25,6 +25,16 @@ class DomainValidationError(AppError):
         )
 
 
+class NotFoundError(AppError):
+    def __init__(self, message: str = "Resource not found", details: dict[str, Any] | None = None) -> None:
+        super().__init__(
+            message=message,
+            status_code=404,
+            code="not_found",
+            details=details or {},
+        )
+
+
 class AuthorizationError(AppError):
     def __init__(self, message: str = "Not authorized", details: dict[str, Any] | None = None) -> None:
         super().__init__(
@@ -33,3 +43,23 @@ class AuthorizationError(AppError):
             code="authorization_error",
             details=details or {},
         )
+
+
+class ConflictError(AppError):
+    def __init__(self, message: str = "Conflicting update", details: dict[str, Any] | None = None) -> None:
+        super().__init__(
+            message=message,
+            status_code=409,
+            code="conflict",
+            details=details or {},
+        )
+
+
+class ServiceUnavailableError(AppError):
+    def __init__(self, message: str = "Service temporarily unavailable", details: dict[str, Any] | None = None) -> None:
+        super().__init__(
+            message=message,
+            status_code=503,
+            code="service_unavailable",
+            details=details or {},
+        )
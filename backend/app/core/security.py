@@ -144,9 +144,17 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             remaining_after_request = self._max_requests - len(timestamps)
             return True, remaining_after_request, self._window_seconds
 
+    def charge(self, request: Request) -> tuple[bool, int]:
+        """Counts one more request for the client of ``request``, for work a request fans out to
+        (``/batch`` items); returns (allowed, seconds until the window frees a slot).
+        """
+        allowed, _, reset_after = self._consume(self._get_client_key(request), time.monotonic())
+        return allowed, reset_after
+
     async def dispatch(self, request: Request, call_next):  # type: ignore[no-untyped-def]
         if not self._enabled or request.url.path == "/health":
             return await call_next(request)
+        request.state.rate_limiter = self
 
         now = time.monotonic()
         client_key = self._get_client_key(request)
@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+from app.core.cache import cache
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.repositories.ingestion_repository import CostIngestionRepository
+from app.repositories.rollup_repository import CostRollupRepository
+from app.schemas.ingestion import IngestionFormat, IngestionReport
+from app.services.ingestion_service import CostIngestionService
+
+
+def _detect_format(path: str, explicit: str | None) -> IngestionFormat:
+    if explicit:
+        return explicit  # type: ignore[return-value]
+    suffixes = Path(path).suffixes
+    if ".ndjson" in suffixes or ".jsonl" in suffixes:
+        return "ndjson"
+    return "csv"
+
+
+def ingest_file(path: str, data_format: IngestionFormat, batch_size: int | None = None) -> IngestionReport:
+    settings = get_settings()
+    with SessionLocal() as db:
+        service = CostIngestionService(
+            CostIngestionRepository(db),
+            rollup_repository=CostRollupRepository(db),
+            batch_size=batch_size or settings.ingestion_batch_size,
+        )
+        if path == "-":
+            return service.ingest(sys.stdin.buffer, data_format)
+        with open(path, "rb") as stream:
+            return service.ingest(stream, data_format)
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    logger = logging.getLogger("app.ingestion")
+    parser = argparse.ArgumentParser(description="Stream a CSV or NDJSON file of cost entries into cost_entries via COPY.")
+    parser.add_argument("path", help="File to load, or '-' for stdin.")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None, help="Defaults to the file extension.")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    data_format = _detect_format(args.path, args.format)
+    report = ingest_file(args.path, data_format, batch_size=args.batch_size)
+    if report.rows_inserted:
+        asyncio.run(cache.bump_generations("costs"))
+    logger.info(
+        "Read %s rows (%s inserted, %s duplicated, %s rejected) in %.2fs - %.0f rows/s",
+        report.rows_read,
+        report.rows_inserted,
+        report.rows_duplicated,
+        report.rows_rejected,
+        report.elapsed_seconds,
+        report.rows_per_second,
+    )
+    for error in report.errors:
+        logger.warning("line %s: %s", error.line, error.error)
+    print(json.dumps(report.model_dump(mode="json"), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
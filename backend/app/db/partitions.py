@@ -0,0 +1,70 @@
+import argparse
+import logging
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+
+
+def is_cost_entries_partitioned(db: Session) -> bool:
+    stmt = text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'cost_entries')"
+    )
+    return bool(db.execute(stmt).scalar())
+
+
+def ensure_cost_entry_partitions(db: Session, from_date: date, to_date: date) -> int:
+    """Create missing monthly partitions covering [from_date, to_date]; no-op on a plain table."""
+    if not is_cost_entries_partitioned(db):
+        return 0
+    created = db.execute(
+        text("SELECT ensure_cost_entry_partitions(:from_date, :to_date)"),
+        {"from_date": from_date, "to_date": to_date},
+    ).scalar()
+    db.commit()
+    return int(created or 0)
+
+
+def list_cost_entry_partitions(db: Session) -> list[dict[str, str | int]]:
+    stmt = text(
+        "SELECT child.relname AS name, pg_get_expr(child.relpartbound, child.oid) AS bounds, "
+        "COALESCE(stats.n_live_tup, 0) AS estimated_rows "
+        "FROM pg_inherits inh "
+        "JOIN pg_class parent ON parent.oid = inh.inhparent "
+        "JOIN pg_class child ON child.oid = inh.inhrelid "
+        "LEFT JOIN pg_stat_user_tables stats ON stats.relid = child.oid "
+        "WHERE parent.relname = 'cost_entries' ORDER BY child.relname"
+    )
+    return [dict(row._mapping) for row in db.execute(stmt).all()]
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    logger = logging.getLogger("app.partitions")
+    parser = argparse.ArgumentParser(description="Create cost_entries monthly partitions ahead of time.")
+    parser.add_argument("--months-ahead", type=int, default=3, help="Months after the current one to pre-create.")
+    parser.add_argument("--from-date", type=date.fromisoformat, default=None, help="First month to cover (YYYY-MM-DD).")
+    parser.add_argument("--list", action="store_true", help="List existing partitions after ensuring them.")
+    args = parser.parse_args(argv)
+
+    today = date.today()
+    from_date = args.from_date or today.replace(day=1)
+    to_date = today.replace(day=1) + relativedelta(months=args.months_ahead)
+
+    with SessionLocal() as db:
+        if not is_cost_entries_partitioned(db):
+            logger.warning("cost_entries is not partitioned; run db/partitioning.sql first")
+            return
+        created = ensure_cost_entry_partitions(db, from_date, to_date)
+        logger.info("Ensured partitions from %s to %s (%s created)", from_date.isoformat(), to_date.isoformat(), created)
+        if args.list:
+            for partition in list_cost_entry_partitions(db):
+                logger.info("%s %s ~%s rows", partition["name"], partition["bounds"], partition["estimated_rows"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import logging
+import time
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+
+from app.core.cache import cache
+from app.db.session import SessionLocal
+from app.repositories.rollup_repository import CostRollupRepository, month_start
+
+
+def _parse_month(value: str) -> date:
+    try:
+        return date.fromisoformat(f"{value}-01" if len(value) == 7 else value).replace(day=1)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Invalid month '{value}', expected YYYY-MM") from exc
+
+
+def _month_range(start: date, end: date) -> list[date]:
+    months: list[date] = []
+    current = month_start(start)
+    while current <= end:
+        months.append(current)
+        current += relativedelta(months=1)
+    return months
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Rebuild cost_monthly_rollup for the affected months.")
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument("--month", action="append", type=_parse_month, default=[], help="Month to rebuild (YYYY-MM), repeatable.")
+    scope.add_argument("--range", nargs=2, type=_parse_month, metavar=("FROM", "TO"), help="Inclusive month range to rebuild.")
+    scope.add_argument("--all", action="store_true", help="Rebuild every month present in cost_entries, in the rollup or marked dirty.")
+    return parser
+
+
+def refresh_rollup(months: list[date] | None = None, rebuild_all: bool = False) -> tuple[list[date], int]:
+    """Refresh the given months; without months, refresh only the months detected as stale."""
+    with SessionLocal() as db:
+        repository = CostRollupRepository(db)
+        if rebuild_all:
+            targets = sorted(
+                set(repository.list_raw_months()) | set(repository.list_rolled_up_months()) | set(repository.list_dirty_months())
+            )
+        elif months:
+            targets = sorted(set(months))
+        else:
+            targets = repository.find_stale_months()
+        written = repository.refresh_months(targets) if targets else 0
+    return targets, written
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    logger = logging.getLogger("app.rollup")
+    args = build_parser().parse_args(argv)
+
+    months = list(args.month)
+    if args.range:
+        months = _month_range(*sorted(args.range))
+
+    started = time.perf_counter()
+    targets, written = refresh_rollup(months=months, rebuild_all=args.all)
+    elapsed = time.perf_counter() - started
+    if not targets:
+        logger.info("Rollup is up to date, nothing to refresh")
+        return
+    # Rollup-backed reads change with the rebuilt months; cached payloads built before must go.
+    asyncio.run(cache.bump_generations("costs"))
+    logger.info(
+        "Refreshed %s month(s) [%s .. %s], %s rollup rows written in %.2fs",
+        len(targets),
+        targets[0].isoformat(),
+        targets[-1].isoformat(),
+        written,
+        elapsed,
+    )
+
+
+if __name__ == "__main__":
+    main()
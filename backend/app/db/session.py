@@ -1,24 +1,229 @@
-from collections.abc import Generator
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Callable, Generator, Sequence
+from functools import lru_cache
+from typing import Any, TypeVar, overload
 
-from sqlalchemy import create_engine
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.cache import cache
 from app.core.config import get_settings
 
+R = TypeVar("R")
+T = TypeVar("T")
+
+logger = logging.getLogger("app.db")
+
 settings = get_settings()
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    pool_size=settings.db_pool_size,
-    max_overflow=settings.db_max_overflow,
-    pool_recycle=settings.db_pool_recycle_seconds,
-)
+
+
+def _engine_options() -> dict[str, Any]:
+    return {
+        "pool_pre_ping": True,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+    }
+
+
+engine = create_engine(settings.database_url, **_engine_options())
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    return create_async_engine(settings.database_url, **_engine_options())
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# SQLSTATE classes that mean the server is unreachable or going away, not that the query failed.
+_CONNECTION_SQLSTATES = ("08", "57P01", "57P02", "57P03")
+
+
+def is_connection_error(exc: BaseException) -> bool:
+    if not isinstance(exc, DBAPIError):
+        return False
+    if exc.connection_invalidated:
+        return True
+    if not isinstance(exc, (OperationalError, InterfaceError)):
+        return False
+    sqlstate = getattr(exc.orig, "sqlstate", None)
+    return sqlstate is None or sqlstate.startswith(_CONNECTION_SQLSTATES)
+
+
+class ReplicaPool:
+    """Read replicas served round-robin, skipping any that failed within the cooldown window.
+
+    Health is tracked passively: a replica is marked down when a query on it hits a connection
+    error, and goes back into rotation once the cooldown expires; the next query is its probe.
+    Engines are created on first use so an unreachable replica never blocks startup.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        failure_cooldown_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.urls = list(urls)
+        self.failure_cooldown_seconds = failure_cooldown_seconds
+        self._clock = clock
+        self._down_until = [0.0] * len(self.urls)
+        self._cursor = itertools.count()
+        self._lock = threading.Lock()
+        self._engines: dict[int, Engine] = {}
+        self._async_engines: dict[int, AsyncEngine] = {}
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def candidates(self) -> list[int]:
+        """Healthy replica indexes, starting from the next one in round-robin order."""
+        if not self.urls:
+            return []
+        size = len(self.urls)
+        start = next(self._cursor) % size
+        now = self._clock()
+        rotated = [(start + offset) % size for offset in range(size)]
+        return [index for index in rotated if self._down_until[index] <= now]
+
+    def mark_down(self, index: int) -> None:
+        self._down_until[index] = self._clock() + self.failure_cooldown_seconds
+
+    def engine(self, index: int) -> Engine:
+        with self._lock:
+            if index not in self._engines:
+                self._engines[index] = create_engine(self.urls[index], **_engine_options())
+            return self._engines[index]
+
+    def async_engine(self, index: int) -> AsyncEngine:
+        with self._lock:
+            if index not in self._async_engines:
+                self._async_engines[index] = create_async_engine(self.urls[index], **_engine_options())
+            return self._async_engines[index]
+
+
+class DatabaseRunner:
+    """Runs repository/service work against Postgres from async route handlers.
+
+    In async mode the work runs inside ``AsyncSession.run_sync``: the sync ORM code executes in a
+    greenlet and every query is awaited on the event loop through psycopg's async driver, so no
+    threadpool slot is held while Postgres answers. In sync mode it falls back to a pooled sync
+    session on Starlette's threadpool. Sessions are opened lazily, so cache hits never check out
+    a connection.
+
+    ``work`` should only query; CPU-bound post-processing (services, NumPy, pydantic) goes in
+    ``compute``, which receives the result of ``work`` and runs on the threadpool once the
+    session is closed, so it neither blocks the event loop nor holds a connection.
+
+    With ``replicas`` set the work is treated as read-only: it goes to the next healthy replica,
+    and a connection failure marks that replica down and retries on the next one, ending on the
+    primary when none is left.
+    """
+
+    def __init__(self, async_enabled: bool, replicas: ReplicaPool | None = None) -> None:
+        self.async_enabled = async_enabled
+        self.replicas = replicas
+
+    @overload
+    async def run(self, work: Callable[[Session], T]) -> T: ...
+
+    @overload
+    async def run(self, work: Callable[[Session], R], compute: Callable[[R], T]) -> T: ...
+
+    async def run(self, work: Callable[[Session], Any], compute: Callable[[Any], Any] | None = None) -> Any:
+        if compute is None:
+            return await self._fetch(work)
+        if not self.async_enabled:
+            # Already on a worker thread: build there too instead of a second threadpool hop.
+            return await self._fetch(lambda session: compute(work(session)))
+        return await run_in_threadpool(compute, await self._fetch(work))
+
+    async def _fetch(self, work: Callable[[Session], T]) -> T:
+        if self.replicas:
+            for index in self.replicas.candidates():
+                try:
+                    return await self._run_on(index, work)
+                except DBAPIError as exc:
+                    if not is_connection_error(exc):
+                        raise
+                    self.replicas.mark_down(index)
+                    logger.warning("Read replica #%s unavailable, failing over: %s", index, exc.orig)
+        return await self._run_on(None, work)
+
+    async def _run_on(self, replica_index: int | None, work: Callable[[Session], T]) -> T:
+        if self.async_enabled:
+            if replica_index is None:
+                session = get_async_sessionmaker()()
+            else:
+                session = AsyncSession(
+                    bind=self.replicas.async_engine(replica_index),  # type: ignore[union-attr]
+                    autoflush=False,
+                    expire_on_commit=False,
+                )
+            async with session:
+                return await session.run_sync(work)
+        return await run_in_threadpool(self._run_sync, replica_index, work)
+
+    def open_session(self) -> Session:
+        """Sync session for work that cannot go through ``run``, such as a streamed server-side cursor.
+
+        Picks the next healthy replica without failover (a stream cannot be replayed); the caller
+        closes the session.
+        """
+        candidates = self.replicas.candidates() if self.replicas else []
+        return self._sync_session(candidates[0] if candidates else None)
+
+    def _run_sync(self, replica_index: int | None, work: Callable[[Session], T]) -> T:
+        with self._sync_session(replica_index) as session:
+            return work(session)
+
+    def _sync_session(self, replica_index: int | None) -> Session:
+        if replica_index is None:
+            return SessionLocal()
+        return Session(bind=self.replicas.engine(replica_index), autoflush=False)  # type: ignore[union-attr]
+
+
+@lru_cache
+def get_db_runner() -> DatabaseRunner:
+    """Runner bound to the primary; use it for anything that writes."""
+    return DatabaseRunner(async_enabled=settings.db_async_enabled)
+
+
+@lru_cache
+def get_replica_db_runner() -> DatabaseRunner:
+    urls = [url.strip() for url in settings.database_replica_urls.split(",") if url.strip()]
+    replicas = ReplicaPool(urls, settings.db_replica_failure_cooldown_seconds) if urls else None
+    return DatabaseRunner(async_enabled=settings.db_async_enabled, replicas=replicas)
+
+
+async def get_read_db_runner() -> DatabaseRunner:
+    """Runner for read-only repository work, routed to replicas when ``DATABASE_REPLICA_URLS`` is set.
+
+    Every write path bumps a cache generation, and the new generation makes the next read miss
+    the cache. For ``DB_REPLICA_READ_AFTER_WRITE_SECONDS`` after a bump those reads go to the
+    primary: a replica still replaying the write would otherwise answer them with pre-write data,
+    cached under the new generation until the TTL.
+    """
+    runner = get_replica_db_runner()
+    if runner.replicas and await cache.seconds_since_bump() < settings.db_replica_read_after_write_seconds:
+        return get_db_runner()
+    return runner
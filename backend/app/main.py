@@ -8,6 +8,7 @@ from fastapi.responses import JSONResponse
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 
 from app.api import api_router
+from app.core.cache import cache
 from app.core.config import get_settings
 from app.core.exceptions import AppError
 from app.core.observability import RequestContextMiddleware, configure_logging, request_id_ctx
@@ -99,3 +100,8 @@ async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONR
 @app.get("/health")
 def healthcheck() -> dict[str, str]:
     return {"status": "ok", "version": settings.app_version, "environment": settings.environment}
+
+
+@app.get("/health/cache")
+def cache_stats() -> dict[str, dict[str, int]]:
+    return cache.stats()
@@ -1,5 +1,5 @@
 from app.models.base import Base
-from app.models.entities import BudgetEntry, Category, CostCenter, CostEntry, Project
+from app.models.entities import BudgetEntry, Category, CostCenter, CostEntry, CostMonthlyRollup, CostRollupDirtyMonth, Project
 
-__all__ = ["Base", "BudgetEntry", "Category", "CostCenter", "CostEntry", "Project"]
+__all__ = ["Base", "BudgetEntry", "Category", "CostCenter", "CostEntry", "CostMonthlyRollup", "CostRollupDirtyMonth", "Project"]
 
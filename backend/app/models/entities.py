@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import Date, DateTime, ForeignKey, Numeric, String, Text, func
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, Numeric, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -60,6 +60,7 @@ class CostEntry(Base):
     amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False)
     currency: Mapped[str] = mapped_column(String(3), default="BRL", nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     cost_center = relationship("CostCenter", back_populates="costs")
@@ -67,6 +68,28 @@ class CostEntry(Base):
     category = relationship("Category", back_populates="costs")
 
 
+class CostMonthlyRollup(Base):
+    __tablename__ = "cost_monthly_rollup"
+
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    cost_center_id: Mapped[int] = mapped_column(ForeignKey("cost_centers.id"), primary_key=True)
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), primary_key=True)
+    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    total_amount: Mapped[Decimal] = mapped_column(Numeric(16, 2), nullable=False)
+    entry_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class CostRollupDirtyMonth(Base):
+    """Months whose rollup must be rebuilt; rows are written by triggers on ``cost_entries`` (db/schema.sql)."""
+
+    __tablename__ = "cost_rollup_dirty_months"
+
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    marked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 class BudgetEntry(Base):
     __tablename__ = "budget_entries"
 
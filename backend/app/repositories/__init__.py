@@ -1,4 +1,5 @@
-from app.repositories.cost_repository import AggregationDimension, CostRepository
-
-__all__ = ["AggregationDimension", "CostRepository"]
+from app.repositories.cost_repository import AggregationDimension, CostRepository, repository_memo
+from app.repositories.ingestion_repository import CostIngestionRepository
+from app.repositories.rollup_repository import CostRollupRepository
 
+__all__ = ["AggregationDimension", "CostIngestionRepository", "CostRepository", "CostRollupRepository", "repository_memo"]
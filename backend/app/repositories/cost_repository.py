@@ -1,54 +1,161 @@
-from datetime import date
-from typing import Any, Literal
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, timedelta
+from functools import wraps
+from typing import Any, Literal, TypeVar
 
-from sqlalchemy import Date, Select, func, select
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import ColumnElement, Date, RowMapping, Select, Subquery, bindparam, case, func, literal, select, tuple_, union_all
 from sqlalchemy.orm import Session
 
-from app.models.entities import BudgetEntry, Category, CostCenter, CostEntry, Project
+from app.core.config import get_settings
+from app.models.entities import BudgetEntry, Category, CostCenter, CostEntry, CostMonthlyRollup, Project
 from app.schemas.costs import CostFilters
 
 AggregationDimension = Literal["month", "cost_center", "project", "category"]
+T = TypeVar("T")
+
+_repository_memo: ContextVar[dict[tuple[str, str], Any] | None] = ContextVar("repository_memo", default=None)
+
+
+@contextmanager
+def repository_memo() -> Iterator[None]:
+    """Shares ``CostRepository`` read results among all work started in this context.
+
+    Tasks and threadpool/greenlet calls inherit the context, so requests served together
+    (``/batch``) reuse each other's finished queries; identical calls still in flight both run
+    (no locking, which would block the event loop in async mode). Memoized results are shared
+    objects and must be treated as read-only.
+    """
+    token = _repository_memo.set({})
+    try:
+        yield
+    finally:
+        _repository_memo.reset(token)
+
+
+def memoized(method: Callable[..., T]) -> Callable[..., T]:
+    @wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> T:
+        memo = _repository_memo.get()
+        if memo is None:
+            return method(self, *args, **kwargs)
+        key = (method.__name__, repr((args, sorted(kwargs.items()))))
+        if key not in memo:
+            memo[key] = method(self, *args, **kwargs)
+        return memo[key]
+
+    return wrapper
+
+
+def reference_date_between(column: Any, start_date: date, end_date: date) -> ColumnElement[bool]:
+    """Date range predicate rendered with literal bounds.
+
+    ``cost_entries`` is range-partitioned on ``reference_date``; literal bounds keep the predicate
+    visible to the planner even when psycopg switches to prepared (generic) plans, so partitions
+    are pruned at plan time instead of being opened and discarded at execution.
+    """
+    return column.between(
+        bindparam(None, start_date, type_=Date, literal_execute=True),
+        bindparam(None, end_date, type_=Date, literal_execute=True),
+    )
+
+
+def split_month_aligned_range(
+    start_date: date,
+    end_date: date,
+) -> tuple[tuple[date, date] | None, list[tuple[date, date]]]:
+    """Split a date range into the span of whole months and the partial edge ranges around it."""
+    first_full_month = start_date if start_date.day == 1 else start_date.replace(day=1) + relativedelta(months=1)
+    last_full_month = (end_date + timedelta(days=1)).replace(day=1) - relativedelta(months=1)
+    if first_full_month > last_full_month:
+        return None, [(start_date, end_date)]
+
+    edges: list[tuple[date, date]] = []
+    if start_date < first_full_month:
+        edges.append((start_date, first_full_month - timedelta(days=1)))
+    after_last_full_month = last_full_month + relativedelta(months=1)
+    if after_last_full_month <= end_date:
+        edges.append((after_last_full_month, end_date))
+    return (first_full_month, last_full_month), edges
 
 
 class CostRepository:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: Session, use_rollup: bool | None = None) -> None:
         self.db = db
+        self.use_rollup = get_settings().cost_rollup_enabled if use_rollup is None else use_rollup
 
+    @memoized
     def list_cost_centers(self) -> list[dict[str, Any]]:
         rows = self.db.execute(select(CostCenter.id, CostCenter.code, CostCenter.name).order_by(CostCenter.name)).all()
         return [{"id": row.id, "code": row.code, "name": row.name} for row in rows]
 
+    @memoized
     def list_projects(self) -> list[dict[str, Any]]:
         rows = self.db.execute(select(Project.id, Project.code, Project.name).order_by(Project.name)).all()
         return [{"id": row.id, "code": row.code, "name": row.name} for row in rows]
 
+    @memoized
     def list_categories(self) -> list[dict[str, Any]]:
         rows = self.db.execute(select(Category.id, Category.code, Category.name).order_by(Category.name)).all()
         return [{"id": row.id, "code": row.code, "name": row.name} for row in rows]
 
+    @memoized
+    def list_cost_entries(
+        self,
+        filters: CostFilters,
+        limit: int,
+        after: tuple[date, int] | None = None,
+    ) -> list[dict[str, Any]]:
+        """One page of line-level entries in (reference_date, id) order, starting after ``after``.
+
+        Keyset pagination: the row-value predicate ``(reference_date, id) > after`` seeks straight
+        into ``idx_cost_entries_reference_date_id``, so any page costs the same as the first one.
+        The cursor date is rendered as a literal like the range bounds, so partitions before it
+        are pruned as well.
+        """
+        stmt = self._entry_listing_stmt(filters).limit(limit)
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(CostEntry.reference_date, CostEntry.id) > tuple_(bindparam(None, after[0], type_=Date, literal_execute=True), after[1])
+            )
+        return [dict(row._mapping) for row in self.db.execute(stmt)]
+
+    def iter_cost_entries(self, filters: CostFilters, batch_size: int = 5000) -> Iterator[Sequence[RowMapping]]:
+        """Line-level entries ordered by (reference_date, id), in batches from a server-side cursor.
+
+        Always reads ``cost_entries`` (never the rollup). Rows are fetched ``batch_size`` at a time,
+        so memory stays flat regardless of the result size; the session must stay open while the
+        iterator is consumed.
+        """
+        stmt = self._entry_listing_stmt(filters).execution_options(stream_results=True, yield_per=batch_size)
+        result = self.db.execute(stmt)
+        try:
+            yield from result.mappings().partitions()
+        finally:
+            result.close()
+
+    @memoized
     def get_total_cost(self, filters: CostFilters) -> float:
-        stmt = self._base_cost_entry_stmt(select(func.coalesce(func.sum(CostEntry.amount), 0).label("total_amount")))
-        stmt = self._apply_filters(stmt, filters)
+        source = self._cost_source(filters.start_date, filters.end_date, filters)
+        stmt = self._base_cost_entry_stmt(select(func.coalesce(func.sum(source.c.amount), 0).label("total_amount")), source)
         row = self.db.execute(stmt).one()
         return float(row.total_amount or 0)
 
+    @memoized
     def get_aggregated_costs(self, filters: CostFilters, group_by: list[AggregationDimension]) -> list[dict[str, Any]]:
-        dimensions = {
-            "month": func.date_trunc("month", CostEntry.reference_date).cast(Date).label("month"),
-            "cost_center": CostCenter.name.label("cost_center"),
-            "project": Project.name.label("project"),
-            "category": Category.name.label("category"),
-        }
-
+        source = self._cost_source(filters.start_date, filters.end_date, filters)
+        dimensions = self._dimension_columns(source)
         selected_dimensions = [dimensions[key] for key in group_by]
         stmt = self._base_cost_entry_stmt(
             select(
                 *selected_dimensions,
-                func.coalesce(func.sum(CostEntry.amount), 0).label("total_amount"),
-            )
+                func.coalesce(func.sum(source.c.amount), 0).label("total_amount"),
+            ),
+            source,
         )
 
-        stmt = self._apply_filters(stmt, filters)
         if selected_dimensions:
             stmt = stmt.group_by(*selected_dimensions).order_by(*selected_dimensions)
 
@@ -60,17 +167,70 @@ class CostRepository:
             payload.append(row_dict)
         return payload
 
+    @memoized
+    def get_grouped_costs(
+        self,
+        filters: CostFilters,
+        grouping_sets: list[tuple[AggregationDimension, ...]],
+    ) -> list[dict[str, Any]]:
+        """Aggregate several groupings of the same filtered rows in one GROUPING SETS scan.
+
+        Each row carries ``group_by`` with the grouping set it belongs to, plus only that set's
+        dimension values and ``total_amount``. An empty tuple yields the grand total row.
+        """
+        source = self._cost_source(filters.start_date, filters.end_date, filters)
+        dimensions = self._dimension_columns(source)
+        used_keys = [key for key in dimensions if any(key in grouping_set for grouping_set in grouping_sets)]
+        used_columns = [dimensions[key] for key in used_keys]
+
+        grouping_id = func.grouping(*used_columns).label("grouping_id") if used_columns else None
+        stmt = self._base_cost_entry_stmt(
+            select(
+                *used_columns,
+                *([grouping_id] if grouping_id is not None else []),
+                func.coalesce(func.sum(source.c.amount), 0).label("total_amount"),
+            ),
+            source,
+        )
+        sets_by_mask = {
+            sum(1 << (len(used_keys) - 1 - idx) for idx, key in enumerate(used_keys) if key not in grouping_set): grouping_set
+            for grouping_set in grouping_sets
+        }
+        if used_columns:
+            # Each set's rows are ordered by its own dimensions, in the order they were requested.
+            set_ordering = [
+                case((grouping_id == mask, dimensions[key]))
+                for mask, grouping_set in sets_by_mask.items()
+                for key in grouping_set
+            ]
+            stmt = stmt.group_by(
+                func.grouping_sets(*[tuple_(*[dimensions[key] for key in grouping_set]) for grouping_set in grouping_sets])
+            ).order_by(grouping_id, *set_ordering)
+
+        payload: list[dict[str, Any]] = []
+        for row in self.db.execute(stmt).all():
+            mapping = row._mapping
+            grouping_set = sets_by_mask[mapping["grouping_id"]] if used_columns else ()
+            item: dict[str, Any] = {"group_by": grouping_set}
+            for key in grouping_set:
+                item[key] = mapping[key]
+            item["total_amount"] = float(mapping["total_amount"] or 0)
+            payload.append(item)
+        return payload
+
+    @memoized
     def get_simulation_matrix(self, filters: CostFilters) -> list[dict[str, Any]]:
+        source = self._cost_source(filters.start_date, filters.end_date, filters)
         stmt = self._base_cost_entry_stmt(
             select(
                 CostCenter.id.label("cost_center_id"),
                 CostCenter.name.label("cost_center_name"),
                 Category.id.label("category_id"),
                 Category.name.label("category_name"),
-                func.coalesce(func.sum(CostEntry.amount), 0).label("total_amount"),
-            )
+                func.coalesce(func.sum(source.c.amount), 0).label("total_amount"),
+            ),
+            source,
         )
-        stmt = self._apply_filters(stmt, filters)
         stmt = stmt.group_by(CostCenter.id, CostCenter.name, Category.id, Category.name).order_by(CostCenter.name, Category.name)
         rows = self.db.execute(stmt).all()
         return [
@@ -84,17 +244,18 @@ class CostRepository:
             for row in rows
         ]
 
+    @memoized
     def get_bucket_totals(self, start_date: date, end_date: date) -> list[dict[str, Any]]:
+        source = self._cost_source(start_date, end_date)
         stmt = (
             select(
                 CostCenter.name.label("cost_center"),
                 Category.name.label("category"),
-                func.coalesce(func.sum(CostEntry.amount), 0).label("total_amount"),
+                func.coalesce(func.sum(source.c.amount), 0).label("total_amount"),
             )
-            .select_from(CostEntry)
-            .join(CostCenter, CostCenter.id == CostEntry.cost_center_id)
-            .join(Category, Category.id == CostEntry.category_id)
-            .where(CostEntry.reference_date.between(start_date, end_date))
+            .select_from(source)
+            .join(CostCenter, CostCenter.id == source.c.cost_center_id)
+            .join(Category, Category.id == source.c.category_id)
             .group_by(CostCenter.name, Category.name)
         )
         rows = self.db.execute(stmt).all()
@@ -107,19 +268,66 @@ class CostRepository:
             for row in rows
         ]
 
+    @memoized
+    def get_waste_ranking_buckets(
+        self,
+        previous_start: date,
+        period_start: date,
+        period_end: date,
+        top_n: int,
+    ) -> list[dict[str, Any]]:
+        """Current vs previous period totals per (cost center, category) in one scan of the combined span.
+
+        Only buckets with spend in the current period are ranked, by estimated waste
+        (growth over the previous period, floored at zero), and limited to ``top_n``.
+        """
+        source = self._cost_source(previous_start, period_end, split_dates=(period_start,))
+        in_current = source.c.reference_date >= period_start
+        current_total = func.coalesce(func.sum(source.c.amount).filter(in_current), 0)
+        previous_total = func.coalesce(func.sum(source.c.amount).filter(~in_current), 0)
+        estimated_waste = func.greatest(current_total - previous_total, 0).label("estimated_waste")
+        stmt = (
+            select(
+                CostCenter.name.label("cost_center"),
+                Category.name.label("category"),
+                previous_total.label("previous_total"),
+                current_total.label("current_total"),
+                estimated_waste,
+            )
+            .select_from(source)
+            .join(CostCenter, CostCenter.id == source.c.cost_center_id)
+            .join(Category, Category.id == source.c.category_id)
+            .group_by(CostCenter.name, Category.name)
+            .having(func.count().filter(in_current) > 0)
+            .order_by(estimated_waste.desc(), CostCenter.name, Category.name)
+            .limit(top_n)
+        )
+        rows = self.db.execute(stmt).all()
+        return [
+            {
+                "cost_center": row.cost_center,
+                "category": row.category,
+                "previous_total": float(row.previous_total or 0),
+                "current_total": float(row.current_total or 0),
+                "estimated_waste": float(row.estimated_waste or 0),
+            }
+            for row in rows
+        ]
+
+    @memoized
     def get_monthly_bucket_totals(self, start_date: date, end_date: date) -> list[dict[str, Any]]:
-        month_col = func.date_trunc("month", CostEntry.reference_date).cast(Date).label("month")
+        source = self._cost_source(start_date, end_date)
+        month_col = func.date_trunc("month", source.c.reference_date).cast(Date).label("month")
         stmt = (
             select(
                 month_col,
                 CostCenter.name.label("cost_center"),
                 Category.name.label("category"),
-                func.coalesce(func.sum(CostEntry.amount), 0).label("total_amount"),
+                func.coalesce(func.sum(source.c.amount), 0).label("total_amount"),
             )
-            .select_from(CostEntry)
-            .join(CostCenter, CostCenter.id == CostEntry.cost_center_id)
-            .join(Category, Category.id == CostEntry.category_id)
-            .where(CostEntry.reference_date.between(start_date, end_date))
+            .select_from(source)
+            .join(CostCenter, CostCenter.id == source.c.cost_center_id)
+            .join(Category, Category.id == source.c.category_id)
             .group_by(month_col, CostCenter.name, Category.name)
             .order_by(month_col, CostCenter.name, Category.name)
         )
@@ -134,6 +342,93 @@ class CostRepository:
             for row in rows
         ]
 
+    @memoized
+    def get_dashboard_buckets(
+        self,
+        start_date: date,
+        end_date: date,
+        segment_starts: tuple[date, ...] = (),
+    ) -> list[dict[str, Any]]:
+        """Monthly totals per (cost center, project, category) over the range, in one scan.
+
+        ``segment_starts`` split the range like ``_cost_source`` does and each row carries the
+        ``segment_start`` it falls in, so callers can re-aggregate any window ending at
+        ``end_date`` that starts on one of those dates.
+        """
+        boundaries = sorted(day for day in set(segment_starts) if start_date < day <= end_date)
+        starts = [start_date, *boundaries]
+        source = self._cost_source(start_date, end_date, split_dates=tuple(boundaries))
+        segment_col = case(
+            *[(source.c.reference_date >= day, index) for index, day in reversed(list(enumerate(boundaries, start=1)))],
+            else_=0,
+        ) if boundaries else literal(0)
+        segment_col = segment_col.label("segment")
+        # A constant is not grouped on: Postgres would read a bare integer in GROUP BY as a column position.
+        segment_group = [segment_col] if boundaries else []
+        month_col = func.date_trunc("month", source.c.reference_date).cast(Date).label("month")
+        stmt = self._base_cost_entry_stmt(
+            select(
+                segment_col,
+                month_col,
+                CostCenter.id.label("cost_center_id"),
+                CostCenter.name.label("cost_center"),
+                Project.name.label("project"),
+                Category.name.label("category"),
+                func.coalesce(func.sum(source.c.amount), 0).label("total_amount"),
+            ),
+            source,
+        )
+        stmt = stmt.group_by(*segment_group, month_col, CostCenter.id, CostCenter.name, Project.name, Category.name).order_by(
+            *segment_group, month_col, CostCenter.name, Category.name, Project.name
+        )
+        rows = self.db.execute(stmt).all()
+        return [
+            {
+                "segment_start": starts[row.segment],
+                "month": row.month,
+                "cost_center_id": row.cost_center_id,
+                "cost_center": row.cost_center,
+                "project": row.project,
+                "category": row.category,
+                "total_amount": float(row.total_amount or 0),
+            }
+            for row in rows
+        ]
+
+    @memoized
+    def get_planned_budget_by_center(self, start_date: date, end_date: date) -> list[dict[str, Any]]:
+        """Planned amount per cost center (zero when none), without the actuals side of ``get_budget_vs_actual_by_center``."""
+        budget_stmt = (
+            select(
+                BudgetEntry.cost_center_id.label("cost_center_id"),
+                func.coalesce(func.sum(BudgetEntry.planned_amount), 0).label("planned_amount"),
+            )
+            .where(BudgetEntry.month_date.between(start_date, end_date))
+            .where(BudgetEntry.cost_center_id.is_not(None))
+            .group_by(BudgetEntry.cost_center_id)
+            .subquery()
+        )
+        stmt = (
+            select(
+                CostCenter.id.label("cost_center_id"),
+                CostCenter.name.label("cost_center"),
+                func.coalesce(budget_stmt.c.planned_amount, 0).label("planned_amount"),
+            )
+            .select_from(CostCenter)
+            .outerjoin(budget_stmt, budget_stmt.c.cost_center_id == CostCenter.id)
+            .order_by(CostCenter.name)
+        )
+        rows = self.db.execute(stmt).all()
+        return [
+            {
+                "cost_center_id": row.cost_center_id,
+                "cost_center": row.cost_center,
+                "planned_amount": float(row.planned_amount or 0),
+            }
+            for row in rows
+        ]
+
+    @memoized
     def get_budget_vs_actual_by_center(
         self,
         start_date: date,
@@ -151,13 +446,13 @@ class CostRepository:
             .subquery()
         )
 
+        source = self._cost_source(start_date, end_date)
         actual_stmt = (
             select(
-                CostEntry.cost_center_id.label("cost_center_id"),
-                func.coalesce(func.sum(CostEntry.amount), 0).label("actual_amount"),
+                source.c.cost_center_id.label("cost_center_id"),
+                func.coalesce(func.sum(source.c.amount), 0).label("actual_amount"),
             )
-            .where(CostEntry.reference_date.between(start_date, end_date))
-            .group_by(CostEntry.cost_center_id)
+            .group_by(source.c.cost_center_id)
             .subquery()
         )
 
@@ -188,22 +483,120 @@ class CostRepository:
             for row in rows
         ]
 
+    def _cost_source(
+        self,
+        start_date: date,
+        end_date: date,
+        filters: CostFilters | None = None,
+        split_dates: tuple[date, ...] = (),
+    ) -> Subquery:
+        """Cost rows for the range: rollup rows for whole months, raw entries for partial edge months.
+
+        ``split_dates`` start new segments inside the range, so a rollup month never straddles a
+        boundary that callers filter on (e.g. the start of the current comparison period).
+        """
+        segment_starts = [start_date, *sorted(day for day in set(split_dates) if start_date < day <= end_date)]
+        segment_ends = [day - timedelta(days=1) for day in segment_starts[1:]] + [end_date]
+
+        raw_ranges: list[tuple[date, date]] = []
+        rollup_ranges: list[tuple[date, date]] = []
+        for segment_start, segment_end in zip(segment_starts, segment_ends):
+            full_months, edges = split_month_aligned_range(segment_start, segment_end)
+            if not self.use_rollup or full_months is None:
+                raw_ranges.append((segment_start, segment_end))
+                continue
+            rollup_ranges.append(full_months)
+            raw_ranges.extend(edges)
+
+        parts: list[Select[Any]] = []
+        for range_start, range_end in self._merge_adjacent_ranges(raw_ranges):
+            raw_stmt = select(
+                CostEntry.reference_date.label("reference_date"),
+                CostEntry.cost_center_id.label("cost_center_id"),
+                CostEntry.project_id.label("project_id"),
+                CostEntry.category_id.label("category_id"),
+                CostEntry.amount.label("amount"),
+            ).where(reference_date_between(CostEntry.reference_date, range_start, range_end))
+            parts.append(self._apply_filters(raw_stmt, filters, CostEntry))
+
+        for first_month, last_month in rollup_ranges:
+            rollup_stmt = select(
+                CostMonthlyRollup.month.label("reference_date"),
+                CostMonthlyRollup.cost_center_id.label("cost_center_id"),
+                CostMonthlyRollup.project_id.label("project_id"),
+                CostMonthlyRollup.category_id.label("category_id"),
+                CostMonthlyRollup.total_amount.label("amount"),
+            ).where(CostMonthlyRollup.month.between(first_month, last_month))
+            parts.append(self._apply_filters(rollup_stmt, filters, CostMonthlyRollup))
+
+        if len(parts) == 1:
+            return parts[0].subquery("cost_source")
+        return union_all(*parts).subquery("cost_source")
+
+    @staticmethod
+    def _merge_adjacent_ranges(ranges: list[tuple[date, date]]) -> list[tuple[date, date]]:
+        merged: list[tuple[date, date]] = []
+        for range_start, range_end in sorted(ranges):
+            if merged and range_start <= merged[-1][1] + timedelta(days=1):
+                merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+            else:
+                merged.append((range_start, range_end))
+        return merged
+
     @staticmethod
-    def _apply_filters(stmt: Select[Any], filters: CostFilters) -> Select[Any]:
-        stmt = stmt.where(CostEntry.reference_date.between(filters.start_date, filters.end_date))
+    def _apply_filters(
+        stmt: Select[Any],
+        filters: CostFilters | None,
+        table: type[CostEntry] | type[CostMonthlyRollup],
+    ) -> Select[Any]:
+        if filters is None:
+            return stmt
         if filters.cost_center_ids:
-            stmt = stmt.where(CostEntry.cost_center_id.in_(filters.cost_center_ids))
+            stmt = stmt.where(table.cost_center_id.in_(filters.cost_center_ids))
         if filters.project_ids:
-            stmt = stmt.where(CostEntry.project_id.in_(filters.project_ids))
+            stmt = stmt.where(table.project_id.in_(filters.project_ids))
         if filters.category_ids:
-            stmt = stmt.where(CostEntry.category_id.in_(filters.category_ids))
+            stmt = stmt.where(table.category_id.in_(filters.category_ids))
         return stmt
 
-    @staticmethod
-    def _base_cost_entry_stmt(stmt: Select[Any]) -> Select[Any]:
-        return (
-            stmt.select_from(CostEntry)
+    @classmethod
+    def _entry_listing_stmt(cls, filters: CostFilters) -> Select[Any]:
+        stmt = (
+            select(
+                CostEntry.id,
+                CostEntry.reference_date,
+                CostCenter.code.label("cost_center_code"),
+                Project.code.label("project_code"),
+                Category.code.label("category_code"),
+                CostEntry.amount,
+                CostEntry.currency,
+                CostEntry.description,
+                CostCenter.name.label("cost_center"),
+                Project.name.label("project"),
+                Category.name.label("category"),
+            )
             .join(CostCenter, CostCenter.id == CostEntry.cost_center_id)
             .join(Project, Project.id == CostEntry.project_id)
             .join(Category, Category.id == CostEntry.category_id)
+            .where(reference_date_between(CostEntry.reference_date, filters.start_date, filters.end_date))
+            .order_by(CostEntry.reference_date, CostEntry.id)
+        )
+        return cls._apply_filters(stmt, filters, CostEntry)
+
+    @staticmethod
+    def _dimension_columns(source: Subquery) -> dict[str, Any]:
+        return {
+            "month": func.date_trunc("month", source.c.reference_date).cast(Date).label("month"),
+            "cost_center": CostCenter.name.label("cost_center"),
+            "project": Project.name.label("project"),
+            "category": Category.name.label("category"),
+        }
+
+    @staticmethod
+    def _base_cost_entry_stmt(stmt: Select[Any], source: Subquery) -> Select[Any]:
+        return (
+            stmt.select_from(source)
+            .join(CostCenter, CostCenter.id == source.c.cost_center_id)
+            .join(Project, Project.id == source.c.project_id)
+            .join(Category, Category.id == source.c.category_id)
         )
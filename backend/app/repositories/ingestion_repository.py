@@ -0,0 +1,75 @@
+from collections.abc import Sequence
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.db.partitions import ensure_cost_entry_partitions
+from app.models.entities import Category, CostCenter, Project
+
+StagedCostEntry = tuple[int, int, int, date, Decimal, str, str | None, str]
+
+STAGING_COLUMNS = (
+    "cost_center_id",
+    "project_id",
+    "category_id",
+    "reference_date",
+    "amount",
+    "currency",
+    "description",
+    "content_hash",
+)
+
+
+class CostIngestionRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def load_dimension_codes(self) -> dict[str, dict[str, int]]:
+        return {
+            "cost_center": {row.code: row.id for row in self.db.execute(select(CostCenter.code, CostCenter.id)).all()},
+            "project": {row.code: row.id for row in self.db.execute(select(Project.code, Project.id)).all()},
+            "category": {row.code: row.id for row in self.db.execute(select(Category.code, Category.id)).all()},
+        }
+
+    def ensure_partitions(self, first_date: date, last_date: date) -> int:
+        return ensure_cost_entry_partitions(self.db, first_date, last_date)
+
+    def copy_entries(self, rows: Sequence[StagedCostEntry]) -> int:
+        """COPY a batch into a staging table and move it into cost_entries, skipping known content hashes.
+
+        Each batch commits on its own, so an interrupted load keeps its progress and a re-run only
+        inserts the rows that are still missing.
+        """
+        if not rows:
+            return 0
+        columns = ", ".join(STAGING_COLUMNS)
+        try:
+            self.db.execute(
+                text(
+                    "CREATE TEMP TABLE IF NOT EXISTS cost_entries_staging ("
+                    "cost_center_id INTEGER, project_id INTEGER, category_id INTEGER, reference_date DATE, "
+                    "amount NUMERIC(14, 2), currency CHAR(3), description TEXT, content_hash CHAR(64)"
+                    ") ON COMMIT DELETE ROWS"
+                )
+            )
+            driver_connection: Any = self.db.connection().connection.dbapi_connection
+            with driver_connection.cursor() as cursor:
+                with cursor.copy(f"COPY cost_entries_staging ({columns}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+            result = self.db.execute(
+                text(
+                    f"INSERT INTO cost_entries ({columns}) "
+                    f"SELECT {columns} FROM cost_entries_staging "
+                    "ON CONFLICT (content_hash, reference_date) DO NOTHING"
+                )
+            )
+            inserted = max(0, result.rowcount or 0)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return inserted
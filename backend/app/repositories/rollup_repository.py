@@ -0,0 +1,91 @@
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import Date, delete, func, insert, literal, select, union
+from sqlalchemy.orm import Session
+
+from app.models.entities import CostEntry, CostMonthlyRollup, CostRollupDirtyMonth
+from app.repositories.cost_repository import reference_date_between
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+class CostRollupRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def refresh_months(self, months: Iterable[date]) -> int:
+        """Rebuild the rollup rows of each given month from raw entries in a single transaction."""
+        affected = sorted({month_start(month) for month in months})
+        written = 0
+        try:
+            for month in affected:
+                next_month = month + relativedelta(months=1)
+                # Cleared before the rebuild reads cost_entries: a concurrent writer either committed
+                # already (and is read below) or re-marks the month once this transaction commits.
+                self.db.execute(delete(CostRollupDirtyMonth).where(CostRollupDirtyMonth.month == month))
+                self.db.execute(delete(CostMonthlyRollup).where(CostMonthlyRollup.month == month))
+                source = (
+                    select(
+                        literal(month, Date).label("month"),
+                        CostEntry.cost_center_id,
+                        CostEntry.project_id,
+                        CostEntry.category_id,
+                        CostEntry.currency,
+                        func.sum(CostEntry.amount).label("total_amount"),
+                        func.count().label("entry_count"),
+                    )
+                    .where(reference_date_between(CostEntry.reference_date, month, next_month - timedelta(days=1)))
+                    .group_by(CostEntry.cost_center_id, CostEntry.project_id, CostEntry.category_id, CostEntry.currency)
+                )
+                result = self.db.execute(
+                    insert(CostMonthlyRollup).from_select(
+                        ["month", "cost_center_id", "project_id", "category_id", "currency", "total_amount", "entry_count"],
+                        source,
+                    )
+                )
+                written += max(0, result.rowcount or 0)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return written
+
+    def find_stale_months(self) -> list[date]:
+        """Months marked by the ``cost_entries`` triggers (inserts, updates, deletes), plus months whose
+        raw entries were created after the month was last rolled up (or never rolled up)."""
+        month_col = func.date_trunc("month", CostEntry.reference_date).cast(Date)
+        refreshed = (
+            select(CostMonthlyRollup.month, func.max(CostMonthlyRollup.refreshed_at).label("refreshed_at"))
+            .group_by(CostMonthlyRollup.month)
+            .subquery()
+        )
+        raw = (
+            select(month_col.label("month"), func.max(CostEntry.created_at).label("last_created_at"))
+            .group_by(month_col)
+            .subquery()
+        )
+        created_after_refresh = (
+            select(raw.c.month)
+            .select_from(raw)
+            .outerjoin(refreshed, refreshed.c.month == raw.c.month)
+            .where((refreshed.c.refreshed_at.is_(None)) | (raw.c.last_created_at > refreshed.c.refreshed_at))
+        )
+        stmt = union(created_after_refresh, select(CostRollupDirtyMonth.month)).subquery()
+        return [row.month for row in self.db.execute(select(stmt.c.month).order_by(stmt.c.month)).all()]
+
+    def list_dirty_months(self) -> list[date]:
+        stmt = select(CostRollupDirtyMonth.month).order_by(CostRollupDirtyMonth.month)
+        return [row.month for row in self.db.execute(stmt).all()]
+
+    def list_rolled_up_months(self) -> list[date]:
+        stmt = select(CostMonthlyRollup.month).distinct().order_by(CostMonthlyRollup.month)
+        return [row.month for row in self.db.execute(stmt).all()]
+
+    def list_raw_months(self) -> list[date]:
+        month_col = func.date_trunc("month", CostEntry.reference_date).cast(Date)
+        stmt = select(month_col.label("month")).group_by(month_col).order_by(month_col)
+        return [row.month for row in self.db.execute(stmt).all()]
@@ -1,40 +1,68 @@
 from app.schemas.analytics import AnomalyDetectionResponse, AnomalyItem, WasteRankingItem, WasteRankingResponse
+from app.schemas.batch import BatchRequest, BatchResponse, BatchResultItem, BatchSubRequest
 from app.schemas.budgets import BudgetVarianceItem, BudgetVarianceResponse
+from app.schemas.cache import CacheInvalidationRequest, CacheInvalidationResponse
 from app.schemas.costs import CostAggregateItem, CostAggregateResponse, CostFilters, CostOverviewResponse, DimensionItem
+from app.schemas.dashboard import DashboardResponse
 from app.schemas.opportunities import QuickWinOpportunity, QuickWinsResponse
 from app.schemas.simulations import (
+    CategoryCutBound,
+    CenterCutBound,
     CutByCategory,
     CutByCenter,
     ImpactRankingItem,
+    SavingsTargetRequest,
+    SavingsTargetResponse,
     SimulationComparisonItem,
     SimulationComparisonRequest,
     SimulationComparisonResponse,
     SimulationRequest,
     SimulationScenarioInput,
     SimulationResponse,
+    SimulationSessionPatch,
+    SimulationSessionResponse,
+    SimulationSweepRequest,
+    SimulationSweepResponse,
+    SweepAxis,
 )
 
 __all__ = [
     "AnomalyDetectionResponse",
     "AnomalyItem",
+    "BatchRequest",
+    "BatchResponse",
+    "BatchResultItem",
+    "BatchSubRequest",
     "BudgetVarianceItem",
     "BudgetVarianceResponse",
+    "CacheInvalidationRequest",
+    "CacheInvalidationResponse",
+    "CategoryCutBound",
+    "CenterCutBound",
     "CostAggregateItem",
     "CostAggregateResponse",
     "CostFilters",
     "CostOverviewResponse",
     "CutByCategory",
     "CutByCenter",
+    "DashboardResponse",
     "DimensionItem",
     "ImpactRankingItem",
     "QuickWinOpportunity",
     "QuickWinsResponse",
+    "SavingsTargetRequest",
+    "SavingsTargetResponse",
     "SimulationComparisonItem",
     "SimulationComparisonRequest",
     "SimulationComparisonResponse",
     "SimulationRequest",
     "SimulationScenarioInput",
     "SimulationResponse",
+    "SimulationSessionPatch",
+    "SimulationSessionResponse",
+    "SimulationSweepRequest",
+    "SimulationSweepResponse",
+    "SweepAxis",
     "WasteRankingItem",
     "WasteRankingResponse",
 ]
@@ -0,0 +1,27 @@
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+QueryValue = str | int | float | bool | list[str | int | float | bool]
+
+
+class BatchSubRequest(BaseModel):
+    id: str | None = Field(default=None, max_length=100, description="Echoed back in the matching result.")
+    path: str = Field(pattern=r"^/[^/]", max_length=2000, description="GET route under the API prefix, query string allowed.")
+    params: dict[str, QueryValue] = Field(default_factory=dict, description="Query parameters; lists repeat the parameter.")
+    headers: dict[str, str] = Field(default_factory=dict, description="Extra headers for this call, e.g. If-None-Match.")
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchSubRequest] = Field(min_length=1)
+
+
+class BatchResultItem(BaseModel):
+    id: str | None = None
+    status: int
+    etag: str | None = None
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    results: list[BatchResultItem]
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+from app.core.cache import DataDomain
+
+
+class CacheInvalidationRequest(BaseModel):
+    domains: list[DataDomain] = Field(default_factory=list, description="Domains to invalidate; all when empty.")
+
+
+class CacheInvalidationResponse(BaseModel):
+    generations: dict[str, int]
@@ -33,6 +33,26 @@ class DimensionItem(BaseModel):
     name: str
 
 
+class CostEntryItem(BaseModel):
+    id: int
+    reference_date: date
+    cost_center_code: str
+    project_code: str
+    category_code: str
+    cost_center: str
+    project: str
+    category: str
+    amount: float
+    currency: str
+    description: str | None = None
+
+
+class CostEntryPage(BaseModel):
+    items: list[CostEntryItem]
+    limit: int
+    next_cursor: str | None = None
+
+
 class CostFilters(BaseModel):
     start_date: date
     end_date: date
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from datetime import date
+
+from pydantic import BaseModel
+
+from app.schemas.analytics import AnomalyDetectionResponse, WasteRankingResponse
+from app.schemas.budgets import BudgetVarianceResponse
+from app.schemas.costs import CostOverviewResponse
+from app.schemas.opportunities import QuickWinsResponse
+
+
+class DashboardResponse(BaseModel):
+    period_start: date
+    period_end: date
+    overview: CostOverviewResponse
+    waste_ranking: WasteRankingResponse
+    anomalies: AnomalyDetectionResponse
+    quick_wins: QuickWinsResponse
+    budget_variance: BudgetVarianceResponse
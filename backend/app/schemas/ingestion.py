@@ -0,0 +1,55 @@
+from datetime import date
+from decimal import Decimal
+from typing import Literal
+
+from pydantic import BaseModel, Field, field_validator
+
+IngestionFormat = Literal["csv", "ndjson"]
+
+
+class CostEntryIngestRow(BaseModel):
+    cost_center_code: str = Field(min_length=1, max_length=32)
+    project_code: str = Field(min_length=1, max_length=32)
+    category_code: str = Field(min_length=1, max_length=32)
+    reference_date: date
+    amount: Decimal = Field(ge=0, max_digits=14, decimal_places=2)
+    currency: str = Field(default="BRL", min_length=3, max_length=3)
+    description: str | None = None
+
+    @field_validator("cost_center_code", "project_code", "category_code", mode="before")
+    @classmethod
+    def strip_code(cls, value: object) -> object:
+        return value.strip() if isinstance(value, str) else value
+
+    @field_validator("currency", mode="before")
+    @classmethod
+    def normalize_currency(cls, value: object) -> object:
+        if value is None or value == "":
+            return "BRL"
+        return value.strip().upper() if isinstance(value, str) else value
+
+    @field_validator("description", mode="before")
+    @classmethod
+    def empty_description_to_none(cls, value: object) -> object:
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
+
+class IngestionRowError(BaseModel):
+    line: int
+    error: str
+
+
+class IngestionReport(BaseModel):
+    format: IngestionFormat
+    rows_read: int
+    rows_valid: int
+    rows_rejected: int
+    rows_inserted: int
+    rows_duplicated: int
+    batches: int
+    elapsed_seconds: float
+    rows_per_second: float
+    months_refreshed: list[date]
+    errors: list[IngestionRowError]
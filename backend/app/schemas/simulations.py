@@ -1,7 +1,13 @@
+import math
 from datetime import date
+from typing import Literal
 
 from pydantic import BaseModel, Field, model_validator
 
+SweepTarget = Literal["cost_center", "category"]
+
+MAX_SWEEP_SCENARIOS = 20000
+
 
 class CutByCenter(BaseModel):
     cost_center_id: int
@@ -78,6 +84,123 @@ class SimulationComparisonRequest(BaseModel):
         return self
 
 
+class SweepAxis(BaseModel):
+    target: SweepTarget
+    entity_ids: list[int] = Field(min_length=1, max_length=10000)
+    percent_from: float = Field(default=0, ge=0, le=100)
+    percent_to: float = Field(ge=0, le=100)
+    percent_step: float = Field(gt=0, le=100)
+    label: str | None = Field(default=None, max_length=80)
+
+    @model_validator(mode="after")
+    def validate_axis(self) -> "SweepAxis":
+        if self.percent_from > self.percent_to:
+            raise ValueError("percent_from must be <= percent_to")
+        if len(self.entity_ids) != len(set(self.entity_ids)):
+            raise ValueError("entity_ids must not contain duplicates.")
+        return self
+
+    @property
+    def value_count(self) -> int:
+        return math.floor((self.percent_to - self.percent_from) / self.percent_step + 1e-9) + 1
+
+    def percent_values(self) -> list[float]:
+        return [round(self.percent_from + self.percent_step * step, 6) for step in range(self.value_count)]
+
+
+class SimulationSweepRequest(BaseModel):
+    start_date: date
+    end_date: date
+    center_cuts: list[CutByCenter] = Field(default_factory=list)
+    category_cuts: list[CutByCategory] = Field(default_factory=list)
+    axes: list[SweepAxis] = Field(min_length=1, max_length=4)
+
+    @model_validator(mode="after")
+    def validate_request(self) -> "SimulationSweepRequest":
+        if self.start_date > self.end_date:
+            raise ValueError("start_date must be <= end_date")
+
+        center_ids = [cut.cost_center_id for cut in self.center_cuts]
+        if len(center_ids) != len(set(center_ids)):
+            raise ValueError("center_cuts must not contain duplicate cost_center_id values.")
+
+        category_ids = [cut.category_id for cut in self.category_cuts]
+        if len(category_ids) != len(set(category_ids)):
+            raise ValueError("category_cuts must not contain duplicate category_id values.")
+
+        for target in ("cost_center", "category"):
+            swept = [entity_id for axis in self.axes if axis.target == target for entity_id in axis.entity_ids]
+            if len(swept) != len(set(swept)):
+                raise ValueError(f"A {target} can be swept by only one axis.")
+
+        if self.scenario_count > MAX_SWEEP_SCENARIOS:
+            raise ValueError(f"The sweep grid has {self.scenario_count} scenarios; the limit is {MAX_SWEEP_SCENARIOS}.")
+        return self
+
+    @property
+    def scenario_count(self) -> int:
+        return math.prod(axis.value_count for axis in self.axes)
+
+
+class SimulationSessionPatch(BaseModel):
+    center_cuts: list[CutByCenter] = Field(default_factory=list)
+    category_cuts: list[CutByCategory] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def validate_patch(self) -> "SimulationSessionPatch":
+        if not (self.center_cuts or self.category_cuts):
+            raise ValueError("At least one cut (center or category) must be changed.")
+
+        center_ids = [cut.cost_center_id for cut in self.center_cuts]
+        if len(center_ids) != len(set(center_ids)):
+            raise ValueError("center_cuts must not contain duplicate cost_center_id values.")
+
+        category_ids = [cut.category_id for cut in self.category_cuts]
+        if len(category_ids) != len(set(category_ids)):
+            raise ValueError("category_cuts must not contain duplicate category_id values.")
+        return self
+
+
+class CenterCutBound(BaseModel):
+    cost_center_id: int
+    max_percent_cut: float = Field(ge=0, le=100)
+    weight: float = Field(default=1.0, gt=0)
+
+
+class CategoryCutBound(BaseModel):
+    category_id: int
+    max_percent_cut: float = Field(ge=0, le=100)
+    weight: float = Field(default=1.0, gt=0)
+
+
+class SavingsTargetRequest(BaseModel):
+    start_date: date
+    end_date: date
+    target_savings: float = Field(gt=0)
+    center_bounds: list[CenterCutBound] = Field(default_factory=list)
+    category_bounds: list[CategoryCutBound] = Field(default_factory=list)
+    default_center_max_percent: float = Field(default=0, ge=0, le=100)
+    default_category_max_percent: float = Field(default=0, ge=0, le=100)
+
+    @model_validator(mode="after")
+    def validate_request(self) -> "SavingsTargetRequest":
+        if self.start_date > self.end_date:
+            raise ValueError("start_date must be <= end_date")
+
+        center_ids = [bound.cost_center_id for bound in self.center_bounds]
+        if len(center_ids) != len(set(center_ids)):
+            raise ValueError("center_bounds must not contain duplicate cost_center_id values.")
+
+        category_ids = [bound.category_id for bound in self.category_bounds]
+        if len(category_ids) != len(set(category_ids)):
+            raise ValueError("category_bounds must not contain duplicate category_id values.")
+
+        has_bound = any(bound.max_percent_cut > 0 for bound in [*self.center_bounds, *self.category_bounds])
+        if not (has_bound or self.default_center_max_percent > 0 or self.default_category_max_percent > 0):
+            raise ValueError("At least one positive cut bound (or default bound) must be provided.")
+        return self
+
+
 class ImpactRankingItem(BaseModel):
     entity_id: int
     entity_name: str
@@ -110,3 +233,48 @@ class SimulationComparisonResponse(BaseModel):
     period_end: date
     best_scenario: str | None = None
     items: list[SimulationComparisonItem]
+
+
+class SimulationSweepResponse(BaseModel):
+    """Columnar sweep results: entry ``i`` of every list describes scenario ``i``."""
+
+    period_start: date
+    period_end: date
+    baseline_total: float
+    scenario_count: int
+    axes: list[str]
+    percent_cuts: list[list[float]]
+    projected_total: list[float]
+    estimated_savings: list[float]
+    impact_percent: list[float]
+    best_scenario_index: int | None = None
+
+
+class SavingsTargetResponse(BaseModel):
+    period_start: date
+    period_end: date
+    target_savings: float
+    target_met: bool
+    baseline_total: float
+    projected_total: float
+    estimated_savings: float
+    impact_percent: float
+    disruption: float
+    center_cuts: list[CutByCenter]
+    category_cuts: list[CutByCategory]
+
+
+class SimulationSessionResponse(BaseModel):
+    session_id: str
+    period_start: date
+    period_end: date
+    baseline_total: float
+    projected_total: float
+    estimated_savings: float
+    impact_percent: float
+    changed_centers: int
+    changed_categories: int
+    center_cuts: list[CutByCenter]
+    category_cuts: list[CutByCategory]
+    center_impact_ranking: list[ImpactRankingItem]
+    category_impact_ranking: list[ImpactRankingItem]
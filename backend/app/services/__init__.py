@@ -1,6 +1,9 @@
 from app.services.analytics_service import AnalyticsService
 from app.services.budget_service import BudgetService
 from app.services.cost_service import CostService
+from app.services.dashboard_service import DashboardService
+from app.services.export_service import CostExportService
+from app.services.ingestion_service import CostIngestionService
 from app.services.simulation_service import SimulationService
 
-__all__ = ["AnalyticsService", "BudgetService", "CostService", "SimulationService"]
+__all__ = ["AnalyticsService", "BudgetService", "CostExportService", "CostIngestionService", "CostService", "DashboardService", "SimulationService"]
@@ -5,14 +5,25 @@ from datetime import date, timedelta
 from statistics import fmean, pstdev
 from typing import Any
 
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
 from app.repositories.cost_repository import CostRepository
 from app.schemas.analytics import AnomalyDetectionResponse, AnomalyItem, WasteRankingItem, WasteRankingResponse
 from app.schemas.opportunities import QuickWinOpportunity, QuickWinsResponse
+from app.services.bucket_series import BucketSeries
+
+# Relative slack when pre-filtering on float64 array results; every candidate is then
+# re-checked with the exact statistics used by the reference path.
+_FLOAT_TOLERANCE = 1e-9
 
 
 class AnalyticsService:
-    def __init__(self, repository: CostRepository) -> None:
+    """Analytics reports, each split like ``CostService``: a ``*_rows`` fetch and a ``*_from_rows`` build."""
+
+    def __init__(self, repository: CostRepository | None = None, vectorized: bool = True) -> None:
         self.repository = repository
+        self.vectorized = vectorized
 
     def waste_ranking(
         self,
@@ -21,20 +32,40 @@ class AnalyticsService:
         comparison_period_days: int | None = None,
         top_n: int = 10,
     ) -> WasteRankingResponse:
-        days = comparison_period_days or max(30, (period_end - period_start).days + 1)
-        previous_end = period_start - timedelta(days=1)
-        previous_start = previous_end - timedelta(days=days - 1)
+        rows = self.waste_ranking_rows(period_start, period_end, comparison_period_days, top_n)
+        return self.waste_ranking_from_rows(period_start, period_end, rows)
 
-        current_data = self.repository.get_bucket_totals(period_start, period_end)
-        previous_data = self.repository.get_bucket_totals(previous_start, previous_end)
-        previous_map = {(item["cost_center"], item["category"]): item["total_amount"] for item in previous_data}
+    def waste_ranking_rows(
+        self,
+        period_start: date,
+        period_end: date,
+        comparison_period_days: int | None = None,
+        top_n: int = 10,
+    ) -> list[dict[str, Any]]:
+        return self.repository.get_waste_ranking_buckets(
+            previous_start=self.comparison_start(period_start, period_end, comparison_period_days),
+            period_start=period_start,
+            period_end=period_end,
+            top_n=top_n,
+        )
 
+    @staticmethod
+    def comparison_start(period_start: date, period_end: date, comparison_period_days: int | None = None) -> date:
+        """First day of the period ``waste_ranking`` compares against."""
+        days = comparison_period_days or max(30, (period_end - period_start).days + 1)
+        return period_start - timedelta(days=days)
+
+    def waste_ranking_from_rows(
+        self,
+        period_start: date,
+        period_end: date,
+        rows: list[dict[str, Any]],
+    ) -> WasteRankingResponse:
+        """Builds the ranking from ``get_waste_ranking_buckets``-shaped rows (already ranked and limited)."""
         ranking: list[WasteRankingItem] = []
-        for row in current_data:
-            key = (row["cost_center"], row["category"])
-            current_total = row["total_amount"]
-            previous_total = previous_map.get(key, 0.0)
-            estimated_waste = max(0.0, current_total - previous_total)
+        for row in rows:
+            current_total = row["current_total"]
+            previous_total = row["previous_total"]
             variation_percent = ((current_total - previous_total) / previous_total * 100) if previous_total else 100.0
             ranking.append(
                 WasteRankingItem(
@@ -42,13 +73,12 @@ class AnalyticsService:
                     category=row["category"],
                     previous_period_total=round(previous_total, 2),
                     current_period_total=round(current_total, 2),
-                    estimated_waste=round(estimated_waste, 2),
+                    estimated_waste=round(row["estimated_waste"], 2),
                     variation_percent=round(variation_percent, 2),
                 )
             )
 
-        ranking.sort(key=lambda item: item.estimated_waste, reverse=True)
-        return WasteRankingResponse(period_start=period_start, period_end=period_end, items=ranking[:top_n])
+        return WasteRankingResponse(period_start=period_start, period_end=period_end, items=ranking)
 
     def detect_anomalies(
         self,
@@ -58,7 +88,68 @@ class AnalyticsService:
         history_window: int = 4,
         top_n: int = 20,
     ) -> AnomalyDetectionResponse:
-        data = self.repository.get_monthly_bucket_totals(period_start, period_end)
+        data = self.monthly_rows(period_start, period_end)
+        return self.anomalies_from_rows(period_start, period_end, data, threshold_z, history_window, top_n)
+
+    def monthly_rows(self, period_start: date, period_end: date) -> list[dict[str, Any]]:
+        """Month x center x category totals, the input of ``anomalies_from_rows`` and ``quick_wins_from_rows``."""
+        return self.repository.get_monthly_bucket_totals(period_start, period_end)
+
+    def anomalies_from_rows(
+        self,
+        period_start: date,
+        period_end: date,
+        data: list[dict[str, Any]],
+        threshold_z: float = 2.0,
+        history_window: int = 4,
+        top_n: int = 20,
+    ) -> AnomalyDetectionResponse:
+        """``detect_anomalies`` over ``get_monthly_bucket_totals``-shaped rows."""
+        if self.vectorized:
+            anomalies = self._anomalies_vectorized(data, threshold_z, history_window, top_n)
+        else:
+            anomalies = self._anomalies_python(data, threshold_z, history_window)
+
+        anomalies.sort(key=lambda item: item.z_score, reverse=True)
+        return AnomalyDetectionResponse(
+            period_start=period_start,
+            period_end=period_end,
+            threshold_z=threshold_z,
+            items=anomalies[:top_n],
+        )
+
+    @staticmethod
+    def _anomaly_item(
+        month: date,
+        cost_center: str,
+        category: str,
+        current_amount: float,
+        history: list[float],
+        threshold_z: float,
+    ) -> AnomalyItem | None:
+        mean_value = fmean(history)
+        std_value = pstdev(history)
+        if std_value == 0:
+            return None
+        z_score = (current_amount - mean_value) / std_value
+        if z_score < threshold_z or current_amount <= mean_value:
+            return None
+        return AnomalyItem(
+            month=month,
+            cost_center=cost_center,
+            category=category,
+            amount=round(current_amount, 2),
+            baseline_mean=round(mean_value, 2),
+            baseline_std=round(std_value, 2),
+            z_score=round(z_score, 2),
+        )
+
+    def _anomalies_python(
+        self,
+        data: list[dict[str, Any]],
+        threshold_z: float,
+        history_window: int,
+    ) -> list[AnomalyItem]:
         grouped: dict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
         for item in data:
             grouped[(item["cost_center"], item["category"])].append(item)
@@ -72,32 +163,69 @@ class AnalyticsService:
                 history = amounts[max(0, idx - history_window) : idx]
                 if len(history) < 2:
                     continue
-                mean_value = fmean(history)
-                std_value = pstdev(history)
-                if std_value == 0:
-                    continue
-                current_amount = amounts[idx]
-                z_score = (current_amount - mean_value) / std_value
-                if z_score >= threshold_z and current_amount > mean_value:
-                    anomalies.append(
-                        AnomalyItem(
-                            month=series[idx]["month"],
-                            cost_center=cost_center,
-                            category=category,
-                            amount=round(current_amount, 2),
-                            baseline_mean=round(mean_value, 2),
-                            baseline_std=round(std_value, 2),
-                            z_score=round(z_score, 2),
-                        )
-                    )
+                item = self._anomaly_item(series[idx]["month"], cost_center, category, amounts[idx], history, threshold_z)
+                if item is not None:
+                    anomalies.append(item)
+        return anomalies
 
-        anomalies.sort(key=lambda item: item.z_score, reverse=True)
-        return AnomalyDetectionResponse(
-            period_start=period_start,
-            period_end=period_end,
-            threshold_z=threshold_z,
-            items=anomalies[:top_n],
-        )
+    def _anomalies_vectorized(
+        self,
+        data: list[dict[str, Any]],
+        threshold_z: float,
+        history_window: int,
+        top_n: int,
+    ) -> list[AnomalyItem]:
+        """Rolling mean/std/z for every bucket at once over the bucket x month matrix.
+
+        Float64 z-scores select and rank candidates; only the candidates that can reach the
+        top ``top_n`` are confirmed with ``fmean``/``pstdev``, so the reported rows, values and
+        tie order are identical to the per-bucket loop. Constant windows are excluded exactly
+        via max == min.
+        """
+        if history_window < 2 or top_n <= 0 or not data:
+            return []
+        series = BucketSeries.from_rows(data)
+        width = series.amounts.shape[1]
+        if width <= history_window:
+            return []
+
+        windows = sliding_window_view(series.amounts, history_window, axis=1)[:, : width - history_window]
+        current = series.amounts[:, history_window:]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = windows.mean(axis=2)
+            stds = windows.std(axis=2)
+            z_scores = (current - means) / stds
+        in_range = np.arange(history_window, width)[None, :] < series.lengths[:, None]
+        varying = windows.max(axis=2) > windows.min(axis=2)
+        slack = _FLOAT_TOLERANCE * max(1.0, abs(threshold_z))
+        candidates = np.flatnonzero(in_range & varying & (z_scores >= threshold_z - slack))
+
+        # Row-major candidate order is the loop's emission order and breaks ties in the ranking.
+        candidate_z = z_scores.ravel()[candidates]
+        confirmed: list[tuple[int, AnomalyItem]] = []
+        cutoff: float | None = None
+        for sequence in np.argsort(-candidate_z, kind="stable"):
+            if cutoff is not None and candidate_z[sequence] < cutoff - 0.01:
+                break
+            bucket, column = divmod(int(candidates[sequence]), width - history_window)
+            position = column + history_window
+            cost_center, category = series.keys[bucket]
+            item = self._anomaly_item(
+                series.month(bucket, position),
+                cost_center,
+                category,
+                float(series.amounts[bucket, position]),
+                series.amounts[bucket, column:position].tolist(),
+                threshold_z,
+            )
+            if item is None:
+                continue
+            confirmed.append((int(sequence), item))
+            if cutoff is None and len(confirmed) == top_n:
+                cutoff = min(found.z_score for _, found in confirmed)
+
+        confirmed.sort(key=lambda entry: (-entry[1].z_score, entry[0]))
+        return [item for _, item in confirmed[:top_n]]
 
     def quick_wins(
         self,
@@ -107,55 +235,149 @@ class AnalyticsService:
         minimum_total: float = 10000.0,
         top_n: int = 10,
     ) -> QuickWinsResponse:
-        monthly_data = self.repository.get_monthly_bucket_totals(period_start, period_end)
+        monthly_data = self.monthly_rows(period_start, period_end)
+        return self.quick_wins_from_rows(period_start, period_end, monthly_data, target_reduction_percent, minimum_total, top_n)
+
+    def quick_wins_from_rows(
+        self,
+        period_start: date,
+        period_end: date,
+        monthly_data: list[dict[str, Any]],
+        target_reduction_percent: float = 8.0,
+        minimum_total: float = 10000.0,
+        top_n: int = 10,
+    ) -> QuickWinsResponse:
+        """``quick_wins`` over ``get_monthly_bucket_totals``-shaped rows."""
+        portfolio_total = sum(item["total_amount"] for item in monthly_data)
+        if self.vectorized:
+            items = self._quick_wins_vectorized(monthly_data, portfolio_total, target_reduction_percent, minimum_total, top_n)
+        else:
+            items = self._quick_wins_python(monthly_data, portfolio_total, target_reduction_percent, minimum_total, top_n)
+        return QuickWinsResponse(
+            period_start=period_start,
+            period_end=period_end,
+            target_reduction_percent=target_reduction_percent,
+            minimum_total=minimum_total,
+            items=items,
+        )
+
+    @staticmethod
+    def _quick_win_metrics(
+        amounts: list[float],
+        portfolio_total: float,
+        target_reduction_percent: float,
+    ) -> tuple[float, dict[str, float]]:
+        period_total = sum(amounts)
+        monthly_average = period_total / max(1, len(amounts))
+        latest_amount = amounts[-1] if amounts else 0.0
+        baseline_samples = amounts[:-1] if len(amounts) > 1 else amounts
+        baseline_average = fmean(baseline_samples) if baseline_samples else 0.0
+        trend_percent = ((latest_amount - baseline_average) / baseline_average * 100) if baseline_average else 0.0
+
+        std = pstdev(amounts) if len(amounts) > 1 else 0.0
+        volatility = (std / monthly_average * 100) if monthly_average else 0.0
+        concentration = (period_total / portfolio_total) if portfolio_total else 0.0
+
+        spend_score = min(55.0, concentration * 140)
+        trend_score = min(30.0, max(0.0, trend_percent) * 0.7)
+        volatility_score = min(15.0, volatility * 0.35)
+        return period_total, {
+            "period_total": round(period_total, 2),
+            "monthly_average": round(monthly_average, 2),
+            "trend_percent": round(trend_percent, 2),
+            "volatility": round(volatility, 2),
+            "opportunity_score": round(spend_score + trend_score + volatility_score, 2),
+            "estimated_savings": round(period_total * (target_reduction_percent / 100), 2),
+        }
+
+    def _quick_wins_python(
+        self,
+        monthly_data: list[dict[str, Any]],
+        portfolio_total: float,
+        target_reduction_percent: float,
+        minimum_total: float,
+        top_n: int,
+    ) -> list[QuickWinOpportunity]:
         grouped: dict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
         for item in monthly_data:
             grouped[(item["cost_center"], item["category"])].append(item)
 
-        portfolio_total = sum(item["total_amount"] for item in monthly_data)
         opportunities: list[QuickWinOpportunity] = []
-
         for (cost_center, category), rows in grouped.items():
             rows = sorted(rows, key=lambda item: item["month"])
             amounts = [row["total_amount"] for row in rows]
-            period_total = sum(amounts)
+            period_total, metrics = self._quick_win_metrics(amounts, portfolio_total, target_reduction_percent)
             if period_total < minimum_total:
                 continue
-
-            monthly_average = period_total / max(1, len(amounts))
-            latest_amount = amounts[-1] if amounts else 0.0
-            baseline_samples = amounts[:-1] if len(amounts) > 1 else amounts
-            baseline_average = fmean(baseline_samples) if baseline_samples else 0.0
-            trend_percent = ((latest_amount - baseline_average) / baseline_average * 100) if baseline_average else 0.0
-
-            std = pstdev(amounts) if len(amounts) > 1 else 0.0
-            volatility = (std / monthly_average * 100) if monthly_average else 0.0
-            concentration = (period_total / portfolio_total) if portfolio_total else 0.0
-
-            spend_score = min(55.0, concentration * 140)
-            trend_score = min(30.0, max(0.0, trend_percent) * 0.7)
-            volatility_score = min(15.0, volatility * 0.35)
-            opportunity_score = round(spend_score + trend_score + volatility_score, 2)
-            estimated_savings = round(period_total * (target_reduction_percent / 100), 2)
-
-            opportunities.append(
-                QuickWinOpportunity(
-                    cost_center=cost_center,
-                    category=category,
-                    period_total=round(period_total, 2),
-                    monthly_average=round(monthly_average, 2),
-                    trend_percent=round(trend_percent, 2),
-                    volatility=round(volatility, 2),
-                    opportunity_score=opportunity_score,
-                    estimated_savings=estimated_savings,
-                )
-            )
+            opportunities.append(QuickWinOpportunity(cost_center=cost_center, category=category, **metrics))
 
         opportunities.sort(key=lambda item: (item.opportunity_score, item.estimated_savings), reverse=True)
-        return QuickWinsResponse(
-            period_start=period_start,
-            period_end=period_end,
-            target_reduction_percent=target_reduction_percent,
-            minimum_total=minimum_total,
-            items=opportunities[:top_n],
+        return opportunities[:top_n]
+
+    def _quick_wins_vectorized(
+        self,
+        monthly_data: list[dict[str, Any]],
+        portfolio_total: float,
+        target_reduction_percent: float,
+        minimum_total: float,
+        top_n: int,
+    ) -> list[QuickWinOpportunity]:
+        """Scores every bucket with array operations and ranks with a partial sort.
+
+        Float64 scores only pick the shortlist: buckets within 0.02 of the ``top_n``-th score
+        (covering rounding and summation-order differences). The shortlist is rescored with the
+        reference metrics, so values and tie order match the loop, and models are built only for
+        the returned items.
+        """
+        if top_n <= 0 or not monthly_data:
+            return []
+        series = BucketSeries.from_rows(monthly_data)
+        amounts = series.amounts
+        lengths = series.lengths
+        rows = np.arange(len(lengths))
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            totals = np.nansum(amounts, axis=1)
+            monthly_average = totals / np.maximum(lengths, 1)
+            latest = amounts[rows, lengths - 1]
+            baseline = np.where(lengths > 1, (totals - latest) / np.maximum(lengths - 1, 1), latest)
+            trend = np.where(baseline != 0, (latest - baseline) / baseline * 100, 0.0)
+            std = np.where(lengths > 1, np.nanstd(amounts, axis=1), 0.0)
+            volatility = np.where(monthly_average != 0, std / monthly_average * 100, 0.0)
+            concentration = totals / portfolio_total if portfolio_total else np.zeros_like(totals)
+        scores = (
+            np.minimum(55.0, concentration * 140)
+            + np.minimum(30.0, np.maximum(0.0, trend) * 0.7)
+            + np.minimum(15.0, volatility * 0.35)
         )
+
+        eligible = np.flatnonzero(totals >= minimum_total - _FLOAT_TOLERANCE * max(1.0, abs(minimum_total)))
+        shortlist = eligible
+        if len(eligible) > top_n:
+            kth_score = -np.partition(-scores[eligible], top_n - 1)[top_n - 1]
+            shortlist = eligible[scores[eligible] >= kth_score - 0.02]
+
+        ranked = self._rank_quick_wins(series, shortlist, portfolio_total, target_reduction_percent, minimum_total)
+        if len(ranked) < top_n and len(shortlist) < len(eligible):
+            # A shortlisted bucket fell under minimum_total once summed exactly; widen to all.
+            ranked = self._rank_quick_wins(series, eligible, portfolio_total, target_reduction_percent, minimum_total)
+        return [
+            QuickWinOpportunity(cost_center=series.keys[bucket][0], category=series.keys[bucket][1], **metrics)
+            for bucket, metrics in ranked[:top_n]
+        ]
+
+    def _rank_quick_wins(
+        self,
+        series: BucketSeries,
+        buckets: np.ndarray,
+        portfolio_total: float,
+        target_reduction_percent: float,
+        minimum_total: float,
+    ) -> list[tuple[int, dict[str, float]]]:
+        ranked: list[tuple[int, dict[str, float]]] = []
+        for bucket in sorted(int(index) for index in buckets):
+            period_total, metrics = self._quick_win_metrics(series.values(bucket), portfolio_total, target_reduction_percent)
+            if period_total >= minimum_total:
+                ranked.append((bucket, metrics))
+        ranked.sort(key=lambda entry: (entry[1]["opportunity_score"], entry[1]["estimated_savings"]), reverse=True)
+        return ranked
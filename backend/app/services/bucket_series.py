@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+import numpy as np
+
+BucketKey = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class BucketSeries:
+    """Monthly totals per (cost_center, category) bucket as a dense bucket x month matrix.
+
+    Rows keep the order in which buckets first appear in the input. Each bucket's months are
+    sorted and left-aligned, so column ``j`` is the bucket's ``j``-th month with data (months
+    without data are skipped, not zero-filled); cells past ``lengths[b]`` are NaN padding.
+    """
+
+    keys: list[BucketKey]
+    amounts: np.ndarray
+    month_ordinals: np.ndarray
+    lengths: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict[str, Any]]) -> BucketSeries:
+        rows = list(rows)
+        row_keys = [(row["cost_center"], row["category"]) for row in rows]
+        bucket_index = {key: index for index, key in enumerate(dict.fromkeys(row_keys))}
+        codes = list(map(bucket_index.__getitem__, row_keys))
+        ordinals = [row["month"].toordinal() for row in rows]
+        values = [row["total_amount"] for row in rows]
+
+        bucket_codes = np.asarray(codes, dtype=np.int64)
+        month_ordinals = np.asarray(ordinals, dtype=np.int64)
+        lengths = np.bincount(bucket_codes, minlength=len(bucket_index))
+        width = int(lengths.max()) if len(lengths) else 0
+
+        order = np.lexsort((month_ordinals, bucket_codes))
+        sorted_codes = bucket_codes[order]
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(lengths) else lengths
+        positions = np.arange(len(order)) - starts[sorted_codes]
+
+        amounts = np.full((len(bucket_index), width), np.nan)
+        amounts[sorted_codes, positions] = np.asarray(values, dtype=np.float64)[order]
+        months = np.zeros((len(bucket_index), width), dtype=np.int64)
+        months[sorted_codes, positions] = month_ordinals[order]
+        return cls(keys=list(bucket_index), amounts=amounts, month_ordinals=months, lengths=lengths)
+
+    def month(self, bucket: int, position: int) -> date:
+        return date.fromordinal(int(self.month_ordinals[bucket, position]))
+
+    def values(self, bucket: int) -> list[float]:
+        return self.amounts[bucket, : self.lengths[bucket]].tolist()
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 from datetime import date
+from typing import Any
 
 from app.repositories.cost_repository import CostRepository
 from app.schemas.budgets import BudgetVarianceItem, BudgetVarianceResponse
 
 
 class BudgetService:
-    def __init__(self, repository: CostRepository) -> None:
+    def __init__(self, repository: CostRepository | None = None) -> None:
         self.repository = repository
 
     def variance_by_center(
@@ -19,12 +20,31 @@ class BudgetService:
         include_on_track: bool = True,
         top_n: int | None = None,
     ) -> BudgetVarianceResponse:
-        rows = self.repository.get_budget_vs_actual_by_center(
+        rows = self.variance_rows(period_start, period_end, cost_center_ids)
+        return self.variance_from_rows(period_start, period_end, rows, tolerance_percent, include_on_track, top_n)
+
+    def variance_rows(
+        self,
+        period_start: date,
+        period_end: date,
+        cost_center_ids: list[int] | None = None,
+    ) -> list[dict[str, Any]]:
+        return self.repository.get_budget_vs_actual_by_center(
             start_date=period_start,
             end_date=period_end,
             cost_center_ids=cost_center_ids,
         )
 
+    def variance_from_rows(
+        self,
+        period_start: date,
+        period_end: date,
+        rows: list[dict[str, Any]],
+        tolerance_percent: float = 3.0,
+        include_on_track: bool = True,
+        top_n: int | None = None,
+    ) -> BudgetVarianceResponse:
+        """``variance_by_center`` over ``get_budget_vs_actual_by_center``-shaped rows."""
         items: list[BudgetVarianceItem] = []
         for row in rows:
             planned = round(row["planned_amount"], 2)
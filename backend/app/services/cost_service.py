@@ -1,29 +1,94 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import json
+from collections import defaultdict
 from datetime import date
+from typing import Any
 
+from app.core.exceptions import DomainValidationError
 from app.repositories.cost_repository import AggregationDimension, CostRepository
-from app.schemas.costs import CostAggregateResponse, CostFilters, CostOverviewResponse
+from app.schemas.costs import CostAggregateResponse, CostEntryPage, CostFilters, CostOverviewResponse
+
+OVERVIEW_GROUPING_SETS: list[tuple[AggregationDimension, ...]] = [("month",), ("cost_center",), ("category",), ()]
 
 
 def _months_between(start_date: date, end_date: date) -> int:
     return max(1, (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month) + 1)
 
 
+def _split_grouping_sets(rows: list[dict[str, Any]]) -> dict[tuple[str, ...], list[dict[str, Any]]]:
+    grouped: dict[tuple[str, ...], list[dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        grouping_set = tuple(row["group_by"])
+        grouped[grouping_set].append({key: value for key, value in row.items() if key != "group_by"})
+    return grouped
+
+
+def _grand_total(grouped: dict[tuple[str, ...], list[dict[str, Any]]]) -> float:
+    total_rows = grouped.get((), [])
+    return total_rows[0]["total_amount"] if total_rows else 0.0
+
+
+def encode_entry_cursor(reference_date: date, entry_id: int) -> str:
+    payload = json.dumps([reference_date.isoformat(), entry_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_entry_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw_date, entry_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(entry_id, int):
+            raise ValueError("cursor id must be an integer")
+        return date.fromisoformat(raw_date), entry_id
+    except (ValueError, TypeError, UnicodeError, binascii.Error) as exc:
+        raise DomainValidationError("Invalid pagination cursor.", details={"cursor": cursor}) from exc
+
+
 class CostService:
-    def __init__(self, repository: CostRepository) -> None:
+    """Cost reports. Each report is a repository fetch (``*_rows``) and a pure build step
+    (``*_from_rows``), so callers can run the build off the event loop; the combined methods
+    do both. The build steps need no repository.
+    """
+
+    def __init__(self, repository: CostRepository | None = None) -> None:
         self.repository = repository
 
     def aggregate_costs(self, filters: CostFilters, group_by: list[AggregationDimension]) -> CostAggregateResponse:
-        items = self.repository.get_aggregated_costs(filters, group_by)
-        total_amount = self.repository.get_total_cost(filters)
+        return self.aggregate_from_rows(group_by, self.aggregate_rows(filters, group_by))
+
+    def aggregate_rows(self, filters: CostFilters, group_by: list[AggregationDimension]) -> list[dict[str, Any]]:
+        return self.repository.get_grouped_costs(filters, [tuple(group_by), ()])
+
+    @staticmethod
+    def aggregate_from_rows(group_by: list[AggregationDimension], rows: list[dict[str, Any]]) -> CostAggregateResponse:
+        grouped = _split_grouping_sets(rows)
+        items = grouped.get(tuple(group_by), [])
+        total_amount = _grand_total(grouped)
         return CostAggregateResponse(group_by=group_by, total_amount=round(total_amount, 2), items=items)
 
     def cost_overview(self, filters: CostFilters) -> CostOverviewResponse:
-        trend = self.repository.get_aggregated_costs(filters, ["month"])
-        by_center = self.repository.get_aggregated_costs(filters, ["cost_center"])
-        by_category = self.repository.get_aggregated_costs(filters, ["category"])
-        total_cost = self.repository.get_total_cost(filters)
+        return self.overview_from_rows(filters, self.overview_rows(filters))
+
+    def overview_rows(self, filters: CostFilters) -> list[dict[str, Any]]:
+        return self.repository.get_grouped_costs(filters, OVERVIEW_GROUPING_SETS)
+
+    @classmethod
+    def overview_from_rows(cls, filters: CostFilters, rows: list[dict[str, Any]]) -> CostOverviewResponse:
+        return cls.overview_from_grouped(filters, _split_grouping_sets(rows))
+
+    @staticmethod
+    def overview_from_grouped(
+        filters: CostFilters,
+        grouped: dict[tuple[str, ...], list[dict[str, Any]]],
+    ) -> CostOverviewResponse:
+        """Builds the overview from rows per grouping set of ``OVERVIEW_GROUPING_SETS``."""
+        trend = grouped.get(("month",), [])
+        by_center = grouped.get(("cost_center",), [])
+        by_category = grouped.get(("category",), [])
+        total_cost = _grand_total(grouped)
         months = _months_between(filters.start_date, filters.end_date)
         monthly_average = total_cost / months
         return CostOverviewResponse(
@@ -35,3 +100,20 @@ class CostService:
             by_cost_center=by_center,
             by_category=by_category,
         )
+
+    def list_entries(self, filters: CostFilters, limit: int, cursor: str | None = None) -> CostEntryPage:
+        return self.entries_from_rows(limit, self.entries_rows(filters, limit, cursor))
+
+    def entries_rows(self, filters: CostFilters, limit: int, cursor: str | None = None) -> list[dict[str, Any]]:
+        """One row past ``limit``, which tells ``entries_from_rows`` whether there is a next page."""
+        after = decode_entry_cursor(cursor) if cursor else None
+        return self.repository.list_cost_entries(filters, limit=limit + 1, after=after)
+
+    @staticmethod
+    def entries_from_rows(limit: int, rows: list[dict[str, Any]]) -> CostEntryPage:
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            next_cursor = encode_entry_cursor(last["reference_date"], last["id"])
+        return CostEntryPage(items=page, limit=limit, next_cursor=next_cursor)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date
+from typing import Any
+
+from dateutil.relativedelta import relativedelta
+
+from app.repositories.cost_repository import CostRepository
+from app.schemas.costs import CostFilters
+from app.schemas.dashboard import DashboardResponse
+from app.services.analytics_service import AnalyticsService
+from app.services.budget_service import BudgetService
+from app.services.cost_service import CostService
+
+# Widget parameters: the defaults of the standalone endpoints, all ending at the dashboard end date.
+WASTE_LOOKBACK_MONTHS = 3
+WASTE_TOP_N = 10
+ANOMALY_LOOKBACK_MONTHS = 12
+ANOMALY_THRESHOLD_Z = 2.0
+ANOMALY_TOP_N = 20
+QUICK_WINS_LOOKBACK_MONTHS = 6
+QUICK_WINS_TARGET_REDUCTION_PERCENT = 8.0
+QUICK_WINS_MINIMUM_TOTAL = 10000.0
+QUICK_WINS_TOP_N = 10
+BUDGET_TOLERANCE_PERCENT = 3.0
+
+
+def lookback_start(period_end: date, lookback_months: int) -> date:
+    return period_end - relativedelta(months=lookback_months) + relativedelta(days=1)
+
+
+def _since(rows: list[dict[str, Any]], start_date: date) -> list[dict[str, Any]]:
+    return [row for row in rows if row["segment_start"] >= start_date]
+
+
+def _sum_by(rows: list[dict[str, Any]], keys: tuple[str, ...]) -> list[dict[str, Any]]:
+    """Totals per ``keys`` (ordered by them, as the SQL aggregations are), rounded like ``Numeric(14, 2)``."""
+    totals: dict[tuple[Any, ...], float] = defaultdict(float)
+    for row in rows:
+        totals[tuple(row[key] for key in keys)] += row["total_amount"]
+    return [
+        {**dict(zip(keys, values)), "total_amount": round(total, 2)}
+        for values, total in sorted(totals.items(), key=lambda item: item[0])
+    ]
+
+
+def _segment_starts(period_end: date, lookback_months: int) -> tuple[date, date, date, date, date]:
+    """Start of the overview, waste comparison, waste, anomaly and quick-win windows."""
+    waste_start = lookback_start(period_end, WASTE_LOOKBACK_MONTHS)
+    return (
+        lookback_start(period_end, lookback_months),
+        AnalyticsService.comparison_start(waste_start, period_end),
+        waste_start,
+        lookback_start(period_end, ANOMALY_LOOKBACK_MONTHS),
+        lookback_start(period_end, QUICK_WINS_LOOKBACK_MONTHS),
+    )
+
+
+class DashboardService:
+    """Every dashboard widget derived from one monthly center x project x category dataset.
+
+    The dataset is split at each widget's start date, so the windows that end at
+    ``period_end`` are re-aggregated in memory into the rows the standalone repository
+    queries return, and handed to the same service code that builds those endpoints.
+    ``dashboard_rows`` is the only part that touches the repository.
+    """
+
+    def __init__(self, repository: CostRepository | None = None, vectorized: bool = True) -> None:
+        self.repository = repository
+        self.analytics = AnalyticsService(repository, vectorized=vectorized)
+        self.budgets = BudgetService(repository)
+
+    def dashboard(self, period_end: date, lookback_months: int = 12) -> DashboardResponse:
+        rows, planned = self.dashboard_rows(period_end, lookback_months)
+        return self.dashboard_from_rows(period_end, lookback_months, rows, planned)
+
+    def dashboard_rows(
+        self,
+        period_end: date,
+        lookback_months: int = 12,
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """The segmented monthly buckets and the planned budget per center."""
+        starts = _segment_starts(period_end, lookback_months)
+        rows = self.repository.get_dashboard_buckets(min(starts), period_end, segment_starts=starts)
+        planned = self.repository.get_planned_budget_by_center(starts[0], period_end)
+        return rows, planned
+
+    def dashboard_from_rows(
+        self,
+        period_end: date,
+        lookback_months: int,
+        rows: list[dict[str, Any]],
+        planned: list[dict[str, Any]],
+    ) -> DashboardResponse:
+        period_start, waste_previous_start, waste_start, anomalies_start, quick_wins_start = _segment_starts(
+            period_end, lookback_months
+        )
+
+        overview_rows = _since(rows, period_start)
+        filters = CostFilters(start_date=period_start, end_date=period_end)
+        grouped = {
+            ("month",): _sum_by(overview_rows, ("month",)),
+            ("cost_center",): _sum_by(overview_rows, ("cost_center",)),
+            ("category",): _sum_by(overview_rows, ("category",)),
+            (): _sum_by(overview_rows, ()) or [{"total_amount": 0.0}],
+        }
+
+        return DashboardResponse(
+            period_start=period_start,
+            period_end=period_end,
+            overview=CostService.overview_from_grouped(filters, grouped),
+            waste_ranking=self.analytics.waste_ranking_from_rows(
+                waste_start,
+                period_end,
+                self._waste_buckets(_since(rows, waste_previous_start), waste_start),
+            ),
+            anomalies=self.analytics.anomalies_from_rows(
+                anomalies_start,
+                period_end,
+                _sum_by(_since(rows, anomalies_start), ("month", "cost_center", "category")),
+                threshold_z=ANOMALY_THRESHOLD_Z,
+                top_n=ANOMALY_TOP_N,
+            ),
+            quick_wins=self.analytics.quick_wins_from_rows(
+                quick_wins_start,
+                period_end,
+                _sum_by(_since(rows, quick_wins_start), ("month", "cost_center", "category")),
+                target_reduction_percent=QUICK_WINS_TARGET_REDUCTION_PERCENT,
+                minimum_total=QUICK_WINS_MINIMUM_TOTAL,
+                top_n=QUICK_WINS_TOP_N,
+            ),
+            budget_variance=self.budgets.variance_from_rows(
+                period_start,
+                period_end,
+                self._budget_rows(planned, overview_rows),
+                tolerance_percent=BUDGET_TOLERANCE_PERCENT,
+            ),
+        )
+
+    @staticmethod
+    def _waste_buckets(rows: list[dict[str, Any]], period_start: date) -> list[dict[str, Any]]:
+        """``get_waste_ranking_buckets`` rows: buckets with current spend, ranked by waste."""
+        previous: dict[tuple[str, str], float] = defaultdict(float)
+        current: dict[tuple[str, str], float] = defaultdict(float)
+        for row in rows:
+            totals = current if row["segment_start"] >= period_start else previous
+            totals[(row["cost_center"], row["category"])] += row["total_amount"]
+
+        buckets = []
+        for (cost_center, category), current_total in current.items():
+            current_total = round(current_total, 2)
+            previous_total = round(previous.get((cost_center, category), 0.0), 2)
+            buckets.append(
+                {
+                    "cost_center": cost_center,
+                    "category": category,
+                    "previous_total": previous_total,
+                    "current_total": current_total,
+                    "estimated_waste": round(max(current_total - previous_total, 0.0), 2),
+                }
+            )
+        buckets.sort(key=lambda bucket: (-bucket["estimated_waste"], bucket["cost_center"], bucket["category"]))
+        return buckets[:WASTE_TOP_N]
+
+    @staticmethod
+    def _budget_rows(planned: list[dict[str, Any]], rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """``get_budget_vs_actual_by_center`` rows: planned amounts joined with actuals from the dataset."""
+        actual: dict[int, float] = defaultdict(float)
+        for row in rows:
+            actual[row["cost_center_id"]] += row["total_amount"]
+        return [{**row, "actual_amount": round(actual.get(row["cost_center_id"], 0.0), 2)} for row in planned]
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from app.repositories.cost_repository import CostRepository
+from app.schemas.costs import CostFilters
+from app.schemas.ingestion import IngestionFormat
+
+# Code columns come first and match the ingestion layout, so an export can be re-ingested as-is.
+EXPORT_COLUMNS = (
+    "cost_center_code",
+    "project_code",
+    "category_code",
+    "reference_date",
+    "amount",
+    "currency",
+    "description",
+    "id",
+    "cost_center",
+    "project",
+    "category",
+)
+
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _export_values(row: Any) -> list[Any]:
+    values = [row[column] for column in EXPORT_COLUMNS]
+    values[3] = values[3].isoformat()
+    values[4] = format(values[4], "f")
+    return values
+
+
+class CostExportService:
+    """Serializes line-level cost entries as text chunks, one chunk per fetched batch."""
+
+    def __init__(self, repository: CostRepository, batch_size: int = 5000) -> None:
+        self.repository = repository
+        self.batch_size = max(1, batch_size)
+
+    def stream(self, filters: CostFilters, data_format: IngestionFormat) -> Iterator[str]:
+        if data_format == "csv":
+            return self.iter_csv(filters)
+        return self.iter_ndjson(filters)
+
+    def iter_csv(self, filters: CostFilters) -> Iterator[str]:
+        # The header goes out before the query runs, so the first byte does not wait on Postgres.
+        yield self._csv_chunk([list(EXPORT_COLUMNS)])
+        for batch in self.repository.iter_cost_entries(filters, batch_size=self.batch_size):
+            yield self._csv_chunk([_export_values(row) for row in batch])
+
+    def iter_ndjson(self, filters: CostFilters) -> Iterator[str]:
+        for batch in self.repository.iter_cost_entries(filters, batch_size=self.batch_size):
+            yield "".join(self._ndjson_line(row) for row in batch)
+
+    @staticmethod
+    def _csv_chunk(rows: Sequence[Sequence[Any]]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _ndjson_line(row: Any) -> str:
+        values = _export_values(row)
+        record = dict(zip(EXPORT_COLUMNS, values))
+        record["amount"] = float(row["amount"])
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
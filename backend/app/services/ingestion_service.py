@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import time
+from collections.abc import Iterable, Iterator
+from datetime import date
+from decimal import Decimal
+from hashlib import sha256
+from typing import IO, Any
+
+from pydantic import ValidationError
+
+from app.core.exceptions import DomainValidationError
+from app.repositories.ingestion_repository import CostIngestionRepository, StagedCostEntry
+from app.repositories.rollup_repository import CostRollupRepository
+from app.schemas.ingestion import CostEntryIngestRow, IngestionFormat, IngestionReport, IngestionRowError
+
+CSV_COLUMNS = (
+    "cost_center_code",
+    "project_code",
+    "category_code",
+    "reference_date",
+    "amount",
+    "currency",
+    "description",
+)
+REQUIRED_CSV_COLUMNS = {"cost_center_code", "project_code", "category_code", "reference_date", "amount"}
+_CENTS = Decimal("0.01")
+
+
+def content_hash(row: CostEntryIngestRow) -> str:
+    """Stable identity of an entry's content; re-sending the same line always yields the same hash."""
+    canonical = "\x1f".join(
+        [
+            row.cost_center_code,
+            row.project_code,
+            row.category_code,
+            row.reference_date.isoformat(),
+            format(row.amount.quantize(_CENTS), "f"),
+            row.currency,
+            row.description or "",
+        ]
+    )
+    return sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    parts = []
+    for error in exc.errors():
+        location = ".".join(str(item) for item in error.get("loc", ())) or "row"
+        parts.append(f"{location}: {error.get('msg', 'invalid value')}")
+    return "; ".join(parts)
+
+
+class DimensionCodeLookup:
+    """Code -> id maps for the three dimensions, loaded once per ingestion run."""
+
+    def __init__(self, codes: dict[str, dict[str, int]]) -> None:
+        self._codes = codes
+
+    def resolve(self, row: CostEntryIngestRow) -> tuple[int, int, int]:
+        missing: list[str] = []
+        cost_center_id = self._codes["cost_center"].get(row.cost_center_code)
+        project_id = self._codes["project"].get(row.project_code)
+        category_id = self._codes["category"].get(row.category_code)
+        if cost_center_id is None:
+            missing.append(f"unknown cost_center_code '{row.cost_center_code}'")
+        if project_id is None:
+            missing.append(f"unknown project_code '{row.project_code}'")
+        if category_id is None:
+            missing.append(f"unknown category_code '{row.category_code}'")
+        if missing:
+            raise LookupError("; ".join(missing))
+        return cost_center_id, project_id, category_id  # type: ignore[return-value]
+
+
+class CostIngestionService:
+    def __init__(
+        self,
+        repository: CostIngestionRepository,
+        rollup_repository: CostRollupRepository | None = None,
+        batch_size: int = 5000,
+        max_error_samples: int = 100,
+    ) -> None:
+        self.repository = repository
+        self.rollup_repository = rollup_repository
+        self.batch_size = max(1, batch_size)
+        self.max_error_samples = max_error_samples
+
+    def ingest(self, stream: IO[bytes], data_format: IngestionFormat) -> IngestionReport:
+        started = time.perf_counter()
+        lookup = DimensionCodeLookup(self.repository.load_dimension_codes())
+
+        rows_read = rows_valid = rows_inserted = batches = 0
+        errors: list[IngestionRowError] = []
+        rows_rejected = 0
+        touched_months: set[date] = set()
+        batch: list[StagedCostEntry] = []
+
+        def flush() -> None:
+            nonlocal rows_inserted, batches
+            new_months = {entry[3].replace(day=1) for entry in batch} - touched_months
+            for month in sorted(new_months):
+                self.repository.ensure_partitions(month, month)
+            touched_months.update(new_months)
+            rows_inserted += self.repository.copy_entries(batch)
+            batches += 1
+            batch.clear()
+
+        for line_number, raw in self._iter_records(stream, data_format):
+            rows_read += 1
+            try:
+                payload = json.loads(raw, parse_float=Decimal) if isinstance(raw, str) else raw
+                row = CostEntryIngestRow.model_validate(payload)
+                cost_center_id, project_id, category_id = lookup.resolve(row)
+            except ValidationError as exc:
+                rows_rejected += 1
+                self._record_error(errors, line_number, _format_validation_error(exc))
+                continue
+            except json.JSONDecodeError as exc:
+                rows_rejected += 1
+                self._record_error(errors, line_number, f"invalid JSON: {exc.msg}")
+                continue
+            except LookupError as exc:
+                rows_rejected += 1
+                self._record_error(errors, line_number, str(exc))
+                continue
+
+            rows_valid += 1
+            batch.append(
+                (
+                    cost_center_id,
+                    project_id,
+                    category_id,
+                    row.reference_date,
+                    row.amount,
+                    row.currency,
+                    row.description,
+                    content_hash(row),
+                )
+            )
+            if len(batch) >= self.batch_size:
+                flush()
+
+        if batch:
+            flush()
+
+        months_refreshed = sorted(touched_months) if rows_inserted else []
+        if months_refreshed and self.rollup_repository is not None:
+            self.rollup_repository.refresh_months(months_refreshed)
+
+        elapsed = time.perf_counter() - started
+        return IngestionReport(
+            format=data_format,
+            rows_read=rows_read,
+            rows_valid=rows_valid,
+            rows_rejected=rows_rejected,
+            rows_inserted=rows_inserted,
+            rows_duplicated=rows_valid - rows_inserted,
+            batches=batches,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(rows_read / elapsed, 1) if elapsed > 0 else float(rows_read),
+            months_refreshed=months_refreshed,
+            errors=errors,
+        )
+
+    def _record_error(self, errors: list[IngestionRowError], line_number: int, message: str) -> None:
+        if len(errors) < self.max_error_samples:
+            errors.append(IngestionRowError(line=line_number, error=message))
+
+    @staticmethod
+    def _iter_records(stream: IO[bytes], data_format: IngestionFormat) -> Iterator[tuple[int, Any]]:
+        text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        try:
+            if data_format == "csv":
+                yield from CostIngestionService._iter_csv(text_stream)
+            else:
+                yield from CostIngestionService._iter_ndjson(text_stream)
+        finally:
+            text_stream.detach()
+
+    @staticmethod
+    def _iter_csv(lines: Iterable[str]) -> Iterator[tuple[int, Any]]:
+        reader = csv.DictReader(lines)
+        header = {name.strip() for name in reader.fieldnames or []}
+        missing = sorted(REQUIRED_CSV_COLUMNS - header)
+        if missing:
+            raise DomainValidationError("CSV header is missing required columns.", details={"missing_columns": missing})
+        for record in reader:
+            clean = {key.strip(): value for key, value in record.items() if key and key.strip() in CSV_COLUMNS}
+            yield reader.line_num, clean
+
+    @staticmethod
+    def _iter_ndjson(lines: Iterable[str]) -> Iterator[tuple[int, Any]]:
+        for line_number, line in enumerate(lines, start=1):
+            if line.strip():
+                yield line_number, line
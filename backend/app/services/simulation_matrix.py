@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import struct
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any
+
+import numpy as np
+
+from app.schemas.simulations import CutByCategory, CutByCenter, SweepAxis
+
+# Scenarios evaluated per matrix product; bounds the (entities x scenarios) intermediates.
+SCENARIO_CHUNK_SIZE = 256
+
+# Binary layout: magic, header length, JSON header (names, counts, index dtypes), then the raw
+# little-endian arrays in header order.
+_MAGIC = b"SIMX"
+_PREFIX = struct.Struct("<4sI")
+
+
+@dataclass(frozen=True)
+class ScenarioCuts:
+    """Cuts for ``S`` scenarios encoded against a matrix's center/category indexes.
+
+    Percent cuts are kept as retained fractions (``1 - percent / 100``); absolute cuts are
+    amounts, 0 meaning no cut. Ids that are not in the matrix are dropped.
+    """
+
+    center_factor: np.ndarray
+    center_absolute: np.ndarray
+    category_factor: np.ndarray
+    category_absolute: np.ndarray
+
+    def __len__(self) -> int:
+        return self.center_factor.shape[0]
+
+    def chunks(self, size: int) -> Iterator[ScenarioCuts]:
+        for start in range(0, len(self), size):
+            yield self.chunk(start, start + size)
+
+    def chunk(self, start: int, stop: int) -> ScenarioCuts:
+        return ScenarioCuts(
+            center_factor=self.center_factor[start:stop],
+            center_absolute=self.center_absolute[start:stop],
+            category_factor=self.category_factor[start:stop],
+            category_absolute=self.category_absolute[start:stop],
+        )
+
+
+@dataclass(frozen=True)
+class ScenarioEvaluation:
+    """Projected amounts per center and per category, one row per scenario."""
+
+    center_projected: np.ndarray
+    category_projected: np.ndarray
+
+    @property
+    def projected_total(self) -> np.ndarray:
+        return self.center_projected.sum(axis=1)
+
+
+@dataclass(frozen=True)
+class SimulationMatrix:
+    """Baseline cost per (cost center, category) bucket, index-encoded.
+
+    Centers and categories are numbered in first-appearance order; each bucket is a position in
+    the ``center_index``/``category_index``/``baseline`` arrays.
+    """
+
+    center_ids: np.ndarray
+    center_names: list[str]
+    category_ids: np.ndarray
+    category_names: list[str]
+    center_index: np.ndarray
+    category_index: np.ndarray
+    baseline: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict[str, Any]]) -> SimulationMatrix:
+        rows = list(rows)
+        centers = dict.fromkeys((row["cost_center_id"], row["cost_center_name"]) for row in rows)
+        categories = dict.fromkeys((row["category_id"], row["category_name"]) for row in rows)
+        center_position = {center_id: index for index, (center_id, _) in enumerate(centers)}
+        category_position = {category_id: index for index, (category_id, _) in enumerate(categories)}
+        return cls(
+            center_ids=np.fromiter((center_id for center_id, _ in centers), dtype=np.int64, count=len(centers)),
+            center_names=[name for _, name in centers],
+            category_ids=np.fromiter((category_id for category_id, _ in categories), dtype=np.int64, count=len(categories)),
+            category_names=[name for _, name in categories],
+            center_index=np.fromiter((center_position[row["cost_center_id"]] for row in rows), dtype=np.int32, count=len(rows)),
+            category_index=np.fromiter((category_position[row["category_id"]] for row in rows), dtype=np.int32, count=len(rows)),
+            baseline=np.fromiter((row["total_amount"] for row in rows), dtype=np.float64, count=len(rows)),
+        )
+
+    def to_bytes(self) -> bytes:
+        """Compact binary encoding; bucket indexes are narrowed to the smallest unsigned type."""
+        arrays = {
+            "center_ids": self.center_ids.astype("<i8"),
+            "category_ids": self.category_ids.astype("<i8"),
+            "center_index": self.center_index.astype(np.min_scalar_type(max(self.center_count - 1, 0))),
+            "category_index": self.category_index.astype(np.min_scalar_type(max(self.category_count - 1, 0))),
+            "baseline": self.baseline.astype("<f8"),
+        }
+        header = json.dumps(
+            {
+                "center_names": self.center_names,
+                "category_names": self.category_names,
+                "arrays": [[name, array.dtype.str, len(array)] for name, array in arrays.items()],
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return b"".join([_PREFIX.pack(_MAGIC, len(header)), header, *(array.tobytes() for array in arrays.values())])
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> SimulationMatrix:
+        magic, header_length = _PREFIX.unpack_from(payload)
+        if magic != _MAGIC:
+            raise ValueError("not a simulation matrix payload")
+        offset = _PREFIX.size + header_length
+        header = json.loads(payload[_PREFIX.size : offset])
+        arrays: dict[str, np.ndarray] = {}
+        for name, dtype, count in header["arrays"]:
+            arrays[name] = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+            offset += arrays[name].nbytes
+        return cls(
+            center_ids=arrays["center_ids"],
+            center_names=header["center_names"],
+            category_ids=arrays["category_ids"],
+            category_names=header["category_names"],
+            center_index=arrays["center_index"].astype(np.int32),
+            category_index=arrays["category_index"].astype(np.int32),
+            baseline=arrays["baseline"],
+        )
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Digest of the ids, bucket indexes and baseline; changes whenever the data does."""
+        digest = hashlib.blake2b(digest_size=16)
+        for array in (self.center_ids, self.category_ids, self.center_index, self.category_index, self.baseline):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate in-memory footprint, including the dense grid once it is built."""
+        arrays = (self.center_ids, self.category_ids, self.center_index, self.category_index, self.baseline)
+        names = sum(len(name) for name in self.center_names) + sum(len(name) for name in self.category_names)
+        return sum(array.nbytes for array in arrays) + names + self.center_count * self.category_count * 8
+
+    @property
+    def center_count(self) -> int:
+        return len(self.center_ids)
+
+    @property
+    def category_count(self) -> int:
+        return len(self.category_ids)
+
+    @cached_property
+    def grid(self) -> np.ndarray:
+        """Dense center x category baseline; empty buckets are 0."""
+        flat = np.bincount(
+            self.center_index.astype(np.int64) * self.category_count + self.category_index,
+            weights=self.baseline,
+            minlength=self.center_count * self.category_count,
+        )
+        return flat.reshape(self.center_count, self.category_count)
+
+    @cached_property
+    def center_baseline(self) -> np.ndarray:
+        return np.bincount(self.center_index, weights=self.baseline, minlength=self.center_count)
+
+    @cached_property
+    def category_baseline(self) -> np.ndarray:
+        return np.bincount(self.category_index, weights=self.baseline, minlength=self.category_count)
+
+    @cached_property
+    def baseline_total(self) -> float:
+        return float(self.baseline.sum())
+
+    @cached_property
+    def _center_lookup(self) -> dict[int, int]:
+        return {int(center_id): index for index, center_id in enumerate(self.center_ids)}
+
+    @cached_property
+    def _category_lookup(self) -> dict[int, int]:
+        return {int(category_id): index for index, category_id in enumerate(self.category_ids)}
+
+    def center_position(self, center_id: int) -> int | None:
+        return self._center_lookup.get(center_id)
+
+    def category_position(self, category_id: int) -> int | None:
+        return self._category_lookup.get(category_id)
+
+    def encode_cuts(
+        self,
+        scenarios: Sequence[tuple[Sequence[CutByCenter], Sequence[CutByCategory]]],
+    ) -> ScenarioCuts:
+        count = len(scenarios)
+        cuts = ScenarioCuts(
+            center_factor=np.ones((count, self.center_count)),
+            center_absolute=np.zeros((count, self.center_count)),
+            category_factor=np.ones((count, self.category_count)),
+            category_absolute=np.zeros((count, self.category_count)),
+        )
+        for row, (center_cuts, category_cuts) in enumerate(scenarios):
+            for cut in center_cuts:
+                index = self._center_lookup.get(cut.cost_center_id)
+                if index is not None:
+                    cuts.center_factor[row, index] = 1 - cut.percent_cut / 100
+                    cuts.center_absolute[row, index] = cut.absolute_cut
+            for cut in category_cuts:
+                index = self._category_lookup.get(cut.category_id)
+                if index is not None:
+                    cuts.category_factor[row, index] = 1 - cut.percent_cut / 100
+                    cuts.category_absolute[row, index] = cut.absolute_cut
+        return cuts
+
+    def sweep(self, base: ScenarioCuts, axes: Sequence[SweepAxis]) -> Iterator[ScenarioCuts]:
+        """Cuts for the Cartesian product of the axes' percent values, one chunk at a time.
+
+        ``base`` is a single encoded scenario applied to every grid point; each axis then sets
+        the percent cut of its entities (replacing the base percent for them). Scenarios follow
+        ``np.unravel_index`` order over the axes, the last axis varying fastest.
+        """
+        shape = tuple(len(axis.percent_values()) for axis in axes)
+        lookups = {"cost_center": self._center_lookup, "category": self._category_lookup}
+        targets = [
+            (
+                axis.target,
+                np.array([lookups[axis.target][entity_id] for entity_id in axis.entity_ids if entity_id in lookups[axis.target]], dtype=np.int64),
+                1 - np.asarray(axis.percent_values()) / 100,
+            )
+            for axis in axes
+        ]
+        total = int(np.prod(shape)) if shape else 0
+        for start in range(0, total, SCENARIO_CHUNK_SIZE):
+            stop = min(start + SCENARIO_CHUNK_SIZE, total)
+            count = stop - start
+            chunk = ScenarioCuts(
+                center_factor=np.repeat(base.center_factor[:1], count, axis=0),
+                center_absolute=np.repeat(base.center_absolute[:1], count, axis=0),
+                category_factor=np.repeat(base.category_factor[:1], count, axis=0),
+                category_absolute=np.repeat(base.category_absolute[:1], count, axis=0),
+            )
+            positions = np.unravel_index(np.arange(start, stop), shape)
+            for (target, indexes, factors), axis_positions in zip(targets, positions):
+                matrix = chunk.center_factor if target == "cost_center" else chunk.category_factor
+                matrix[:, indexes] = factors[axis_positions][:, None]
+            yield chunk
+
+    def evaluate(self, cuts: ScenarioCuts) -> ScenarioEvaluation:
+        """Projects every scenario at once.
+
+        A bucket's projection is ``baseline * center_weight[c] * category_weight[k]``: percent
+        cuts multiply, then absolute cuts scale each center's projected total down to at most
+        ``total - cut`` and finally each category's. Because the weights factor per center and
+        per category, every group total is a product of the baseline grid with a weight matrix,
+        so ``S`` scenarios cost a few ``(C x K) @ (K x S)``-sized products, or a single
+        matrix-vector product when one side's weights are the same in every scenario.
+        """
+        center_parts: list[np.ndarray] = []
+        category_parts: list[np.ndarray] = []
+        for chunk in cuts.chunks(SCENARIO_CHUNK_SIZE):
+            center_weight, category_weight = self._weights(chunk)
+            center_parts.append(center_weight * self._center_sums(category_weight))
+            category_parts.append(category_weight * self._category_sums(center_weight))
+        if not center_parts:
+            return ScenarioEvaluation(np.zeros((0, self.center_count)), np.zeros((0, self.category_count)))
+        return ScenarioEvaluation(np.vstack(center_parts), np.vstack(category_parts))
+
+    def projected_totals(self, cuts: ScenarioCuts | Iterable[ScenarioCuts]) -> np.ndarray:
+        """Projected grand total per scenario, skipping the per-category breakdown."""
+        chunks = cuts.chunks(SCENARIO_CHUNK_SIZE) if isinstance(cuts, ScenarioCuts) else cuts
+        totals = [
+            (center_weight * self._center_sums(category_weight)).sum(axis=1)
+            for center_weight, category_weight in map(self._weights, chunks)
+        ]
+        return np.concatenate(totals) if totals else np.zeros(0)
+
+    def _weights(self, cuts: ScenarioCuts) -> tuple[np.ndarray, np.ndarray]:
+        center_weight = np.maximum(cuts.center_factor, 0.0)
+        category_weight = np.maximum(cuts.category_factor, 0.0)
+        if cuts.center_absolute.any():
+            center_totals = center_weight * self._center_sums(category_weight)
+            center_weight = center_weight * (1 - absolute_cut_share(cuts.center_absolute, center_totals))
+        if cuts.category_absolute.any():
+            category_totals = category_weight * self._category_sums(center_weight)
+            category_weight = category_weight * (1 - absolute_cut_share(cuts.category_absolute, category_totals))
+        return center_weight, category_weight
+
+    def _center_sums(self, category_weight: np.ndarray) -> np.ndarray:
+        """``grid @ category_weight[s]`` for every scenario ``s``, shape ``(S, C)``."""
+        if _rows_identical(category_weight):
+            return np.broadcast_to(self.grid @ category_weight[0], (len(category_weight), self.center_count))
+        return category_weight @ self.grid.T
+
+    def _category_sums(self, center_weight: np.ndarray) -> np.ndarray:
+        """``center_weight[s] @ grid`` for every scenario ``s``, shape ``(S, K)``."""
+        if _rows_identical(center_weight):
+            return np.broadcast_to(center_weight[0] @ self.grid, (len(center_weight), self.category_count))
+        return center_weight @ self.grid
+
+
+def _rows_identical(weights: np.ndarray) -> bool:
+    return len(weights) > 0 and bool((weights == weights[:1]).all())
+
+
+def absolute_cut_share(absolute: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """Fraction of each group's projected total removed by its absolute cut (capped at 1)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = np.minimum(1.0, absolute / totals)
+    return np.where((absolute > 0) & (totals > 0), share, 0.0)
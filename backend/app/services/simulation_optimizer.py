@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.services.simulation_matrix import SimulationMatrix
+
+# Percent cuts are reported with this many decimals, rounded up so the target is still met.
+_PERCENT_DECIMALS = 4
+
+
+@dataclass(frozen=True)
+class CutAllocation:
+    """Percent cut per center and per category (matrix index order) and its weighted cost."""
+
+    center_percent: np.ndarray
+    category_percent: np.ndarray
+    disruption: float
+
+
+def allocate_savings_target(
+    matrix: SimulationMatrix,
+    target_savings: float,
+    center_max_percent: np.ndarray,
+    center_weight: np.ndarray,
+    category_max_percent: np.ndarray,
+    category_weight: np.ndarray,
+) -> CutAllocation:
+    """Cheapest percent cuts (by ``sum(weight * percent)``) that save ``target_savings``.
+
+    Lazy greedy over centers and categories, each cut at most once: the next entity is the one
+    with the lowest ``weight / current_base``, i.e. the least weighted disruption per unit saved,
+    and it is cut up to its bound or just enough to reach the target. Cutting an entity shrinks
+    the bases of the entities it overlaps (a center's cut reduces every category's projected
+    sum and vice versa); those bases are kept exact with one grid row/column update per cut, and
+    since bases only shrink, stale heap keys are simply re-checked when popped. If the bounds
+    cannot reach the target, every eligible entity ends at its bound.
+    """
+    grid = matrix.grid
+    center_base = grid.sum(axis=1)
+    category_base = grid.sum(axis=0)
+    center_percent = np.zeros(matrix.center_count)
+    category_percent = np.zeros(matrix.category_count)
+    bases = {"center": center_base, "category": category_base}
+    limits = {"center": center_max_percent, "category": category_max_percent}
+    weights = {"center": center_weight, "category": category_weight}
+
+    heap: list[tuple[float, str, int]] = []
+    for kind in ("center", "category"):
+        for index in np.flatnonzero((limits[kind] > 0) & (bases[kind] > 0)).tolist():
+            heap.append((float(weights[kind][index] / bases[kind][index]), kind, index))
+    heapq.heapify(heap)
+
+    remaining = target_savings
+    while heap and remaining > 0:
+        _, kind, index = heapq.heappop(heap)
+        base = float(bases[kind][index])
+        if base <= 0:
+            continue
+        key = float(weights[kind][index]) / base
+        if heap and key > heap[0][0]:
+            heapq.heappush(heap, (key, kind, index))
+            continue
+
+        limit = float(limits[kind][index])
+        percent = limit if base * limit / 100 <= remaining else min(limit, _ceil_percent(remaining / base * 100))
+        fraction = percent / 100
+        remaining -= base * fraction
+        if kind == "center":
+            center_percent[index] = percent
+            category_base -= fraction * grid[index, :]
+        else:
+            category_percent[index] = percent
+            center_base -= fraction * grid[:, index]
+
+    disruption = float(center_weight @ center_percent + category_weight @ category_percent)
+    return CutAllocation(center_percent=center_percent, category_percent=category_percent, disruption=disruption)
+
+
+def _ceil_percent(percent: float) -> float:
+    scale = 10**_PERCENT_DECIMALS
+    return math.ceil(percent * scale - 1e-9) / scale
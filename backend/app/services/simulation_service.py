@@ -1,58 +1,97 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from dataclasses import dataclass
+from datetime import date
 from typing import Any
 
+import numpy as np
+
 from app.repositories.cost_repository import CostRepository
 from app.schemas.costs import CostFilters
 from app.schemas.simulations import (
     CutByCategory,
     CutByCenter,
     ImpactRankingItem,
+    SavingsTargetRequest,
+    SavingsTargetResponse,
     SimulationComparisonItem,
     SimulationComparisonRequest,
     SimulationComparisonResponse,
     SimulationRequest,
     SimulationResponse,
+    SimulationSessionResponse,
+    SimulationSweepRequest,
+    SimulationSweepResponse,
 )
+from app.services.simulation_matrix import SimulationMatrix
+from app.services.simulation_optimizer import allocate_savings_target
+from app.services.simulation_session import SimulationSession, approximate_savings
 
 
-@dataclass
-class SimulationBucket:
-    cost_center_id: int
-    cost_center_name: str
-    category_id: int
-    category_name: str
-    baseline_amount: float
-    projected_amount: float
+def _summary(baseline: float, projected: float) -> tuple[float, float, float, float]:
+    baseline = round(baseline, 2)
+    projected = round(projected, 2)
+    savings = round(max(0.0, baseline - projected), 2)
+    impact_percent = round((savings / baseline) * 100, 2) if baseline else 0.0
+    return baseline, projected, savings, impact_percent
 
 
 class SimulationService:
-    def __init__(self, repository: CostRepository) -> None:
+    """Runs simulations on a baseline matrix, loading it from the repository unless one is passed."""
+
+    def __init__(self, repository: CostRepository | None = None) -> None:
         self.repository = repository
 
-    def run(self, payload: SimulationRequest) -> SimulationResponse:
-        filters = CostFilters(start_date=payload.start_date, end_date=payload.end_date)
-        matrix = self.repository.get_simulation_matrix(filters)
-        buckets = self._build_projected_buckets(matrix, payload.center_cuts, payload.category_cuts)
-        return self._build_response(buckets)
+    def load_matrix(self, start_date: date, end_date: date) -> SimulationMatrix:
+        return SimulationMatrix.from_rows(self.matrix_rows(start_date, end_date))
 
-    def compare(self, payload: SimulationComparisonRequest) -> SimulationComparisonResponse:
-        filters = CostFilters(start_date=payload.start_date, end_date=payload.end_date)
-        matrix = self.repository.get_simulation_matrix(filters)
-        results: list[SimulationComparisonItem] = []
+    def matrix_rows(self, start_date: date, end_date: date) -> list[dict[str, Any]]:
+        """Baseline rows for ``SimulationMatrix.from_rows``."""
+        if self.repository is None:
+            raise RuntimeError("SimulationService needs a repository to load the baseline matrix.")
+        return self.repository.get_simulation_matrix(CostFilters(start_date=start_date, end_date=end_date))
+
+    def run(self, payload: SimulationRequest, matrix: SimulationMatrix | None = None) -> SimulationResponse:
+        if matrix is None:
+            matrix = self.load_matrix(payload.start_date, payload.end_date)
+        evaluation = matrix.evaluate(matrix.encode_cuts([(payload.center_cuts, payload.category_cuts)]))
+        center_projected = evaluation.center_projected[0]
+        category_projected = evaluation.category_projected[0]
+
+        baseline_total, projected_total, estimated_savings, impact_percent = _summary(
+            matrix.baseline_total, float(center_projected.sum())
+        )
+        return SimulationResponse(
+            baseline_total=baseline_total,
+            projected_total=projected_total,
+            estimated_savings=estimated_savings,
+            impact_percent=impact_percent,
+            center_impact_ranking=self._build_entity_ranking(
+                matrix.center_ids, matrix.center_names, matrix.center_baseline, center_projected
+            ),
+            category_impact_ranking=self._build_entity_ranking(
+                matrix.category_ids, matrix.category_names, matrix.category_baseline, category_projected
+            ),
+        )
+
+    def compare(
+        self, payload: SimulationComparisonRequest, matrix: SimulationMatrix | None = None
+    ) -> SimulationComparisonResponse:
+        if matrix is None:
+            matrix = self.load_matrix(payload.start_date, payload.end_date)
+        cuts = matrix.encode_cuts([(scenario.center_cuts, scenario.category_cuts) for scenario in payload.scenarios])
+        projected_totals = matrix.projected_totals(cuts)
+        baseline = matrix.baseline_total
 
-        for scenario in payload.scenarios:
-            buckets = self._build_projected_buckets(matrix, scenario.center_cuts, scenario.category_cuts)
-            response = self._build_response(buckets)
+        results: list[SimulationComparisonItem] = []
+        for scenario, projected in zip(payload.scenarios, projected_totals.tolist()):
+            baseline_total, projected_total, estimated_savings, impact_percent = _summary(baseline, projected)
             results.append(
                 SimulationComparisonItem(
                     scenario_name=scenario.scenario_name,
-                    baseline_total=response.baseline_total,
-                    projected_total=response.projected_total,
-                    estimated_savings=response.estimated_savings,
-                    impact_percent=response.impact_percent,
+                    baseline_total=baseline_total,
+                    projected_total=projected_total,
+                    estimated_savings=estimated_savings,
+                    impact_percent=impact_percent,
                     rank=0,
                 )
             )
@@ -68,85 +107,160 @@ class SimulationService:
             items=ranked,
         )
 
-    @staticmethod
-    def _build_projected_buckets(
-        matrix: list[dict[str, Any]],
-        center_cuts: list[CutByCenter],
-        category_cuts: list[CutByCategory],
-    ) -> list[SimulationBucket]:
-        center_pct = {item.cost_center_id: item.percent_cut / 100 for item in center_cuts}
-        center_abs = {item.cost_center_id: item.absolute_cut for item in center_cuts if item.absolute_cut > 0}
-        category_pct = {item.category_id: item.percent_cut / 100 for item in category_cuts}
-        category_abs = {item.category_id: item.absolute_cut for item in category_cuts if item.absolute_cut > 0}
-
-        buckets: list[SimulationBucket] = []
-        for bucket in matrix:
-            baseline = float(bucket["total_amount"])
-            reduction_pct = 1 - (1 - center_pct.get(bucket["cost_center_id"], 0)) * (1 - category_pct.get(bucket["category_id"], 0))
-            projected = baseline * max(0.0, 1 - reduction_pct)
-            buckets.append(
-                SimulationBucket(
-                    cost_center_id=bucket["cost_center_id"],
-                    cost_center_name=bucket["cost_center_name"],
-                    category_id=bucket["category_id"],
-                    category_name=bucket["category_name"],
-                    baseline_amount=baseline,
-                    projected_amount=projected,
-                )
-            )
+    def sweep(self, payload: SimulationSweepRequest, matrix: SimulationMatrix | None = None) -> SimulationSweepResponse:
+        if matrix is None:
+            matrix = self.load_matrix(payload.start_date, payload.end_date)
+        base = matrix.encode_cuts([(payload.center_cuts, payload.category_cuts)])
+        projected = np.round(matrix.projected_totals(matrix.sweep(base, payload.axes)), 2)
 
-        SimulationService._apply_absolute_cuts(buckets, center_abs, "cost_center_id")
-        SimulationService._apply_absolute_cuts(buckets, category_abs, "category_id")
-        return buckets
+        baseline_total = round(matrix.baseline_total, 2)
+        savings = np.round(np.maximum(0.0, baseline_total - projected), 2)
+        impact = np.round(savings / baseline_total * 100, 2) if baseline_total else np.zeros_like(savings)
+        shape = tuple(axis.value_count for axis in payload.axes)
+        positions = np.unravel_index(np.arange(len(projected)), shape)
+        return SimulationSweepResponse(
+            period_start=payload.start_date,
+            period_end=payload.end_date,
+            baseline_total=baseline_total,
+            scenario_count=len(projected),
+            axes=[axis.label or f"{axis.target}:{','.join(map(str, axis.entity_ids))}" for axis in payload.axes],
+            percent_cuts=[
+                np.asarray(axis.percent_values())[axis_positions].tolist()
+                for axis, axis_positions in zip(payload.axes, positions)
+            ],
+            projected_total=projected.tolist(),
+            estimated_savings=savings.tolist(),
+            impact_percent=impact.tolist(),
+            best_scenario_index=int(np.argmax(savings)) if len(savings) else None,
+        )
 
-    @staticmethod
-    def _apply_absolute_cuts(
-        buckets: list[SimulationBucket],
-        absolute_cuts: dict[int, float],
-        group_field: str,
-    ) -> None:
-        if not absolute_cuts:
-            return
-
-        grouped: dict[int, list[SimulationBucket]] = defaultdict(list)
-        for bucket in buckets:
-            grouped[getattr(bucket, group_field)].append(bucket)
-
-        for entity_id, absolute_cut in absolute_cuts.items():
-            selected = grouped.get(entity_id, [])
-            current_total = sum(item.projected_amount for item in selected)
-            if current_total <= 0:
-                continue
-            factor = min(1.0, absolute_cut / current_total)
-            for item in selected:
-                item.projected_amount = item.projected_amount * (1 - factor)
+    def optimize(self, payload: SavingsTargetRequest, matrix: SimulationMatrix | None = None) -> SavingsTargetResponse:
+        if matrix is None:
+            matrix = self.load_matrix(payload.start_date, payload.end_date)
+        center_max = np.full(matrix.center_count, payload.default_center_max_percent)
+        center_weight = np.ones(matrix.center_count)
+        for bound in payload.center_bounds:
+            index = matrix.center_position(bound.cost_center_id)
+            if index is not None:
+                center_max[index] = bound.max_percent_cut
+                center_weight[index] = bound.weight
+        category_max = np.full(matrix.category_count, payload.default_category_max_percent)
+        category_weight = np.ones(matrix.category_count)
+        for bound in payload.category_bounds:
+            index = matrix.category_position(bound.category_id)
+            if index is not None:
+                category_max[index] = bound.max_percent_cut
+                category_weight[index] = bound.weight
+
+        allocation = allocate_savings_target(
+            matrix, payload.target_savings, center_max, center_weight, category_max, category_weight
+        )
+        center_cuts = [
+            CutByCenter(cost_center_id=int(matrix.center_ids[index]), percent_cut=float(allocation.center_percent[index]))
+            for index in np.flatnonzero(allocation.center_percent).tolist()
+        ]
+        category_cuts = [
+            CutByCategory(category_id=int(matrix.category_ids[index]), percent_cut=float(allocation.category_percent[index]))
+            for index in np.flatnonzero(allocation.category_percent).tolist()
+        ]
+        # Report the allocation exactly as /simulations/run would evaluate it.
+        projected = float(matrix.projected_totals(matrix.encode_cuts([(center_cuts, category_cuts)]))[0])
+        baseline = matrix.baseline_total
+        baseline_total, projected_total, estimated_savings, impact_percent = _summary(baseline, projected)
+        return SavingsTargetResponse(
+            period_start=payload.start_date,
+            period_end=payload.end_date,
+            target_savings=payload.target_savings,
+            target_met=baseline - projected >= payload.target_savings - 0.005,
+            baseline_total=baseline_total,
+            projected_total=projected_total,
+            estimated_savings=estimated_savings,
+            impact_percent=impact_percent,
+            disruption=round(allocation.disruption, 4),
+            center_cuts=center_cuts,
+            category_cuts=category_cuts,
+        )
+
+    def start_session(self, payload: SimulationRequest, matrix: SimulationMatrix | None = None) -> SimulationSession:
+        if matrix is None:
+            matrix = self.load_matrix(payload.start_date, payload.end_date)
+        return SimulationSession.start(matrix, payload.start_date, payload.end_date, payload.center_cuts, payload.category_cuts)
+
+    def describe_session(
+        self,
+        session_id: str,
+        session: SimulationSession,
+        matrix: SimulationMatrix,
+        top_n: int,
+        changed: tuple[np.ndarray, np.ndarray] | None = None,
+    ) -> SimulationSessionResponse:
+        baseline_total, projected_total, estimated_savings, impact_percent = _summary(
+            matrix.baseline_total, session.projected_total
+        )
+        center_cuts, category_cuts = session.cuts(matrix)
+        center_ranking, category_ranking = session.rankings(matrix)
+        changed_centers, changed_categories = changed if changed is not None else (
+            np.arange(matrix.center_count),
+            np.arange(matrix.category_count),
+        )
+        return SimulationSessionResponse(
+            session_id=session_id,
+            period_start=session.start_date,
+            period_end=session.end_date,
+            baseline_total=baseline_total,
+            projected_total=projected_total,
+            estimated_savings=estimated_savings,
+            impact_percent=impact_percent,
+            changed_centers=len(changed_centers),
+            changed_categories=len(changed_categories),
+            center_cuts=center_cuts,
+            category_cuts=category_cuts,
+            center_impact_ranking=self._build_entity_ranking(
+                matrix.center_ids,
+                matrix.center_names,
+                matrix.center_baseline,
+                session.center_projected,
+                top_n,
+                order=center_ranking.order,
+            ),
+            category_impact_ranking=self._build_entity_ranking(
+                matrix.category_ids,
+                matrix.category_names,
+                matrix.category_baseline,
+                session.category_projected,
+                top_n,
+                order=category_ranking.order,
+            ),
+        )
 
     @staticmethod
     def _build_entity_ranking(
-        buckets: list[SimulationBucket],
-        id_field: str,
-        name_field: str,
+        entity_ids: np.ndarray,
+        entity_names: list[str],
+        baseline: np.ndarray,
+        projected: np.ndarray,
+        top_n: int | None = None,
+        order: np.ndarray | None = None,
     ) -> list[ImpactRankingItem]:
-        aggregates: dict[int, dict[str, float | str]] = {}
-        for item in buckets:
-            entity_id = int(getattr(item, id_field))
-            if entity_id not in aggregates:
-                aggregates[entity_id] = {"name": str(getattr(item, name_field)), "baseline": 0.0, "projected": 0.0}
-            aggregates[entity_id]["baseline"] = float(aggregates[entity_id]["baseline"]) + item.baseline_amount
-            aggregates[entity_id]["projected"] = float(aggregates[entity_id]["projected"]) + item.projected_amount
+        """``order``: indexes already sorted by descending approximate savings (see ``EntityRanking``)."""
+        indexes = np.arange(len(entity_ids))
+        if top_n is not None and top_n < len(indexes):
+            # Preselect with array math so a top-N ranking does not build one item per entity.
+            if order is None:
+                order = np.argsort(-approximate_savings(baseline, projected), kind="stable")
+            indexes = np.sort(order[:top_n])
 
         ranking: list[ImpactRankingItem] = []
-        for entity_id, values in aggregates.items():
-            baseline = round(float(values["baseline"]), 2)
-            projected = round(float(values["projected"]), 2)
-            savings = round(max(0.0, baseline - projected), 2)
-            impact_percent = round((savings / baseline) * 100, 2) if baseline else 0.0
+        for index in indexes.tolist():
+            entity_id, entity_name = int(entity_ids[index]), entity_names[index]
+            entity_baseline, entity_projected = float(baseline[index]), float(projected[index])
+            rounded_baseline, rounded_projected, savings, impact_percent = _summary(entity_baseline, entity_projected)
             ranking.append(
                 ImpactRankingItem(
                     entity_id=entity_id,
-                    entity_name=str(values["name"]),
-                    baseline_amount=baseline,
-                    projected_amount=projected,
+                    entity_name=entity_name,
+                    baseline_amount=rounded_baseline,
+                    projected_amount=rounded_projected,
                     estimated_savings=savings,
                     impact_percent=impact_percent,
                 )
@@ -154,20 +268,3 @@ class SimulationService:
 
         ranking.sort(key=lambda item: item.estimated_savings, reverse=True)
         return ranking
-
-    def _build_response(self, buckets: list[SimulationBucket]) -> SimulationResponse:
-        baseline_total = round(sum(item.baseline_amount for item in buckets), 2)
-        projected_total = round(sum(item.projected_amount for item in buckets), 2)
-        estimated_savings = round(max(0.0, baseline_total - projected_total), 2)
-        impact_percent = round((estimated_savings / baseline_total) * 100, 2) if baseline_total else 0.0
-        center_ranking = self._build_entity_ranking(buckets, "cost_center_id", "cost_center_name")
-        category_ranking = self._build_entity_ranking(buckets, "category_id", "category_name")
-
-        return SimulationResponse(
-            baseline_total=baseline_total,
-            projected_total=projected_total,
-            estimated_savings=estimated_savings,
-            impact_percent=impact_percent,
-            center_impact_ranking=center_ranking,
-            category_impact_ranking=category_ranking,
-        )
@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import json
+import struct
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import date
+
+import numpy as np
+
+from app.schemas.simulations import CutByCategory, CutByCenter
+from app.services.simulation_matrix import SimulationMatrix, absolute_cut_share
+
+# Magic, header length and the running projected total; fixed-size so edits can patch it in place.
+_MAGIC = b"SIM2"
+_PREFIX = struct.Struct("<4sId")
+_ARRAYS = (
+    "center_factor",
+    "center_absolute",
+    "category_factor",
+    "category_absolute",
+    "center_base",
+    "center_weight",
+    "category_sums",
+    "category_weight",
+    "center_sums",
+)
+# Above this share of changed rows, re-derive a sum with one matrix product instead of row updates.
+_FULL_UPDATE_SHARE = 0.25
+# Above this many changed byte ranges, rewrite the whole serialized session instead.
+_MAX_PATCHES = 256
+
+
+def approximate_savings(baseline: np.ndarray, projected: np.ndarray) -> np.ndarray:
+    """Per-entity savings rounded like ``ImpactRankingItem.estimated_savings``, for top-N preselection."""
+    return np.round(np.maximum(0.0, np.round(baseline, 2) - np.round(projected, 2)), 2)
+
+
+@dataclass(frozen=True)
+class EntityRanking:
+    """Entity indexes ordered by descending ``approximate_savings``, ties by index.
+
+    Matches ``np.argsort(-savings, kind="stable")``; an edit re-slots only the entities it changed.
+    """
+
+    savings: np.ndarray
+    order: np.ndarray
+
+    @classmethod
+    def build(cls, baseline: np.ndarray, projected: np.ndarray) -> EntityRanking:
+        savings = approximate_savings(baseline, projected)
+        return cls(savings=savings, order=np.argsort(-savings, kind="stable"))
+
+    def updated(self, baseline: np.ndarray, projected: np.ndarray, changed: np.ndarray) -> EntityRanking:
+        if len(changed) == 0:
+            return self
+        if len(changed) > _FULL_UPDATE_SHARE * len(self.order):
+            return EntityRanking.build(baseline, projected)
+        savings = self.savings.copy()
+        savings[changed] = approximate_savings(baseline[changed], projected[changed])
+
+        kept = np.ones(len(savings), dtype=bool)
+        kept[changed] = False
+        rest = self.order[kept[self.order]]
+        moved = changed[np.lexsort((changed, -savings[changed]))]
+        rest_keys, moved_keys = -savings[rest], -savings[moved]
+        positions = np.searchsorted(rest_keys, moved_keys, side="left")
+        tie_ends = np.searchsorted(rest_keys, moved_keys, side="right")
+        # Within a run of equal savings the order is by index.
+        for slot in np.flatnonzero(tie_ends > positions).tolist():
+            start, stop = positions[slot], tie_ends[slot]
+            positions[slot] = start + np.searchsorted(rest[start:stop], moved[slot])
+        return EntityRanking(savings=savings, order=np.insert(rest, positions, moved))
+
+
+@dataclass
+class SimulationSession:
+    """Cuts and intermediate sums of one scenario, kept so edits can be applied incrementally.
+
+    Mirrors ``SimulationMatrix.evaluate`` for a single scenario:
+
+    - ``center_base = grid @ category_factor`` (center totals before absolute cuts, per unit of
+      center factor) gives ``center_weight``;
+    - ``category_sums = center_weight @ grid`` gives ``category_weight``;
+    - ``center_sums = grid @ category_weight``.
+
+    Projected amounts are ``center_weight * center_sums`` per center and
+    ``category_weight * category_sums`` per category. An edit only touches the grid rows and
+    columns of the entities whose weights actually changed, and re-slots only those entities in the
+    cached rankings.
+    """
+
+    start_date: date
+    end_date: date
+    matrix_fingerprint: str
+    center_factor: np.ndarray
+    center_absolute: np.ndarray
+    category_factor: np.ndarray
+    category_absolute: np.ndarray
+    center_base: np.ndarray = field(repr=False)
+    center_weight: np.ndarray = field(repr=False)
+    category_sums: np.ndarray = field(repr=False)
+    category_weight: np.ndarray = field(repr=False)
+    center_sums: np.ndarray = field(repr=False)
+    projected_total: float = 0.0
+    center_ranking: EntityRanking | None = field(default=None, repr=False, compare=False)
+    category_ranking: EntityRanking | None = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def start(
+        cls,
+        matrix: SimulationMatrix,
+        start_date: date,
+        end_date: date,
+        center_cuts: Sequence[CutByCenter],
+        category_cuts: Sequence[CutByCategory],
+    ) -> SimulationSession:
+        cuts = matrix.encode_cuts([(center_cuts, category_cuts)])
+        empty_centers = np.zeros(matrix.center_count)
+        empty_categories = np.zeros(matrix.category_count)
+        session = cls(
+            start_date=start_date,
+            end_date=end_date,
+            matrix_fingerprint=matrix.fingerprint,
+            center_factor=cuts.center_factor[0],
+            center_absolute=cuts.center_absolute[0],
+            category_factor=cuts.category_factor[0],
+            category_absolute=cuts.category_absolute[0],
+            center_base=empty_centers,
+            center_weight=empty_centers.copy(),
+            category_sums=empty_categories,
+            category_weight=empty_categories.copy(),
+            center_sums=empty_centers.copy(),
+        )
+        session.recompute(matrix)
+        return session
+
+    @property
+    def center_projected(self) -> np.ndarray:
+        return self.center_weight * self.center_sums
+
+    @property
+    def category_projected(self) -> np.ndarray:
+        return self.category_weight * self.category_sums
+
+    def rankings(self, matrix: SimulationMatrix) -> tuple[EntityRanking, EntityRanking]:
+        """Center and category rankings, built on first use after a load or a full recompute."""
+        if self.center_ranking is None or self.category_ranking is None:
+            self.center_ranking = EntityRanking.build(matrix.center_baseline, self.center_projected)
+            self.category_ranking = EntityRanking.build(matrix.category_baseline, self.category_projected)
+        return self.center_ranking, self.category_ranking
+
+    def cuts(self, matrix: SimulationMatrix) -> tuple[list[CutByCenter], list[CutByCategory]]:
+        center_cuts = [
+            CutByCenter(
+                cost_center_id=int(matrix.center_ids[index]),
+                percent_cut=round(float(1 - self.center_factor[index]) * 100, 10),
+                absolute_cut=float(self.center_absolute[index]),
+            )
+            for index in np.flatnonzero((self.center_factor != 1) | (self.center_absolute > 0)).tolist()
+        ]
+        category_cuts = [
+            CutByCategory(
+                category_id=int(matrix.category_ids[index]),
+                percent_cut=round(float(1 - self.category_factor[index]) * 100, 10),
+                absolute_cut=float(self.category_absolute[index]),
+            )
+            for index in np.flatnonzero((self.category_factor != 1) | (self.category_absolute > 0)).tolist()
+        ]
+        return center_cuts, category_cuts
+
+    def recompute(self, matrix: SimulationMatrix) -> None:
+        """Derives every intermediate from the cuts with full matrix products."""
+        grid = matrix.grid
+        self.matrix_fingerprint = matrix.fingerprint
+        self.center_base = grid @ self.category_factor
+        self.center_weight = self._center_weights()
+        self.category_sums = self.center_weight @ grid
+        self.category_weight = self._category_weights()
+        self.center_sums = grid @ self.category_weight
+        self.projected_total = float(self.center_weight @ self.center_sums)
+        self.center_ranking = None
+        self.category_ranking = None
+
+    def refresh(self, matrix: SimulationMatrix) -> bool:
+        """Re-derives the sums if the baseline matrix was rebuilt from different data."""
+        if matrix.fingerprint == self.matrix_fingerprint:
+            return False
+        self.recompute(matrix)
+        return True
+
+    def apply(
+        self,
+        matrix: SimulationMatrix,
+        center_cuts: Sequence[CutByCenter],
+        category_cuts: Sequence[CutByCategory],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Replaces the given entities' cuts; returns the indexes of centers/categories whose
+        projected amounts changed. Ids not in the matrix are ignored.
+        """
+        if matrix.fingerprint != self.matrix_fingerprint:
+            self._set_cuts(matrix, center_cuts, category_cuts)
+            self.recompute(matrix)
+            return np.arange(matrix.center_count), np.arange(matrix.category_count)
+
+        grid = matrix.grid
+        previous_center = self.center_projected
+        previous_category = self.category_projected
+        previous_category_factor = self.category_factor.copy()
+        self._set_cuts(matrix, center_cuts, category_cuts)
+
+        self.center_base = _update_center_sums(grid, self.center_base, self.category_factor - previous_category_factor)
+        center_weight = self._center_weights()
+        self.category_sums = _update_category_sums(grid, self.category_sums, center_weight - self.center_weight)
+        self.center_weight = center_weight
+        category_weight = self._category_weights()
+        self.center_sums = _update_center_sums(grid, self.center_sums, category_weight - self.category_weight)
+        self.category_weight = category_weight
+
+        center_projected = self.center_projected
+        category_projected = self.category_projected
+        changed_centers = np.flatnonzero(center_projected != previous_center)
+        changed_categories = np.flatnonzero(category_projected != previous_category)
+        self.projected_total += float((center_projected[changed_centers] - previous_center[changed_centers]).sum())
+        if self.center_ranking is not None and self.category_ranking is not None:
+            self.center_ranking = self.center_ranking.updated(matrix.center_baseline, center_projected, changed_centers)
+            self.category_ranking = self.category_ranking.updated(
+                matrix.category_baseline, category_projected, changed_categories
+            )
+        return changed_centers, changed_categories
+
+    def _set_cuts(
+        self,
+        matrix: SimulationMatrix,
+        center_cuts: Sequence[CutByCenter],
+        category_cuts: Sequence[CutByCategory],
+    ) -> None:
+        self.center_factor = self.center_factor.copy()
+        self.center_absolute = self.center_absolute.copy()
+        self.category_factor = self.category_factor.copy()
+        self.category_absolute = self.category_absolute.copy()
+        for center_cut in center_cuts:
+            index = matrix.center_position(center_cut.cost_center_id)
+            if index is not None:
+                self.center_factor[index] = 1 - center_cut.percent_cut / 100
+                self.center_absolute[index] = center_cut.absolute_cut
+        for category_cut in category_cuts:
+            index = matrix.category_position(category_cut.category_id)
+            if index is not None:
+                self.category_factor[index] = 1 - category_cut.percent_cut / 100
+                self.category_absolute[index] = category_cut.absolute_cut
+
+    def _center_weights(self) -> np.ndarray:
+        totals = self.center_factor * self.center_base
+        return self.center_factor * (1 - absolute_cut_share(self.center_absolute, totals))
+
+    def _category_weights(self) -> np.ndarray:
+        totals = self.category_factor * self.category_sums
+        return self.category_factor * (1 - absolute_cut_share(self.category_absolute, totals))
+
+    def _header(self) -> bytes:
+        return json.dumps(
+            {
+                "start_date": self.start_date.isoformat(),
+                "end_date": self.end_date.isoformat(),
+                "matrix_fingerprint": self.matrix_fingerprint,
+                "lengths": [len(getattr(self, name)) for name in _ARRAYS],
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    def to_bytes(self) -> bytes:
+        header = self._header()
+        arrays = (np.ascontiguousarray(getattr(self, name), dtype="<f8").tobytes() for name in _ARRAYS)
+        return b"".join([_PREFIX.pack(_MAGIC, len(header), self.projected_total), header, *arrays])
+
+    def patches_since(self, previous: SimulationSession) -> list[tuple[int, bytes]] | None:
+        """``(offset, bytes)`` ranges turning ``previous.to_bytes()`` into ``self.to_bytes()``.
+
+        ``previous`` is a shallow copy taken before ``apply``, which replaces arrays instead of
+        writing into them. Returns None when a full write is required or smaller.
+        """
+        header = self._header()
+        if header != previous._header():
+            return None
+        patches = [(0, _PREFIX.pack(_MAGIC, len(header), self.projected_total))]
+        offset = _PREFIX.size + len(header)
+        for name in _ARRAYS:
+            current = getattr(self, name)
+            before = getattr(previous, name)
+            if current is not before:
+                changed = np.flatnonzero(current != before)
+                if len(changed):
+                    starts = np.flatnonzero(np.diff(changed, prepend=-2) != 1)
+                    if len(patches) + len(starts) > _MAX_PATCHES:
+                        return None
+                    stops = np.append(starts[1:], len(changed))
+                    for start, stop in zip(changed[starts].tolist(), (changed[stops - 1] + 1).tolist()):
+                        chunk = np.ascontiguousarray(current[start:stop], dtype="<f8").tobytes()
+                        patches.append((offset + start * 8, chunk))
+            offset += len(current) * 8
+        if sum(len(chunk) for _, chunk in patches) > offset // 2:
+            return None
+        return patches
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> SimulationSession:
+        magic, header_length, projected_total = _PREFIX.unpack_from(payload)
+        if magic != _MAGIC:
+            raise ValueError("not a simulation session payload")
+        offset = _PREFIX.size + header_length
+        header = json.loads(payload[_PREFIX.size : offset])
+        arrays: dict[str, np.ndarray] = {}
+        for name, length in zip(_ARRAYS, header["lengths"]):
+            arrays[name] = np.frombuffer(payload, dtype="<f8", count=length, offset=offset).copy()
+            offset += length * 8
+        return cls(
+            start_date=date.fromisoformat(header["start_date"]),
+            end_date=date.fromisoformat(header["end_date"]),
+            matrix_fingerprint=header["matrix_fingerprint"],
+            projected_total=projected_total,
+            **arrays,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in _ARRAYS)
+
+
+def _update_center_sums(grid: np.ndarray, sums: np.ndarray, category_delta: np.ndarray) -> np.ndarray:
+    """``sums + grid @ category_delta``, touching only the columns whose delta is non-zero."""
+    changed = np.flatnonzero(category_delta)
+    if len(changed) == 0:
+        return sums
+    if len(changed) > _FULL_UPDATE_SHARE * grid.shape[1]:
+        return sums + grid @ category_delta
+    return sums + grid[:, changed] @ category_delta[changed]
+
+
+def _update_category_sums(grid: np.ndarray, sums: np.ndarray, center_delta: np.ndarray) -> np.ndarray:
+    """``sums + center_delta @ grid``, touching only the rows whose delta is non-zero."""
+    changed = np.flatnonzero(center_delta)
+    if len(changed) == 0:
+        return sums
+    if len(changed) > _FULL_UPDATE_SHARE * grid.shape[0]:
+        return sums + center_delta @ grid
+    return sums + center_delta[changed] @ grid[changed, :]
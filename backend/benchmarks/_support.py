@@ -0,0 +1,56 @@
+"""Shared helpers for the benchmark scripts (run them from the ``backend`` directory)."""
+
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import Executable
+from sqlalchemy.engine import Dialect
+
+
+class StatementCaptured(Exception):
+    def __init__(self, statement: Executable) -> None:
+        super().__init__("statement captured")
+        self.statement = statement
+
+
+class CapturingSession:
+    """Stand-in session that records the first statement a repository method executes."""
+
+    def execute(self, statement: Executable, *_args: Any, **_kwargs: Any) -> Any:
+        raise StatementCaptured(statement)
+
+
+def capture_statement(call: Callable[[Any], Any]) -> Executable:
+    try:
+        call(CapturingSession())
+    except StatementCaptured as captured:
+        return captured.statement
+    raise RuntimeError("repository call did not execute any statement")
+
+
+def render_sql(statement: Executable, dialect: Dialect) -> str:
+    return str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+
+def time_call(call: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> dict[str, float]:
+    for _ in range(warmup):
+        call()
+    samples: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def print_table(headers: list[str], rows: list[list[Any]]) -> None:
+    print("| " + " | ".join(headers) + " |")
+    print("|" + "|".join("---" for _ in headers) + "|")
+    for row in rows:
+        print("| " + " | ".join(str(value) for value in row) + " |")
@@ -0,0 +1,86 @@
+"""Python loop vs NumPy engine for the AnalyticsService bucket analyses.
+
+Feeds the same synthetic monthly bucket totals (``--centers`` x ``--categories`` buckets over
+``--months`` months, with a few gaps and spikes) to both paths, checks that the responses are
+identical and prints the timings. No database needed.
+
+    python -m benchmarks.bench_analytics_engine --centers 200 --categories 40 --months 36
+"""
+
+import argparse
+import random
+from datetime import date
+from typing import Any
+
+from dateutil.relativedelta import relativedelta
+
+from app.services import AnalyticsService
+from benchmarks._support import print_table, time_call
+
+
+class SyntheticBucketRepository:
+    def __init__(self, centers: int, categories: int, months: int, seed: int) -> None:
+        rng = random.Random(seed)
+        first_month = date(2023, 1, 1)
+        self.rows: list[dict[str, Any]] = []
+        for offset in range(months):
+            month = first_month + relativedelta(months=offset)
+            for center in range(centers):
+                for category in range(categories):
+                    if rng.random() < 0.03:
+                        continue
+                    spike = 2.5 if rng.random() < 0.01 else 1.0
+                    self.rows.append(
+                        {
+                            "month": month,
+                            "cost_center": f"Centro {center:04d}",
+                            "category": f"Categoria {category:03d}",
+                            "total_amount": round(rng.uniform(2000, 8000) * spike, 2),
+                        }
+                    )
+        self.period_start = first_month
+        self.period_end = first_month + relativedelta(months=months) - relativedelta(days=1)
+
+    def get_monthly_bucket_totals(self, _start_date: date, _end_date: date) -> list[dict[str, Any]]:
+        return self.rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--centers", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    repository = SyntheticBucketRepository(args.centers, args.categories, args.months, args.seed)
+    services = {
+        "python": AnalyticsService(repository, vectorized=False),  # type: ignore[arg-type]
+        "numpy": AnalyticsService(repository, vectorized=True),  # type: ignore[arg-type]
+    }
+    workloads = {
+        "detect_anomalies": lambda service: service.detect_anomalies(
+            repository.period_start, repository.period_end, threshold_z=2.0, history_window=4, top_n=100
+        ),
+        "quick_wins": lambda service: service.quick_wins(
+            repository.period_start, repository.period_end, target_reduction_percent=8.0, minimum_total=10000.0, top_n=10
+        ),
+    }
+
+    rows: list[list[object]] = []
+    for name, call in workloads.items():
+        outputs = {engine: call(service) for engine, service in services.items()}
+        if outputs["python"] != outputs["numpy"]:
+            raise SystemExit(f"{name}: engines disagree")
+        timings = {engine: time_call(lambda service=service: call(service), repeat=args.repeat) for engine, service in services.items()}
+        speedup = timings["python"]["median_ms"] / max(timings["numpy"]["median_ms"], 1e-9)
+        for engine, timing in timings.items():
+            rows.append([name, engine, timing["min_ms"], timing["median_ms"], timing["max_ms"], f"{speedup:.1f}x" if engine == "numpy" else ""])
+
+    print(f"buckets={args.centers * args.categories} months={args.months} rows={len(repository.rows)}\n")
+    print_table(["analysis", "engine", "min ms", "median ms", "max ms", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
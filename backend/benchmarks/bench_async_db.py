@@ -0,0 +1,126 @@
+"""Requests/second of the DB-bound endpoints with the sync vs async database path.
+
+Starts one uvicorn worker per mode (``DB_ASYNC_ENABLED=false`` then ``true``) with the Redis
+cache disabled so every request reaches PostgreSQL, then fires ``--requests`` GETs at each
+endpoint with ``--concurrency`` in-flight requests and prints throughput and latency
+percentiles. Needs a seeded database reachable through ``DATABASE_URL``.
+
+    python -m benchmarks.bench_async_db --requests 2000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date
+
+import httpx
+
+from benchmarks._support import print_table
+
+ENDPOINTS = {
+    "overview": "/api/v1/costs/overview?start_date={start}&end_date={end}",
+    "aggregate": "/api/v1/costs/aggregate?start_date={start}&end_date={end}&group_by=cost_center&group_by=month",
+    "waste_ranking": "/api/v1/waste/ranking?end_date={end}&lookback_months=3",
+    "budget_variance": "/api/v1/budgets/variance?start_date={start}&end_date={end}",
+}
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _wait_until_ready(client: httpx.AsyncClient, timeout_seconds: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+async def _load(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> dict[str, float]:
+    latencies: list[float] = []
+    failures = 0
+    remaining = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal failures
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(_percentile(latencies, 0.95), 2),
+        "p99_ms": round(_percentile(latencies, 0.99), 2),
+        "errors": failures,
+    }
+
+
+async def _bench_mode(args: argparse.Namespace, port: int, paths: dict[str, str]) -> dict[str, dict[str, float]]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    headers = {"X-API-Key": args.api_key} if args.api_key else {}
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, headers=headers, timeout=60) as client:
+        await _wait_until_ready(client)
+        results = {}
+        for name, path in paths.items():
+            await _load(client, path, min(args.concurrency, args.requests), args.concurrency)
+            results[name] = await _load(client, path, args.requests, args.concurrency)
+        return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint and mode")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date(2025, 12, 31))
+    parser.add_argument("--api-key", default=os.environ.get("API_KEY_VALUE", ""))
+    args = parser.parse_args(argv)
+
+    paths = {name: template.format(start=args.start_date, end=args.end_date) for name, template in ENDPOINTS.items()}
+    rows = []
+    for async_enabled in (False, True):
+        env = {
+            **os.environ,
+            "DB_ASYNC_ENABLED": str(async_enabled).lower(),
+            "CACHE_ENABLED": "false",
+            "RATE_LIMIT_ENABLED": "false",
+            "LOG_LEVEL": "WARNING",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+            env=env,
+        )
+        try:
+            results = asyncio.run(_bench_mode(args, args.port, paths))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+        mode = "async" if async_enabled else "sync"
+        for name, stats in results.items():
+            rows.append([name, mode, stats["rps"], stats["p50_ms"], stats["p95_ms"], stats["p99_ms"], stats["errors"]])
+
+    rows.sort(key=lambda row: (row[0], row[1]))
+    print_table(["endpoint", "mode", "req/s", "p50 ms", "p95 ms", "p99 ms", "errors"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Cache-hit latency of a cached GET route: decoded dict + ``response_model`` vs raw JSON bytes.
+
+Serves a synthetic ``CostAggregateResponse`` of ``--items`` rows from routes of an in-process
+FastAPI app behind ``GZipMiddleware`` (as in ``app.main``), one per cache mode: decoded dict,
+raw bytes compressed by the middleware on every hit, and raw bytes stored gzip-compressed and
+passed through. Hits are timed through ``TestClient`` (``Accept-Encoding: gzip``) with the L1
+tier on (served from process memory) and off (read from Redis on every request; an in-memory
+stand-in here, so the round-trip itself is not measured). Also times encoding the payload with
+the stdlib ``json`` module vs ``encode_json`` (orjson when installed). No database or Redis needed.
+
+    python -m benchmarks.bench_cache_hits --items 2000
+"""
+
+import argparse
+import json
+import random
+from datetime import date, timedelta
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from app.core.cache import RedisCache, encode_json, orjson
+from app.core.compression import compress
+from app.core.config import Settings
+from app.schemas.costs import CostAggregateResponse
+from benchmarks._support import print_table, time_call
+
+
+class _InMemoryPipeline:
+    def __init__(self, redis: "InMemoryRedis") -> None:
+        self._redis = redis
+        self._commands: list[tuple[str, str]] = []
+
+    async def __aenter__(self) -> "_InMemoryPipeline":
+        return self
+
+    async def __aexit__(self, *_exc: object) -> None:
+        return None
+
+    def get(self, key: str) -> "_InMemoryPipeline":
+        self._commands.append(("get", key))
+        return self
+
+    def ttl(self, key: str) -> "_InMemoryPipeline":
+        self._commands.append(("ttl", key))
+        return self
+
+    async def execute(self) -> list[Any]:
+        results: list[Any] = []
+        for command, key in self._commands:
+            value, ttl = self._redis.store.get(key, (None, -2))
+            results.append(value if command == "get" else ttl)
+        return results
+
+
+class InMemoryRedis:
+    """Just enough of the ``redis.asyncio`` client for ``RedisCache`` hits and fills."""
+
+    def __init__(self, decode: bool) -> None:
+        self.store: dict[str, tuple[Any, int]] = {}
+        self._decode = decode
+
+    def pipeline(self, transaction: bool = True) -> _InMemoryPipeline:
+        return _InMemoryPipeline(self)
+
+    async def setex(self, key: str, ttl: int, value: Any) -> None:
+        if self._decode and isinstance(value, bytes):
+            value = value.decode("utf-8")
+        self.store[key] = (value, ttl)
+
+    async def set(self, key: str, value: str, nx: bool = False, px: int | None = None) -> bool:
+        if nx and key in self.store:
+            return False
+        self.store[key] = (value, (px or 0) // 1000)
+        return True
+
+    async def eval(self, _script: str, _numkeys: int, key: str, _token: str) -> int:
+        return int(self.store.pop(key, None) is not None)
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.store)
+
+    async def mget(self, keys: list[str]) -> list[Any]:
+        return [self.store.get(key, (None, -2))[0] for key in keys]
+
+
+def synthetic_aggregate(items: int, seed: int) -> dict[str, Any]:
+    rng = random.Random(seed)
+    rows = [
+        {
+            "month": (date(2023, 1, 1) + timedelta(days=31 * (index % 36))).replace(day=1).isoformat(),
+            "cost_center": f"Centro {index % 250:03d}",
+            "project": None,
+            "category": f"Categoria {index % 40:02d}",
+            "total_amount": round(rng.uniform(100, 250000), 2),
+        }
+        for index in range(items)
+    ]
+    response = CostAggregateResponse(
+        group_by=["month", "cost_center", "category"],
+        total_amount=round(sum(row["total_amount"] for row in rows), 2),
+        items=rows,  # type: ignore[arg-type]
+    )
+    return response.model_dump(mode="json")
+
+
+def _bench_cache(l1_enabled: bool, compression: str) -> RedisCache:
+    settings = Settings(
+        cache_enabled=True,
+        cache_l1_enabled=l1_enabled,
+        cache_swr_policies="",
+        cache_compression=compression,
+    )
+    return RedisCache(settings=settings, client=InMemoryRedis(decode=True), binary_client=InMemoryRedis(decode=False))
+
+
+def build_app(payload: dict[str, Any], l1_enabled: bool) -> FastAPI:
+    cache = _bench_cache(l1_enabled, compression="none")
+    compressed_cache = _bench_cache(l1_enabled, compression="gzip")
+    app = FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=512)
+
+    async def loader() -> dict[str, Any]:
+        return payload
+
+    @app.get("/dict", response_model=CostAggregateResponse)
+    async def cached_dict() -> dict[str, Any]:
+        return await cache.get_or_set_json("costs:aggregate:bench-dict", loader)
+
+    @app.get("/raw", response_model=CostAggregateResponse)
+    async def cached_raw() -> Response:
+        cached = await cache.get_or_set_body("costs:aggregate:bench-raw", loader)
+        return Response(content=cached.body, media_type="application/json")
+
+    @app.get("/compressed", response_model=CostAggregateResponse)
+    async def cached_compressed() -> Response:
+        cached = await compressed_cache.get_or_set_body("costs:aggregate:bench-compressed", loader)
+        headers = {"Content-Encoding": cached.encoding} if cached.encoding else {}
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+    return app
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    payload = synthetic_aggregate(args.items, args.seed)
+    rows: list[list[object]] = []
+    for l1_enabled in (True, False):
+        tier = "L1" if l1_enabled else "Redis"
+        with TestClient(build_app(payload, l1_enabled), headers={"Accept-Encoding": "gzip"}) as client:
+            bodies = [client.get(f"/{mode}").json() for mode in ("dict", "raw", "compressed")]
+            if any(body != bodies[0] for body in bodies):
+                raise SystemExit("dict, raw and compressed responses differ")
+            for mode in ("dict", "raw", "compressed"):
+                timing = time_call(lambda: client.get(f"/{mode}"), repeat=args.repeat, warmup=3)
+                rows.append([f"{tier} hit, {mode}", timing["min_ms"], timing["median_ms"], timing["max_ms"]])
+
+    encoders = {
+        "encode: json.dumps": lambda: json.dumps(payload, default=str).encode("utf-8"),
+        f"encode: encode_json ({'orjson' if orjson is not None else 'json'})": lambda: encode_json(payload),
+    }
+    for name, call in encoders.items():
+        timing = time_call(call, repeat=args.repeat, warmup=3)
+        rows.append([name, timing["min_ms"], timing["median_ms"], timing["max_ms"]])
+
+    body = encode_json(payload)
+    print(f"items={args.items} body={len(body) / 1024:.0f} KiB gzip={len(compress(body, 'gzip')) / 1024:.0f} KiB\n")
+    print_table(["workload", "min ms", "median ms", "max ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
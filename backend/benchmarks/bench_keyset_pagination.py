@@ -0,0 +1,114 @@
+"""OFFSET vs keyset pagination of the /costs/entries listing on a generated table.
+
+Builds a throwaway ``bench_keyset`` schema with the composite ``(reference_date, id)`` index,
+then runs the repository's listing query for increasingly deep pages, once with ``OFFSET`` and
+once with the keyset predicate ``(reference_date, id) > cursor``, under ``EXPLAIN ANALYZE``.
+
+    python -m benchmarks.bench_keyset_pagination --rows 5000000 --page-size 100
+"""
+
+import argparse
+import re
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import create_engine, text
+
+from app.core.config import get_settings
+from app.repositories.cost_repository import CostRepository
+from app.schemas.costs import CostFilters
+from benchmarks._support import capture_statement, print_table, render_sql
+from benchmarks.bench_partitioning import DIMENSION_DDL, ENTRY_COLUMNS, FILL_SQL
+
+SCHEMA = "bench_keyset"
+EXEC_TIME_RE = re.compile(r"Execution Time: ([\d.]+) ms")
+ROWS_RE = re.compile(r"\(actual time=[\d.]+\.\.[\d.]+ rows=(\d+)")
+
+
+def _build_schema(conn, args: argparse.Namespace, first_month: date) -> None:  # type: ignore[no-untyped-def]
+    params = {
+        "centers": args.centers,
+        "projects": args.projects,
+        "categories": args.categories,
+        "rows": args.rows,
+        "first_month": first_month.isoformat(),
+        "days": ((first_month + relativedelta(months=args.months)) - first_month).days,
+    }
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    for statement in DIMENSION_DDL.format(schema=SCHEMA).strip().split(";\n"):
+        conn.execute(text(statement), params)
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.cost_entries ({ENTRY_COLUMNS}, PRIMARY KEY (id))"))
+    conn.execute(text(FILL_SQL.format(schema=SCHEMA)), params)
+    conn.execute(text(f"CREATE INDEX ON {SCHEMA}.cost_entries(reference_date, id)"))
+    conn.execute(text(f"ANALYZE {SCHEMA}.cost_entries"))
+
+
+def _explain(conn, sql: str) -> tuple[str, str]:  # type: ignore[no-untyped-def]
+    conn.execute(text(f"EXPLAIN ANALYZE {sql}"))  # warm cache
+    plan = "\n".join(row[0] for row in conn.execute(text(f"EXPLAIN ANALYZE {sql}")))
+    execution = EXEC_TIME_RE.search(plan)
+    scanned = max((int(value) for value in ROWS_RE.findall(plan)), default=0)
+    return (execution.group(1) if execution else "?"), str(scanned)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--centers", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--skip-build", action="store_true", help="Reuse the schema from a previous run.")
+    parser.add_argument("--keep", action="store_true", help="Keep the bench schema after the run.")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(get_settings().database_url)
+    first_month = date.today().replace(day=1) - relativedelta(months=args.months)
+    filters = CostFilters(start_date=first_month, end_date=date.today())
+
+    if not args.skip_build:
+        with engine.begin() as conn:
+            _build_schema(conn, args, first_month)
+
+    rows: list[list[object]] = []
+    with engine.connect() as conn:
+        conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+        for page in args.pages:
+            offset = (page - 1) * args.page_size
+            offset_stmt = capture_statement(
+                lambda db: CostRepository(db).list_cost_entries(filters, limit=args.page_size)
+            ).offset(offset)
+            after = None
+            if offset:
+                # The cursor a client would hold: the key of the last row of the previous page.
+                previous = conn.execute(
+                    text(
+                        "SELECT reference_date, id FROM cost_entries "
+                        "ORDER BY reference_date, id OFFSET :skip LIMIT 1"
+                    ),
+                    {"skip": offset - 1},
+                ).one_or_none()
+                if previous is None:
+                    continue
+                after = (previous.reference_date, previous.id)
+            keyset_stmt = capture_statement(
+                lambda db: CostRepository(db).list_cost_entries(filters, limit=args.page_size, after=after)
+            )
+            for label, stmt in (("offset", offset_stmt), ("keyset", keyset_stmt)):
+                execution_ms, scanned = _explain(conn, render_sql(stmt, engine.dialect))
+                rows.append([page, label, execution_ms, scanned])
+        conn.execute(text("RESET search_path"))
+
+    print(f"rows={args.rows} page_size={args.page_size}\n")
+    print_table(["page", "strategy", "execution ms", "max rows in plan node"], rows)
+
+    if not args.keep:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Compare heap vs monthly-partitioned cost_entries on a generated dataset.
+
+Builds two throwaway schemas (``bench_heap`` and ``bench_partitioned``) with the same rows,
+then runs the repository's own queries under ``EXPLAIN (ANALYZE, BUFFERS)`` in each and prints
+planning/execution time and how many cost_entries relations the plan touched.
+
+    python -m benchmarks.bench_partitioning --rows 5000000 --months 36
+"""
+
+import argparse
+import re
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import create_engine, text
+
+from app.core.config import get_settings
+from app.repositories.cost_repository import CostRepository
+from app.schemas.costs import CostFilters
+from benchmarks._support import capture_statement, print_table, render_sql
+
+SCHEMAS = ("bench_heap", "bench_partitioned")
+
+DIMENSION_DDL = """
+CREATE TABLE {schema}.cost_centers (id INTEGER PRIMARY KEY, code VARCHAR(32) NOT NULL, name VARCHAR(120) NOT NULL);
+CREATE TABLE {schema}.projects (id INTEGER PRIMARY KEY, code VARCHAR(32) NOT NULL, name VARCHAR(140) NOT NULL);
+CREATE TABLE {schema}.categories (id INTEGER PRIMARY KEY, code VARCHAR(32) NOT NULL, name VARCHAR(120) NOT NULL);
+INSERT INTO {schema}.cost_centers SELECT g, 'CC-' || g, 'Centro ' || lpad(g::text, 5, '0') FROM generate_series(1, :centers) g;
+INSERT INTO {schema}.projects SELECT g, 'PRJ-' || g, 'Projeto ' || lpad(g::text, 5, '0') FROM generate_series(1, :projects) g;
+INSERT INTO {schema}.categories SELECT g, 'CAT-' || g, 'Categoria ' || lpad(g::text, 5, '0') FROM generate_series(1, :categories) g;
+"""
+
+ENTRY_COLUMNS = """
+    id BIGINT NOT NULL,
+    cost_center_id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    reference_date DATE NOT NULL,
+    amount NUMERIC(14, 2) NOT NULL,
+    currency CHAR(3) NOT NULL DEFAULT 'BRL',
+    description TEXT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+"""
+
+HEAP_DDL = f"""
+CREATE TABLE bench_heap.cost_entries ({ENTRY_COLUMNS}, PRIMARY KEY (id));
+"""
+
+HEAP_INDEXES = """
+CREATE INDEX ON bench_heap.cost_entries(reference_date);
+CREATE INDEX ON bench_heap.cost_entries(cost_center_id);
+CREATE INDEX ON bench_heap.cost_entries(project_id);
+CREATE INDEX ON bench_heap.cost_entries(category_id);
+"""
+
+PARTITIONED_DDL = f"""
+CREATE TABLE bench_partitioned.cost_entries ({ENTRY_COLUMNS}, PRIMARY KEY (id, reference_date))
+PARTITION BY RANGE (reference_date);
+"""
+
+PARTITIONED_INDEXES = """
+CREATE INDEX ON bench_partitioned.cost_entries(reference_date);
+CREATE INDEX ON bench_partitioned.cost_entries(cost_center_id, reference_date);
+CREATE INDEX ON bench_partitioned.cost_entries(project_id, reference_date);
+CREATE INDEX ON bench_partitioned.cost_entries(category_id, reference_date);
+"""
+
+FILL_SQL = """
+INSERT INTO {schema}.cost_entries (id, cost_center_id, project_id, category_id, reference_date, amount)
+SELECT
+    g,
+    1 + (g % :centers),
+    1 + ((g / 7) % :projects),
+    1 + ((g / 3) % :categories),
+    (CAST(:first_month AS date) + ((g * 7919) % :days)::int)::date,
+    round((100 + (g * 104729) % 50000)::numeric / 3, 2)
+FROM generate_series(1, CAST(:rows AS bigint)) g
+"""
+
+PLAN_TIME_RE = re.compile(r"Planning Time: ([\d.]+) ms")
+EXEC_TIME_RE = re.compile(r"Execution Time: ([\d.]+) ms")
+RELATION_RE = re.compile(r" on (cost_entries(?:_\d{4}_\d{2}|_default)?)\b")
+
+
+def _build_schemas(conn, args: argparse.Namespace, first_month: date) -> None:  # type: ignore[no-untyped-def]
+    days = ((first_month + relativedelta(months=args.months)) - first_month).days
+    params = {
+        "centers": args.centers,
+        "projects": args.projects,
+        "categories": args.categories,
+        "rows": args.rows,
+        "first_month": first_month.isoformat(),
+        "days": days,
+    }
+    for schema in SCHEMAS:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+        for statement in DIMENSION_DDL.format(schema=schema).strip().split(";\n"):
+            conn.execute(text(statement), params)
+
+    conn.execute(text(HEAP_DDL))
+    conn.execute(text(PARTITIONED_DDL))
+    for offset in range(args.months):
+        month = first_month + relativedelta(months=offset)
+        conn.execute(
+            text(
+                f"CREATE TABLE bench_partitioned.cost_entries_{month:%Y_%m} PARTITION OF bench_partitioned.cost_entries "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{(month + relativedelta(months=1)).isoformat()}')"
+            )
+        )
+
+    for schema in SCHEMAS:
+        conn.execute(text(FILL_SQL.format(schema=schema)), params)
+    for statement in (HEAP_INDEXES + PARTITIONED_INDEXES).strip().splitlines():
+        conn.execute(text(statement))
+    for schema in SCHEMAS:
+        conn.execute(text(f"ANALYZE {schema}.cost_entries"))
+
+
+def _workload(last_month: date) -> list[tuple[str, object]]:
+    end_date = last_month + relativedelta(months=1) - relativedelta(days=1)
+
+    def months_back(months: int) -> date:
+        return end_date - relativedelta(months=months) + relativedelta(days=1)
+
+    one_month = CostFilters(start_date=last_month, end_date=end_date)
+    quarter_center = CostFilters(start_date=months_back(3), end_date=end_date, cost_center_ids=[1, 2, 3])
+    return [
+        ("aggregate 1 month by category", lambda db: CostRepository(db, use_rollup=False).get_aggregated_costs(one_month, ["category"])),
+        ("overview 3 months, 3 centers", lambda db: CostRepository(db, use_rollup=False).get_grouped_costs(quarter_center, [("month",), ("cost_center",), ("category",), ()])),
+        ("waste ranking 3+3 months", lambda db: CostRepository(db, use_rollup=False).get_waste_ranking_buckets(months_back(6), months_back(3), end_date, 10)),
+        ("monthly buckets 12 months", lambda db: CostRepository(db, use_rollup=False).get_monthly_bucket_totals(months_back(12), end_date)),
+    ]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--centers", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--skip-build", action="store_true", help="Reuse schemas from a previous run.")
+    parser.add_argument("--keep", action="store_true", help="Keep the bench schemas after the run.")
+    parser.add_argument("--plans", action="store_true", help="Also print every EXPLAIN (ANALYZE, BUFFERS) plan.")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(get_settings().database_url)
+    first_month = date.today().replace(day=1) - relativedelta(months=args.months)
+    last_month = first_month + relativedelta(months=args.months - 1)
+
+    if not args.skip_build:
+        with engine.begin() as conn:
+            _build_schemas(conn, args, first_month)
+
+    rows: list[list[object]] = []
+    plans: list[tuple[str, str, str]] = []
+    with engine.connect() as conn:
+        for label, call in _workload(last_month):
+            sql = render_sql(capture_statement(call), engine.dialect)
+            for schema in SCHEMAS:
+                conn.execute(text(f"SET search_path TO {schema}, public"))
+                conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"))  # warm cache
+                plan = "\n".join(row[0] for row in conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")))
+                plans.append((label, schema, plan))
+                relations = sorted(set(RELATION_RE.findall(plan)))
+                rows.append(
+                    [
+                        label,
+                        schema,
+                        PLAN_TIME_RE.search(plan).group(1) if PLAN_TIME_RE.search(plan) else "?",
+                        EXEC_TIME_RE.search(plan).group(1) if EXEC_TIME_RE.search(plan) else "?",
+                        len(relations),
+                    ]
+                )
+        conn.execute(text("RESET search_path"))
+
+    print(f"rows={args.rows} months={args.months} centers={args.centers} categories={args.categories}\n")
+    print_table(["query", "layout", "planning ms", "execution ms", "cost_entries relations"], rows)
+    if args.plans:
+        for label, schema, plan in plans:
+            print(f"\n### {label} ({schema})\n\n```\n{plan}\n```")
+
+    if not args.keep:
+        with engine.begin() as conn:
+            for schema in SCHEMAS:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Array-backed SimulationService on a large synthetic center x category matrix.
+
+Builds ``--centers`` x ``--categories`` buckets (some empty), then times building the
+``SimulationMatrix``, a single ``run`` and ``compare`` over ``--scenarios`` scenarios. It also
+evaluates ``--sweep`` scenarios batched in one call vs one ``evaluate`` per scenario (checking
+that both give the same projections) and a ``sweep`` over a two-axis grid of ``--grid`` x
+``--grid`` percent cuts. Finally it times ``optimize`` for a savings target of ``--target-percent``
+of the baseline with every center and category cuttable up to 15%, and single-knob edits of a
+``SimulationSession`` (one center, one category) against a full evaluation. No database needed.
+
+    python -m benchmarks.bench_simulation_engine --centers 5000 --categories 500
+"""
+
+import argparse
+import random
+from datetime import date
+from typing import Any
+
+import numpy as np
+
+from app.schemas.simulations import (
+    CategoryCutBound,
+    CutByCategory,
+    CutByCenter,
+    SavingsTargetRequest,
+    SimulationComparisonRequest,
+    SimulationRequest,
+    SimulationScenarioInput,
+    SimulationSweepRequest,
+    SweepAxis,
+)
+from app.services import SimulationService
+from app.services.simulation_matrix import SimulationMatrix
+from app.services.simulation_session import SimulationSession
+from benchmarks._support import print_table, time_call
+
+PERIOD_START = date(2025, 1, 1)
+PERIOD_END = date(2025, 12, 31)
+
+
+class SyntheticMatrixRepository:
+    def __init__(self, centers: int, categories: int, seed: int) -> None:
+        rng = random.Random(seed)
+        center_names = [f"Centro {center:05d}" for center in range(centers)]
+        category_names = [f"Categoria {category:03d}" for category in range(categories)]
+        self.rows: list[dict[str, Any]] = [
+            {
+                "cost_center_id": center + 1,
+                "cost_center_name": center_names[center],
+                "category_id": category + 1,
+                "category_name": category_names[category],
+                "total_amount": round(rng.uniform(500, 50000), 2),
+            }
+            for center in range(centers)
+            for category in range(categories)
+            if rng.random() >= 0.05
+        ]
+
+    def get_simulation_matrix(self, _filters: Any) -> list[dict[str, Any]]:
+        return self.rows
+
+
+def _random_scenario(rng: random.Random, centers: int, categories: int) -> tuple[list[CutByCenter], list[CutByCategory]]:
+    center_cuts = [
+        CutByCenter(
+            cost_center_id=center + 1,
+            percent_cut=rng.choice([0, 5, 10, 20]) or 1,
+            absolute_cut=rng.choice([0, 0, 25000]),
+        )
+        for center in rng.sample(range(centers), min(50, centers))
+    ]
+    category_cuts = [
+        CutByCategory(category_id=category + 1, percent_cut=rng.choice([5, 10, 15]), absolute_cut=rng.choice([0, 100000]))
+        for category in rng.sample(range(categories), min(20, categories))
+    ]
+    return center_cuts, category_cuts
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--centers", type=int, default=5000)
+    parser.add_argument("--categories", type=int, default=500)
+    parser.add_argument("--scenarios", type=int, default=10, help="Scenarios in the compare payload (2..10).")
+    parser.add_argument("--sweep", type=int, default=200, help="Scenarios for the batched vs sequential evaluation.")
+    parser.add_argument("--grid", type=int, default=61, help="Percent values per sweep axis (0..30%% in equal steps).")
+    parser.add_argument("--target-percent", type=float, default=6.0, help="Savings target for optimize, as %% of baseline.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    repository = SyntheticMatrixRepository(args.centers, args.categories, args.seed)
+    service = SimulationService(repository)  # type: ignore[arg-type]
+    scenarios = [_random_scenario(rng, args.centers, args.categories) for _ in range(max(args.scenarios, args.sweep))]
+
+    center_cuts, category_cuts = scenarios[0]
+    run_payload = SimulationRequest(
+        start_date=PERIOD_START, end_date=PERIOD_END, center_cuts=center_cuts, category_cuts=category_cuts
+    )
+    compare_payload = SimulationComparisonRequest(
+        start_date=PERIOD_START,
+        end_date=PERIOD_END,
+        scenarios=[
+            SimulationScenarioInput(scenario_name=f"Cenario {index}", center_cuts=center, category_cuts=category)
+            for index, (center, category) in enumerate(scenarios[: args.scenarios])
+        ],
+    )
+
+    sweep_payload = SimulationSweepRequest(
+        start_date=PERIOD_START,
+        end_date=PERIOD_END,
+        center_cuts=center_cuts,
+        axes=[
+            SweepAxis(target="cost_center", entity_ids=list(range(1, min(args.centers, 1000) + 1)), percent_to=30, percent_step=30 / (args.grid - 1)),
+            SweepAxis(target="category", entity_ids=[1, 2, 3], percent_to=30, percent_step=30 / (args.grid - 1)),
+        ],
+    )
+
+    matrix = SimulationMatrix.from_rows(repository.rows)
+    optimize_payload = SavingsTargetRequest(
+        start_date=PERIOD_START,
+        end_date=PERIOD_END,
+        target_savings=float(matrix.baseline.sum()) * args.target_percent / 100,
+        category_bounds=[CategoryCutBound(category_id=category + 1, max_percent_cut=15, weight=2) for category in range(0, args.categories, 3)],
+        default_center_max_percent=15,
+        default_category_max_percent=15,
+    )
+    _ = matrix.grid
+    cuts = matrix.encode_cuts(scenarios[: args.sweep])
+    batched = matrix.evaluate(cuts)
+    sequential = [matrix.evaluate(cuts.chunk(index, index + 1)) for index in range(args.sweep)]
+    if not np.allclose(batched.projected_total, [item.projected_total[0] for item in sequential], rtol=1e-12):
+        raise SystemExit("batched and sequential evaluation disagree")
+
+    session = SimulationSession.start(matrix, PERIOD_START, PERIOD_END, center_cuts, category_cuts)
+
+    def build_matrix() -> None:
+        built = SimulationMatrix.from_rows(repository.rows)
+        _ = built.grid
+
+    workloads = {
+        "build matrix": build_matrix,
+        "run": lambda: service.run(run_payload),
+        f"compare ({args.scenarios} scenarios)": lambda: service.compare(compare_payload),
+        f"evaluate {args.sweep} batched": lambda: matrix.evaluate(cuts),
+        f"evaluate {args.sweep} sequential": lambda: [matrix.evaluate(cuts.chunk(index, index + 1)) for index in range(args.sweep)],
+        f"sweep ({sweep_payload.scenario_count} scenarios)": lambda: service.sweep(sweep_payload, matrix),
+        "optimize": lambda: service.optimize(optimize_payload, matrix),
+        "full evaluate (1 scenario)": lambda: matrix.evaluate(cuts.chunk(0, 1)),
+        "session edit: 1 center": lambda: session.apply(
+            matrix, [CutByCenter(cost_center_id=rng.randint(1, args.centers), percent_cut=rng.uniform(0, 30))], []
+        ),
+        "session edit: 1 category": lambda: session.apply(
+            matrix, [], [CutByCategory(category_id=rng.randint(1, args.categories), percent_cut=rng.uniform(0, 30))]
+        ),
+    }
+    rows: list[list[object]] = []
+    for name, call in workloads.items():
+        timing = time_call(call, repeat=args.repeat)
+        rows.append([name, timing["min_ms"], timing["median_ms"], timing["max_ms"]])
+
+    print(f"centers={args.centers} categories={args.categories} buckets={len(repository.rows)}\n")
+    print_table(["workload", "min ms", "median ms", "max ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,31 @@
+import random
 from datetime import date
 
+import pytest
+
 from app.services import AnalyticsService
 
 
 class FakeAnalyticsRepository:
-    def get_bucket_totals(self, start_date: date, end_date: date):
-        if start_date.year == 2024:
-            return [
-                {"cost_center": "Operacoes", "category": "Logistica", "total_amount": 8000.0},
-                {"cost_center": "Marketing", "category": "Midia", "total_amount": 5000.0},
-            ]
-        return [
-            {"cost_center": "Operacoes", "category": "Logistica", "total_amount": 12000.0},
-            {"cost_center": "Marketing", "category": "Midia", "total_amount": 4500.0},
+    def get_waste_ranking_buckets(self, previous_start: date, period_start: date, period_end: date, top_n: int):
+        _ = (previous_start, period_start, period_end)
+        rows = [
+            {
+                "cost_center": "Operacoes",
+                "category": "Logistica",
+                "previous_total": 8000.0,
+                "current_total": 12000.0,
+                "estimated_waste": 4000.0,
+            },
+            {
+                "cost_center": "Marketing",
+                "category": "Midia",
+                "previous_total": 5000.0,
+                "current_total": 4500.0,
+                "estimated_waste": 0.0,
+            },
         ]
+        return rows[:top_n]
 
     def get_monthly_bucket_totals(self, _start_date: date, _end_date: date):
         return [
@@ -42,6 +54,8 @@ def test_waste_ranking_detects_highest_waste_first() -> None:
 
     assert result.items[0].cost_center == "Operacoes"
     assert result.items[0].estimated_waste == 4000.0
+    assert result.items[0].variation_percent == 50.0
+    assert result.items[1].variation_percent == -10.0
 
 
 def test_detect_anomalies_returns_spike() -> None:
@@ -72,3 +86,66 @@ def test_quick_wins_returns_ranked_opportunities() -> None:
     assert len(result.items) == 2
     assert result.items[0].opportunity_score >= result.items[1].opportunity_score
     assert result.items[0].estimated_savings > 0
+
+
+class RandomBucketRepository:
+    def __init__(self, seed: int) -> None:
+        rng = random.Random(seed)
+        self.rows = []
+        for center in range(12):
+            for category in range(6):
+                months = [month for month in range(1, 25) if rng.random() > 0.15]
+                flat = rng.random() < 0.2
+                for month in months:
+                    amount = 5000.0 if flat else round(rng.uniform(1000, 9000) * (3 if rng.random() < 0.05 else 1), 2)
+                    self.rows.append(
+                        {
+                            "month": date(2024 + (month - 1) // 12, (month - 1) % 12 + 1, 1),
+                            "cost_center": f"Centro {center}",
+                            "category": f"Categoria {category}",
+                            "total_amount": amount,
+                        }
+                    )
+        rng.shuffle(self.rows)
+
+    def get_monthly_bucket_totals(self, _start_date: date, _end_date: date):
+        return self.rows
+
+
+@pytest.mark.parametrize("seed", [1, 7, 42])
+@pytest.mark.parametrize("history_window", [2, 4, 6])
+@pytest.mark.parametrize("top_n", [3, 500])
+def test_vectorized_anomalies_match_reference_path(seed: int, history_window: int, top_n: int) -> None:
+    repository = RandomBucketRepository(seed)
+    arguments = {
+        "period_start": date(2024, 1, 1),
+        "period_end": date(2025, 12, 31),
+        "threshold_z": 1.5,
+        "history_window": history_window,
+        "top_n": top_n,
+    }
+
+    vectorized = AnalyticsService(repository, vectorized=True).detect_anomalies(**arguments)  # type: ignore[arg-type]
+    reference = AnalyticsService(repository, vectorized=False).detect_anomalies(**arguments)  # type: ignore[arg-type]
+
+    assert reference.items
+    assert vectorized == reference
+
+
+@pytest.mark.parametrize("seed", [3, 11])
+@pytest.mark.parametrize("top_n", [1, 5, 500])
+def test_vectorized_quick_wins_match_reference_path(seed: int, top_n: int) -> None:
+    repository = RandomBucketRepository(seed)
+    arguments = {
+        "period_start": date(2024, 1, 1),
+        "period_end": date(2025, 12, 31),
+        "target_reduction_percent": 8.0,
+        "minimum_total": 60000.0,
+        "top_n": top_n,
+    }
+
+    vectorized = AnalyticsService(repository, vectorized=True).quick_wins(**arguments)  # type: ignore[arg-type]
+    reference = AnalyticsService(repository, vectorized=False).quick_wins(**arguments)  # type: ignore[arg-type]
+
+    assert reference.items
+    assert vectorized == reference
@@ -0,0 +1,118 @@
+import pytest
+from fastapi import FastAPI, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.v1 import routes_batch
+from app.core.config import get_settings
+from app.core.exceptions import AppError, NotFoundError
+from app.core.security import RateLimitMiddleware
+from app.repositories.cost_repository import memoized
+
+
+class CountingRepository:
+    calls = 0
+    exported_rows = 0
+
+    @memoized
+    def totals(self, month: str) -> dict:
+        CountingRepository.calls += 1
+        return {"month": month, "total_amount": 10.0}
+
+
+@pytest.fixture()
+def client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    CountingRepository.calls = 0
+    CountingRepository.exported_rows = 0
+    # One at a time: the memo shares finished results, it does not join queries in flight.
+    monkeypatch.setattr(get_settings(), "batch_max_concurrency", 1)
+    prefix = get_settings().api_v1_prefix
+    app = FastAPI()
+    app.include_router(routes_batch.router, prefix=prefix)
+
+    @app.exception_handler(AppError)
+    async def app_error(_request, exc: AppError) -> JSONResponse:
+        return JSONResponse(status_code=exc.status_code, content={"detail": exc.message, "code": exc.code})
+
+    @app.get(f"{prefix}/totals")
+    async def totals(month: str = Query(...), ids: list[int] = Query(default=[])) -> dict:
+        row = await run_in_threadpool(CountingRepository().totals, month)
+        return {**row, "ids": ids}
+
+    @app.get(f"{prefix}/missing")
+    async def missing() -> dict:
+        raise NotFoundError("Centro inexistente")
+
+    @app.get(f"{prefix}/export")
+    async def export() -> StreamingResponse:
+        def rows():
+            for row in range(3):
+                CountingRepository.exported_rows += 1
+                yield f"{row}\n"
+
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    @app.get(f"{prefix}/broken")
+    async def broken() -> dict:
+        raise RuntimeError("boom")
+
+    return TestClient(app)
+
+
+def test_batch_returns_per_item_status_and_bodies(client: TestClient) -> None:
+    response = client.post(
+        "/api/v1/batch",
+        json={
+            "requests": [
+                {"id": "a", "path": "/totals?month=2025-01", "params": {"ids": [1, 2]}},
+                {"id": "b", "path": "/totals", "params": {"month": "2025-01"}},
+                {"id": "c", "path": "/totals"},
+                {"id": "d", "path": "/missing"},
+                {"id": "e", "path": "/broken"},
+                {"id": "f", "path": "/nope"},
+                {"id": "g", "path": "/batch"},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    results = {item["id"]: item for item in response.json()["results"]}
+    assert list(results) == ["a", "b", "c", "d", "e", "f", "g"]
+    assert results["a"]["status"] == 200
+    assert results["a"]["body"] == {"month": "2025-01", "total_amount": 10.0, "ids": [1, 2]}
+    assert results["b"]["body"]["ids"] == []
+    assert [results[key]["status"] for key in "cdefg"] == [422, 404, 500, 404, 405]
+    assert results["d"]["body"]["code"] == "not_found"
+    assert results["e"]["body"]["code"] == "internal_error"
+    assert CountingRepository.calls == 1
+
+
+def test_batch_rejects_more_requests_than_allowed(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_settings(), "batch_max_requests", 2)
+
+    response = client.post("/api/v1/batch", json={"requests": [{"path": "/totals"}] * 3})
+
+    assert response.status_code == 422
+    assert response.json()["code"] == "domain_validation_error"
+    assert CountingRepository.calls == 0
+
+
+def test_batch_rejects_non_json_routes_before_streaming_them(client: TestClient) -> None:
+    response = client.post("/api/v1/batch", json={"requests": [{"id": "x", "path": "/export"}]})
+
+    item = response.json()["results"][0]
+    assert item["status"] == 400
+    assert item["body"]["code"] == "not_batchable"
+    assert CountingRepository.exported_rows == 0
+
+
+def test_batch_items_count_against_the_rate_limit(client: TestClient) -> None:
+    client.app.add_middleware(RateLimitMiddleware, max_requests=3, window_seconds=60)
+
+    response = client.post("/api/v1/batch", json={"requests": [{"path": "/totals?month=2025-01"}] * 4})
+
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["results"]] == [200, 200, 429, 429]
+    assert response.json()["results"][2]["body"]["code"] == "rate_limited"
+    assert client.post("/api/v1/batch", json={"requests": []}).status_code == 429
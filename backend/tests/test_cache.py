@@ -0,0 +1,444 @@
+import asyncio
+import json
+import struct
+import time
+
+import pytest
+
+from app.core.cache import CachedBody, LocalLRUCache, RedisCache, decode_json, parse_ttl_policies
+from app.core.compression import accepts_coding
+from app.core.config import Settings
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_local_lru_evicts_least_recently_used_over_byte_budget() -> None:
+    lru = LocalLRUCache(max_bytes=100, ttl_seconds=60)
+    lru.set("a", "A", size=40)
+    lru.set("b", "B", size=40)
+    assert lru.get("a") == "A"
+
+    lru.set("c", "C", size=40)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == "A"
+    assert lru.get("c") == "C"
+    assert lru.size == 80
+
+
+def test_local_lru_expires_entries_and_skips_oversized_values() -> None:
+    clock = FakeClock()
+    lru = LocalLRUCache(max_bytes=100, ttl_seconds=10, clock=clock)
+    lru.set("a", "A", size=10)
+    lru.set("huge", "H", size=101)
+
+    clock.now = 10.0
+
+    assert lru.get("a") is None
+    assert lru.get_stale("a") == "A"
+    assert lru.get_stale("a", max_stale_seconds=5) == "A"
+    clock.now = 15.0
+    assert lru.get_stale("a", max_stale_seconds=5) is None
+    assert lru.get("huge") is None
+    assert lru.size == 10
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+        self._commands: list[tuple[str, str]] = []
+        self._values: dict[str, str] = {}
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *_exc: object) -> None:
+        return None
+
+    def get(self, key: str) -> "FakePipeline":
+        self._commands.append(("get", key))
+        return self
+
+    def ttl(self, key: str) -> "FakePipeline":
+        self._commands.append(("ttl", key))
+        return self
+
+    def incr(self, key: str) -> "FakePipeline":
+        self._commands.append(("incr", key))
+        return self
+
+    def set(self, key: str, value: str) -> "FakePipeline":
+        self._commands.append(("set", key))
+        self._values[key] = value
+        return self
+
+    async def execute(self) -> list[object]:
+        self._redis.round_trips += 1
+        results: list[object] = []
+        for command, key in self._commands:
+            value, ttl = self._redis.store.get(key, (None, -2))
+            if command == "incr":
+                value = str(int(value or 0) + 1)
+                self._redis.store[key] = (value, -1)
+            elif command == "set":
+                self._redis.store[key] = (self._values[key], -1)
+                value = True
+            results.append(ttl if command == "ttl" else value)
+        return results
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, tuple[str, int]] = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def setex(self, key: str, ttl: int, value: str) -> None:
+        self.round_trips += 1
+        self.store[key] = (value, ttl)
+
+    async def set(self, key: str, value: str, nx: bool = False, px: int | None = None) -> bool:
+        self.round_trips += 1
+        if nx and key in self.store:
+            return False
+        self.store[key] = (value, (px or 0) // 1000)
+        return True
+
+    async def mget(self, keys: list[str]) -> list[str | None]:
+        self.round_trips += 1
+        return [self.store.get(key, (None, -2))[0] for key in keys]
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.store)
+
+    async def eval(self, _script: str, _numkeys: int, key: str, token: str) -> int:
+        if self.store.get(key, (None, 0))[0] == token:
+            del self.store[key]
+            return 1
+        return 0
+
+
+def _cache(
+    client: FakeRedis,
+    swr_policies: str = "",
+    generation_check_ms: int = 1000,
+    compression: str = "none",
+) -> RedisCache:
+    settings = Settings(
+        cache_enabled=True,
+        cache_ttl_seconds=60,
+        cache_ttl_policies="dimensions:=3600,analytics:waste=120",
+        cache_lease_wait_ms=500,
+        cache_swr_policies=swr_policies,
+        cache_generation_check_ms=generation_check_ms,
+        cache_compression=compression,
+        cache_compression_min_bytes=256,
+    )
+    return RedisCache(settings=settings, client=client, binary_client=client)
+
+
+def test_redis_cache_serves_repeated_reads_from_l1() -> None:
+    client = FakeRedis()
+    client.store["analytics:waste:abc"] = (json.dumps({"total": 1}), 90)
+    cache = _cache(client)
+
+    first = asyncio.run(cache.get_json("analytics:waste:abc"))
+    second = asyncio.run(cache.get_json("analytics:waste:abc"))
+
+    assert first == second == {"total": 1}
+    assert client.round_trips == 1
+    assert cache.stats()["redis"] == {"hits": 1, "misses": 0}
+    assert cache.stats()["l1"]["hits"] == 1
+    assert cache.stats()["l1"]["misses"] == 1
+
+
+def test_redis_cache_applies_longest_prefix_ttl_policy() -> None:
+    client = FakeRedis()
+    cache = _cache(client)
+
+    asyncio.run(cache.set_json("dimensions:categories:x", [{"id": 1}]))
+    asyncio.run(cache.set_json("analytics:waste:y", {"a": 1}))
+    asyncio.run(cache.set_json("analytics:anomalies:z", {"b": 2}))
+
+    assert client.store["dimensions:categories:x"][1] == 3600
+    assert client.store["analytics:waste:y"][1] == 120
+    assert client.store["analytics:anomalies:z"][1] == 60
+    assert asyncio.run(cache.get_json("dimensions:categories:x")) == [{"id": 1}]
+    assert client.round_trips == 3
+
+
+def test_parse_ttl_policies_rejects_malformed_entries() -> None:
+    assert parse_ttl_policies(" a:=5, ab:=10 ,") == [("ab:", 10), ("a:", 5)]
+    with pytest.raises(ValueError):
+        parse_ttl_policies("dimensions")
+
+
+def test_get_or_set_json_coalesces_concurrent_loads() -> None:
+    client = FakeRedis()
+    cache = _cache(client)
+    calls = 0
+
+    async def loader() -> dict:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": calls}
+
+    async def scenario() -> list:
+        return await asyncio.gather(*(cache.get_or_set_json("analytics:anomalies:k", loader) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert calls == 1
+    assert results == [{"value": 1}] * 5
+    assert cache.stats()["single_flight"]["coalesced"] == 4
+    assert "analytics:anomalies:k:lease" not in client.store
+
+
+def test_get_or_set_json_serves_stale_while_another_worker_holds_the_lease() -> None:
+    client = FakeRedis()
+    cache = _cache(client)
+    client.store["analytics:anomalies:k:lease"] = ("other-worker", 30)
+    cache._l1.set("analytics:anomalies:k", {"value": "stale"}, size=10, ttl_seconds=0)  # type: ignore[union-attr]
+
+    async def loader() -> dict:
+        raise AssertionError("loader must not run while another worker holds the lease")
+
+    assert asyncio.run(cache.get_or_set_json("analytics:anomalies:k", loader)) == {"value": "stale"}
+    assert cache.stats()["single_flight"]["stale_served"] == 1
+
+
+def test_get_or_set_json_waits_for_the_leaseholder_result() -> None:
+    client = FakeRedis()
+    cache = _cache(client)
+    client.store["analytics:anomalies:k:lease"] = ("other-worker", 30)
+
+    async def other_worker() -> None:
+        await asyncio.sleep(0.08)
+        client.store["analytics:anomalies:k"] = (json.dumps({"value": "fresh"}), 60)
+        del client.store["analytics:anomalies:k:lease"]
+
+    async def loader() -> dict:
+        raise AssertionError("loader must not run while another worker holds the lease")
+
+    async def scenario() -> object:
+        worker = asyncio.create_task(other_worker())
+        result = await cache.get_or_set_json("analytics:anomalies:k", loader)
+        await worker
+        return result
+
+    assert asyncio.run(scenario()) == {"value": "fresh"}
+    assert cache.stats()["single_flight"]["lease_waits"] == 1
+
+
+def test_get_or_set_json_waits_instead_of_serving_l1_copies_past_the_max_stale_age() -> None:
+    client = FakeRedis()
+    cache = _cache(client)
+    client.store["analytics:anomalies:k:lease"] = ("other-worker", 30)
+    cache._l1.set("analytics:anomalies:k", {"value": "stale"}, size=10, ttl_seconds=-61)  # type: ignore[union-attr]
+
+    async def other_worker() -> None:
+        await asyncio.sleep(0.08)
+        client.store["analytics:anomalies:k"] = (json.dumps({"value": "fresh"}), 60)
+
+    async def loader() -> dict:
+        raise AssertionError("loader must not run while another worker holds the lease")
+
+    async def scenario() -> object:
+        worker = asyncio.create_task(other_worker())
+        result = await cache.get_or_set_json("analytics:anomalies:k", loader)
+        await worker
+        return result
+
+    assert asyncio.run(scenario()) == {"value": "fresh"}
+    assert cache.stats()["single_flight"]["stale_served"] == 0
+    assert cache.stats()["single_flight"]["lease_waits"] == 1
+
+
+def test_stale_while_revalidate_keeps_entries_past_the_soft_expiry() -> None:
+    client = FakeRedis()
+    cache = _cache(client, swr_policies="analytics:=600")
+
+    asyncio.run(cache.set_json("analytics:waste:y", {"a": 1}))
+
+    stored, ttl = client.store["analytics:waste:y"]
+    assert ttl == 720
+    assert json.loads(stored)["value"] == {"a": 1}
+    cache._l1.clear()  # type: ignore[union-attr]
+    assert asyncio.run(cache.get_json("analytics:waste:y")) == {"a": 1}
+
+
+def test_get_or_set_json_serves_soft_expired_value_and_refreshes_in_background() -> None:
+    client = FakeRedis()
+    cache = _cache(client, swr_policies="analytics:=600")
+    expired = {"__soft_expires_at": time.time() - 1, "value": {"value": "stale"}}
+    client.store["analytics:anomalies:k"] = (json.dumps(expired), 300)
+    calls = 0
+
+    async def loader() -> dict:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": "fresh"}
+
+    async def scenario() -> tuple:
+        first = await asyncio.gather(*(cache.get_or_set_json("analytics:anomalies:k", loader) for _ in range(3)))
+        await asyncio.sleep(0.05)
+        return first, await cache.get_or_set_json("analytics:anomalies:k", loader)
+
+    stale_results, refreshed = asyncio.run(scenario())
+
+    assert stale_results == [{"value": "stale"}] * 3
+    assert refreshed == {"value": "fresh"}
+    assert calls == 1
+    assert cache.stats()["stale_while_revalidate"]["refreshes"] == 1
+    assert "analytics:anomalies:k:lease" not in client.store
+
+
+def test_background_refresh_is_skipped_while_another_worker_holds_the_lease() -> None:
+    client = FakeRedis()
+    cache = _cache(client, swr_policies="analytics:=600")
+    expired = {"__soft_expires_at": time.time() - 1, "value": {"value": "stale"}}
+    client.store["analytics:anomalies:k"] = (json.dumps(expired), 300)
+    client.store["analytics:anomalies:k:lease"] = ("other-worker", 30)
+
+    async def loader() -> dict:
+        raise AssertionError("loader must not run while another worker holds the lease")
+
+    async def scenario() -> object:
+        result = await cache.get_or_set_json("analytics:anomalies:k", loader)
+        await asyncio.sleep(0.01)
+        return result
+
+    assert asyncio.run(scenario()) == {"value": "stale"}
+    assert cache.stats()["stale_while_revalidate"]["refresh_skipped"] == 1
+
+
+def test_bumping_a_domain_generation_changes_dependent_keys_in_every_worker() -> None:
+    client = FakeRedis()
+    worker_a = _cache(client, generation_check_ms=0)
+    worker_b = _cache(client, generation_check_ms=0)
+
+    async def keys(cache: RedisCache) -> tuple[str, str]:
+        costs = await cache.build_versioned_key("costs:overview", ("costs", "dimensions"), start_date="2025-01-01")
+        budgets = await cache.build_versioned_key("budgets:variance", ("budgets",), start_date="2025-01-01")
+        return costs, budgets
+
+    before = asyncio.run(keys(worker_b))
+    assert asyncio.run(worker_a.bump_generations("costs")) == {"costs": 1, "budgets": 0, "dimensions": 0}
+    after = asyncio.run(keys(worker_b))
+
+    assert after[0] != before[0]
+    assert after[0].startswith("costs:overview:")
+    assert after[1] == before[1]
+    assert client.store["cache:generation:costs"][0] == "1"
+
+
+def test_other_workers_see_when_the_last_bump_happened() -> None:
+    client = FakeRedis()
+    worker_a = _cache(client, generation_check_ms=0)
+    worker_b = _cache(client, generation_check_ms=0)
+
+    assert asyncio.run(worker_b.seconds_since_bump()) > 3600
+    asyncio.run(worker_a.bump_generations("costs"))
+
+    assert asyncio.run(worker_b.seconds_since_bump()) < 5
+
+
+def test_data_generations_are_memoized_between_checks() -> None:
+    client = FakeRedis()
+    cache = _cache(client, generation_check_ms=60_000)
+
+    asyncio.run(cache.data_generations())
+    client.store["cache:generation:budgets"] = ("7", -1)
+
+    assert asyncio.run(cache.data_generations())["budgets"] == 0
+    assert client.round_trips == 1
+    assert asyncio.run(cache.bump_generations("budgets"))["budgets"] == 8
+
+
+def test_get_or_set_body_caches_the_encoded_json_bytes() -> None:
+    client = FakeRedis()
+    worker_a = _cache(client)
+    worker_b = _cache(client)
+    calls = 0
+
+    async def loader() -> dict:
+        nonlocal calls
+        calls += 1
+        return {"items": [{"name": "Operações", "total_amount": 12.5}]}
+
+    first = asyncio.run(worker_a.get_or_set_body("costs:overview:k", loader))
+    cached_l1 = asyncio.run(worker_a.get_or_set_body("costs:overview:k", loader))
+    cached_redis = asyncio.run(worker_b.get_or_set_body("costs:overview:k", loader))
+
+    assert first.encoding is None
+    assert decode_json(first.body) == {"items": [{"name": "Operações", "total_amount": 12.5}]}
+    assert first == cached_l1 == cached_redis
+    assert calls == 1
+    assert client.store["costs:overview:k"][0].endswith(first.body)
+    assert asyncio.run(worker_b.get_json("costs:overview:missing")) is None
+
+
+def test_get_or_set_body_serves_soft_expired_bytes_and_refreshes() -> None:
+    client = FakeRedis()
+    cache = _cache(client, swr_policies="analytics:=600")
+
+    async def stale_loader() -> dict:
+        return {"value": "stale"}
+
+    async def fresh_loader() -> dict:
+        return {"value": "fresh"}
+
+    async def scenario() -> tuple[CachedBody, CachedBody]:
+        await cache.set_body("analytics:waste:k", await stale_loader(), ttl_seconds=1)
+        cache._l1.clear()  # type: ignore[union-attr]
+        stored, ttl = client.store["analytics:waste:k"]
+        assert ttl == 601
+        # Age the soft expiry in the stored header instead of sleeping.
+        client.store["analytics:waste:k"] = (stored[:4] + struct.pack("<d", 1.0) + stored[12:], ttl)
+        served = await cache.get_or_set_body("analytics:waste:k", fresh_loader)
+        await asyncio.sleep(0.01)
+        return served, await cache.get_or_set_body("analytics:waste:k", fresh_loader)
+
+    served, refreshed = asyncio.run(scenario())
+
+    assert decode_json(served.body) == {"value": "stale"}
+    assert decode_json(refreshed.body) == {"value": "fresh"}
+
+
+def test_large_bodies_are_stored_compressed_in_both_tiers() -> None:
+    client = FakeRedis()
+    worker_a = _cache(client, compression="gzip")
+    worker_b = _cache(client, compression="gzip")
+    large = {"items": [{"cost_center": f"Centro {index:03d}", "total_amount": index * 1.5} for index in range(200)]}
+
+    async def scenario() -> tuple[CachedBody, CachedBody, CachedBody]:
+        small = await worker_a.set_body("costs:aggregate:small", {"total_amount": 1})
+        stored = await worker_a.set_body("costs:aggregate:large", large)
+        return small, stored, await worker_b.get_body("costs:aggregate:large")  # type: ignore[return-value]
+
+    small, stored, from_redis = asyncio.run(scenario())
+
+    assert small.encoding is None
+    assert stored.encoding == "gzip"
+    assert from_redis == stored
+    assert len(client.store["costs:aggregate:large"][0]) < len(stored.decoded()) / 4
+    assert decode_json(from_redis.decoded()) == large
+
+
+def test_accepts_coding_honours_quality_values_and_wildcards() -> None:
+    assert accepts_coding("gzip, deflate, br", "gzip")
+    assert accepts_coding("br;q=1.0, gzip;q=0.5", "gzip")
+    assert not accepts_coding("gzip;q=0, *", "gzip")
+    assert accepts_coding("*", "zstd")
+    assert not accepts_coding("identity", "gzip")
+    assert not accepts_coding(None, "gzip")
@@ -0,0 +1,49 @@
+from datetime import date
+
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.cost_repository import CostRepository, split_month_aligned_range
+from app.schemas.costs import CostFilters
+
+
+def test_split_month_aligned_range_uses_whole_months_only() -> None:
+    full_months, edges = split_month_aligned_range(date(2025, 1, 15), date(2025, 4, 10))
+
+    assert full_months == (date(2025, 2, 1), date(2025, 3, 1))
+    assert edges == [(date(2025, 1, 15), date(2025, 1, 31)), (date(2025, 4, 1), date(2025, 4, 10))]
+
+
+def test_split_month_aligned_range_without_whole_month_falls_back_to_raw() -> None:
+    full_months, edges = split_month_aligned_range(date(2025, 1, 15), date(2025, 2, 10))
+
+    assert full_months is None
+    assert edges == [(date(2025, 1, 15), date(2025, 2, 10))]
+
+
+def test_split_month_aligned_range_aligned_period_has_no_edges() -> None:
+    full_months, edges = split_month_aligned_range(date(2024, 12, 1), date(2025, 2, 28))
+
+    assert full_months == (date(2024, 12, 1), date(2025, 2, 1))
+    assert edges == []
+
+
+class _CapturingSession:
+    def __init__(self) -> None:
+        self.sql = ""
+
+    def execute(self, stmt):
+        self.sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        return self
+
+    def all(self) -> list:
+        return []
+
+
+def test_grouped_costs_order_each_set_by_requested_dimension_order() -> None:
+    session = _CapturingSession()
+    filters = CostFilters(start_date=date(2025, 1, 1), end_date=date(2025, 3, 31))
+
+    CostRepository(session, use_rollup=False).get_grouped_costs(filters, [("category", "cost_center"), ()])  # type: ignore[arg-type]
+
+    order_by = session.sql.split("ORDER BY", 1)[1]
+    assert order_by.index("THEN categories.name") < order_by.index("THEN cost_centers.name")
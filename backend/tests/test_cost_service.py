@@ -0,0 +1,105 @@
+from datetime import date
+
+import pytest
+
+from app.core.exceptions import DomainValidationError
+from app.schemas.costs import CostFilters
+from app.services import CostService
+
+
+class FakeCostRepository:
+    def __init__(self) -> None:
+        self.calls: list[list[tuple[str, ...]]] = []
+
+    def get_grouped_costs(self, _filters, grouping_sets):
+        self.calls.append(list(grouping_sets))
+        rows = {
+            ("month",): [
+                {"group_by": ("month",), "month": date(2025, 1, 1), "total_amount": 600.0},
+                {"group_by": ("month",), "month": date(2025, 2, 1), "total_amount": 400.0},
+            ],
+            ("cost_center",): [
+                {"group_by": ("cost_center",), "cost_center": "Operacoes", "total_amount": 700.0},
+                {"group_by": ("cost_center",), "cost_center": "TI", "total_amount": 300.0},
+            ],
+            ("category",): [{"group_by": ("category",), "category": "Logistica", "total_amount": 1000.0}],
+            (): [{"group_by": (), "total_amount": 1000.0}],
+        }
+        return [row for grouping_set in grouping_sets for row in rows.get(tuple(grouping_set), [])]
+
+
+def _filters() -> CostFilters:
+    return CostFilters(start_date=date(2025, 1, 1), end_date=date(2025, 2, 28))
+
+
+def test_cost_overview_splits_single_grouping_sets_result() -> None:
+    repository = FakeCostRepository()
+    service = CostService(repository)  # type: ignore[arg-type]
+
+    result = service.cost_overview(_filters())
+
+    assert len(repository.calls) == 1
+    assert result.total_cost == 1000.0
+    assert result.monthly_average == 500.0
+    assert [item.month for item in result.trend] == [date(2025, 1, 1), date(2025, 2, 1)]
+    assert [item.cost_center for item in result.by_cost_center] == ["Operacoes", "TI"]
+    assert result.by_category[0].category == "Logistica"
+
+
+def test_aggregate_costs_reads_total_from_grand_total_set() -> None:
+    repository = FakeCostRepository()
+    service = CostService(repository)  # type: ignore[arg-type]
+
+    result = service.aggregate_costs(_filters(), group_by=["cost_center"])
+
+    assert repository.calls == [[("cost_center",), ()]]
+    assert result.total_amount == 1000.0
+    assert [item.total_amount for item in result.items] == [700.0, 300.0]
+
+
+class FakeEntryRepository:
+    def __init__(self, total: int) -> None:
+        self.entries = [{"id": entry_id, "reference_date": date(2025, 1, 1 + entry_id // 3)} for entry_id in range(total)]
+        self.afters: list[tuple[date, int] | None] = []
+
+    def list_cost_entries(self, _filters, limit, after=None):
+        self.afters.append(after)
+        remaining = [row for row in self.entries if after is None or (row["reference_date"], row["id"]) > after]
+        return [
+            {
+                **row,
+                "cost_center_code": "CC-OPS",
+                "project_code": "PRJ-ERP",
+                "category_code": "CAT-LOG",
+                "cost_center": "Operacoes",
+                "project": "Programa ERP Corporativo",
+                "category": "Logistica",
+                "amount": 10.0,
+                "currency": "BRL",
+            }
+            for row in remaining[:limit]
+        ]
+
+
+def test_list_entries_walks_pages_with_opaque_keyset_cursor():
+    repository = FakeEntryRepository(total=7)
+    service = CostService(repository)  # type: ignore[arg-type]
+
+    seen: list[int] = []
+    cursor = None
+    for _ in range(5):
+        page = service.list_entries(_filters(), limit=3, cursor=cursor)
+        seen.extend(item.id for item in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert seen == list(range(7))
+    assert repository.afters == [None, (date(2025, 1, 1), 2), (date(2025, 1, 2), 5)]
+
+
+def test_list_entries_rejects_tampered_cursor():
+    service = CostService(FakeEntryRepository(total=1))  # type: ignore[arg-type]
+
+    with pytest.raises(DomainValidationError):
+        service.list_entries(_filters(), limit=10, cursor="not-a-cursor")
@@ -0,0 +1,146 @@
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.schemas.costs import CostFilters
+from app.services import AnalyticsService, BudgetService, CostService, DashboardService
+from app.services.dashboard_service import lookback_start
+
+CENTERS = {1: "Financeiro", 2: "Marketing", 3: "Operacoes", 4: "TI"}
+
+
+class FakeDashboardRepository:
+    """Every query the dashboard replaces, computed over the same raw entries (exact decimal sums)."""
+
+    def __init__(self, seed: int = 11) -> None:
+        rng = random.Random(seed)
+        self.entries = []
+        day = date(2024, 1, 1)
+        while day <= date(2025, 9, 30):
+            for center_id in CENTERS:
+                for category in ("Cloud", "Logistica", "Midia"):
+                    if rng.random() < 0.25:
+                        growth = 1 + (day - date(2024, 1, 1)).days / 400 if center_id == 3 else 1
+                        amount = Decimal(str(round(rng.uniform(50, 900) * growth, 2)))
+                        self.entries.append((day, center_id, rng.choice(["Projeto A", "Projeto B"]), category, amount))
+            day += timedelta(days=3)
+        self.planned = {1: 90000.0, 2: 150000.0, 4: 60000.0}
+
+    def _between(self, start_date: date, end_date: date):
+        return [entry for entry in self.entries if start_date <= entry[0] <= end_date]
+
+    @staticmethod
+    def _totals(entries, key):
+        totals: dict = defaultdict(Decimal)
+        for entry in entries:
+            totals[key(entry)] += entry[4]
+        return totals
+
+    def get_dashboard_buckets(self, start_date: date, end_date: date, segment_starts=()):
+        starts = sorted({start_date, *(day for day in segment_starts if start_date < day <= end_date)})
+        totals = self._totals(
+            self._between(start_date, end_date),
+            lambda entry: (max(s for s in starts if s <= entry[0]), entry[0].replace(day=1), entry[1], entry[2], entry[3]),
+        )
+        return [
+            {
+                "segment_start": segment_start,
+                "month": month,
+                "cost_center_id": center_id,
+                "cost_center": CENTERS[center_id],
+                "project": project,
+                "category": category,
+                "total_amount": float(total),
+            }
+            for (segment_start, month, center_id, project, category), total in totals.items()
+        ]
+
+    def get_planned_budget_by_center(self, _start_date: date, _end_date: date):
+        return [
+            {"cost_center_id": center_id, "cost_center": name, "planned_amount": self.planned.get(center_id, 0.0)}
+            for center_id, name in sorted(CENTERS.items(), key=lambda item: item[1])
+        ]
+
+    def get_grouped_costs(self, filters: CostFilters, grouping_sets):
+        entries = self._between(filters.start_date, filters.end_date)
+        columns = {
+            "month": lambda entry: entry[0].replace(day=1),
+            "cost_center": lambda entry: CENTERS[entry[1]],
+            "category": lambda entry: entry[3],
+        }
+        rows = []
+        for grouping_set in grouping_sets:
+            totals = self._totals(entries, lambda entry: tuple(columns[key](entry) for key in grouping_set))
+            for values, total in sorted(totals.items()):
+                rows.append({"group_by": grouping_set, **dict(zip(grouping_set, values)), "total_amount": float(total)})
+        return rows
+
+    def get_waste_ranking_buckets(self, previous_start: date, period_start: date, period_end: date, top_n: int):
+        current = self._totals(self._between(period_start, period_end), lambda entry: (CENTERS[entry[1]], entry[3]))
+        previous = self._totals(self._between(previous_start, period_start - timedelta(days=1)), lambda entry: (CENTERS[entry[1]], entry[3]))
+        rows = [
+            {
+                "cost_center": center,
+                "category": category,
+                "previous_total": float(previous.get((center, category), 0)),
+                "current_total": float(total),
+                "estimated_waste": float(max(total - previous.get((center, category), 0), 0)),
+            }
+            for (center, category), total in current.items()
+        ]
+        rows.sort(key=lambda row: (-row["estimated_waste"], row["cost_center"], row["category"]))
+        return rows[:top_n]
+
+    def get_monthly_bucket_totals(self, start_date: date, end_date: date):
+        totals = self._totals(self._between(start_date, end_date), lambda entry: (entry[0].replace(day=1), CENTERS[entry[1]], entry[3]))
+        return [
+            {"month": month, "cost_center": center, "category": category, "total_amount": float(total)}
+            for (month, center, category), total in sorted(totals.items())
+        ]
+
+    def get_budget_vs_actual_by_center(self, start_date: date, end_date: date, cost_center_ids=None):
+        _ = cost_center_ids
+        actual = self._totals(self._between(start_date, end_date), lambda entry: entry[1])
+        return [{**row, "actual_amount": float(actual.get(row["cost_center_id"], 0))} for row in self.get_planned_budget_by_center(start_date, end_date)]
+
+
+def test_dashboard_widgets_match_the_standalone_endpoints() -> None:
+    repository = FakeDashboardRepository()
+    period_end = date(2025, 9, 17)
+    period_start = lookback_start(period_end, 12)
+
+    dashboard = DashboardService(repository).dashboard(period_end=period_end, lookback_months=12)  # type: ignore[arg-type]
+
+    analytics = AnalyticsService(repository)  # type: ignore[arg-type]
+    overview = CostService(repository).cost_overview(CostFilters(start_date=period_start, end_date=period_end))  # type: ignore[arg-type]
+    waste = analytics.waste_ranking(period_start=lookback_start(period_end, 3), period_end=period_end)
+    anomalies = analytics.detect_anomalies(period_start=period_start, period_end=period_end)
+    quick_wins = analytics.quick_wins(period_start=lookback_start(period_end, 6), period_end=period_end)
+    budget = BudgetService(repository).variance_by_center(period_start=period_start, period_end=period_end)  # type: ignore[arg-type]
+
+    assert dashboard.overview == overview
+    assert dashboard.waste_ranking == waste
+    assert dashboard.anomalies == anomalies
+    assert dashboard.quick_wins == quick_wins
+    assert dashboard.budget_variance == budget
+    assert overview.total_cost > 0 and waste.items and quick_wins.items and budget.items
+
+
+def test_dashboard_reads_costs_once() -> None:
+    repository = FakeDashboardRepository()
+    calls: list[tuple[date, date, tuple[date, ...]]] = []
+    original = repository.get_dashboard_buckets
+
+    def tracked(start_date: date, end_date: date, segment_starts=()):
+        calls.append((start_date, end_date, tuple(segment_starts)))
+        return original(start_date, end_date, segment_starts)
+
+    repository.get_dashboard_buckets = tracked  # type: ignore[method-assign]
+    for name in ("get_grouped_costs", "get_waste_ranking_buckets", "get_monthly_bucket_totals", "get_budget_vs_actual_by_center"):
+        setattr(repository, name, None)
+
+    DashboardService(repository).dashboard(period_end=date(2025, 9, 17))  # type: ignore[arg-type]
+
+    assert len(calls) == 1
+    assert calls[0][0] == min(calls[0][2])
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app.db import session as db_session
+from app.db.session import DatabaseRunner, ReplicaPool, get_db_runner, get_read_db_runner, is_connection_error
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingRunner(DatabaseRunner):
+    def __init__(self, replicas: ReplicaPool, failing: dict[int | None, Exception], async_enabled: bool = False) -> None:
+        super().__init__(async_enabled=async_enabled, replicas=replicas)
+        self.failing = failing
+        self.targets: list[int | None] = []
+
+    async def _run_on(self, replica_index, work):
+        self.targets.append(replica_index)
+        if replica_index in self.failing:
+            raise self.failing[replica_index]
+        return work(None)
+
+
+def _connection_error() -> OperationalError:
+    return OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+
+def test_replica_pool_round_robin_skips_replicas_in_cooldown():
+    clock = FakeClock()
+    pool = ReplicaPool(["r0", "r1", "r2"], failure_cooldown_seconds=10, clock=clock)
+
+    assert [pool.candidates()[0] for _ in range(4)] == [0, 1, 2, 0]
+
+    pool.mark_down(2)
+    assert pool.candidates() == [1, 0]
+    assert pool.candidates() == [0, 1]
+
+    clock.now = 10.0
+    assert sorted(pool.candidates()) == [0, 1, 2]
+
+
+def test_runner_fails_over_to_next_replica_and_then_primary():
+    pool = ReplicaPool(["r0", "r1"], clock=FakeClock())
+    runner = RecordingRunner(pool, failing={0: _connection_error(), 1: _connection_error()})
+
+    assert asyncio.run(runner.run(lambda _session: "ok")) == "ok"
+    assert runner.targets == [0, 1, None]
+    assert pool.candidates() == []
+
+
+def test_runner_does_not_fail_over_on_query_errors():
+    pool = ReplicaPool(["r0", "r1"], clock=FakeClock())
+    query_error = ProgrammingError("SELECT nope", {}, Exception("syntax error"))
+    runner = RecordingRunner(pool, failing={0: query_error})
+
+    assert not is_connection_error(query_error)
+    with pytest.raises(ProgrammingError):
+        asyncio.run(runner.run(lambda _session: "ok"))
+    assert runner.targets == [0]
+    assert sorted(pool.candidates()) == [0, 1]
+
+
+def test_runner_builds_results_off_the_event_loop_after_the_fetch():
+    pool = ReplicaPool(["r0", "r1"], clock=FakeClock())
+    runner = RecordingRunner(pool, failing={0: _connection_error()}, async_enabled=True)
+    threads: dict[str, int] = {}
+
+    def fetch(_session) -> list[int]:
+        threads["fetch"] = threading.get_ident()
+        return [1, 2, 3]
+
+    def build(rows: list[int]) -> int:
+        threads["build"] = threading.get_ident()
+        return sum(rows)
+
+    async def scenario() -> int:
+        threads["loop"] = threading.get_ident()
+        return await runner.run(fetch, build)
+
+    assert asyncio.run(scenario()) == 6
+    assert runner.targets == [0, 1]
+    assert threads["fetch"] == threads["loop"]
+    assert threads["build"] != threads["loop"]
+
+
+class FakeCache:
+    def __init__(self, seconds_since_bump: float) -> None:
+        self.seconds = seconds_since_bump
+
+    async def seconds_since_bump(self) -> float:
+        return self.seconds
+
+
+def test_reads_go_to_the_primary_shortly_after_a_write(monkeypatch: pytest.MonkeyPatch):
+    replica_runner = DatabaseRunner(async_enabled=False, replicas=ReplicaPool(["r0"]))
+    monkeypatch.setattr(db_session, "get_replica_db_runner", lambda: replica_runner)
+    monkeypatch.setattr(db_session.settings, "db_replica_read_after_write_seconds", 5)
+
+    monkeypatch.setattr(db_session, "cache", FakeCache(seconds_since_bump=1.0))
+    assert asyncio.run(get_read_db_runner()) is get_db_runner()
+
+    monkeypatch.setattr(db_session, "cache", FakeCache(seconds_since_bump=30.0))
+    assert asyncio.run(get_read_db_runner()) is replica_runner
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+from app.schemas.costs import CostFilters
+from app.services import CostExportService
+
+
+def _entry(entry_id: int, day: int, amount: str) -> dict:
+    return {
+        "id": entry_id,
+        "reference_date": date(2025, 1, day),
+        "cost_center_code": "CC-OPS",
+        "project_code": "PRJ-ERP",
+        "category_code": "CAT-LOG",
+        "amount": Decimal(amount),
+        "currency": "BRL",
+        "description": "Frete, janeiro",
+        "cost_center": "Operacoes",
+        "project": "Programa ERP Corporativo",
+        "category": "Logistica",
+    }
+
+
+class FakeCostRepository:
+    def __init__(self, batches):
+        self.batches = batches
+        self.batch_sizes: list[int] = []
+
+    def iter_cost_entries(self, _filters, batch_size: int = 5000):
+        self.batch_sizes.append(batch_size)
+        yield from self.batches
+
+
+FILTERS = CostFilters(start_date=date(2025, 1, 1), end_date=date(2025, 1, 31))
+
+
+def test_csv_export_emits_header_then_one_chunk_per_batch():
+    repository = FakeCostRepository([[_entry(1, 5, "10.50"), _entry(2, 6, "3.00")], [_entry(3, 7, "1200.10")]])
+    service = CostExportService(repository, batch_size=2)  # type: ignore[arg-type]
+
+    chunks = list(service.stream(FILTERS, "csv"))
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+
+    assert len(chunks) == 3
+    assert chunks[0].startswith("cost_center_code,project_code,category_code,reference_date,amount")
+    assert repository.batch_sizes == [2]
+    assert [row["amount"] for row in rows] == ["10.50", "3.00", "1200.10"]
+    assert rows[0]["description"] == "Frete, janeiro"
+    assert rows[2]["reference_date"] == "2025-01-07"
+
+
+def test_ndjson_export_writes_one_object_per_line():
+    repository = FakeCostRepository([[_entry(1, 5, "10.50")], [_entry(2, 6, "3.00")]])
+    service = CostExportService(repository)  # type: ignore[arg-type]
+
+    lines = "".join(service.stream(FILTERS, "ndjson")).splitlines()
+    records = [json.loads(line) for line in lines]
+
+    assert [record["id"] for record in records] == [1, 2]
+    assert records[0]["amount"] == 10.5
+    assert records[0]["cost_center_code"] == "CC-OPS"
@@ -0,0 +1,95 @@
+import io
+from datetime import date
+
+import pytest
+
+from app.core.exceptions import DomainValidationError
+from app.services import CostIngestionService
+
+
+class FakeIngestionRepository:
+    def __init__(self) -> None:
+        self.stored_hashes: set[str] = set()
+        self.batches: list[int] = []
+        self.partition_months: list[date] = []
+
+    def load_dimension_codes(self):
+        return {
+            "cost_center": {"CC-OPS": 1, "CC-TI": 2},
+            "project": {"PRJ-ERP": 1},
+            "category": {"CAT-LOG": 6},
+        }
+
+    def ensure_partitions(self, first_date: date, _last_date: date) -> int:
+        self.partition_months.append(first_date)
+        return 0
+
+    def copy_entries(self, rows) -> int:
+        self.batches.append(len(rows))
+        inserted = 0
+        for row in rows:
+            if row[-1] not in self.stored_hashes:
+                self.stored_hashes.add(row[-1])
+                inserted += 1
+        return inserted
+
+
+class FakeRollupRepository:
+    def __init__(self) -> None:
+        self.refreshed: list[date] = []
+
+    def refresh_months(self, months) -> int:
+        self.refreshed.extend(months)
+        return len(self.refreshed)
+
+
+CSV_PAYLOAD = (
+    "cost_center_code,project_code,category_code,reference_date,amount,currency,description\n"
+    "CC-OPS,PRJ-ERP,CAT-LOG,2025-01-15,1200.50,BRL,Frete\n"
+    "CC-TI,PRJ-ERP,CAT-LOG,2025-02-10,800,,\n"
+    "CC-XX,PRJ-ERP,CAT-LOG,2025-02-10,800,BRL,\n"
+    "CC-TI,PRJ-ERP,CAT-LOG,not-a-date,800,BRL,\n"
+)
+
+
+def test_ingest_csv_batches_rows_and_rejects_invalid_lines() -> None:
+    repository = FakeIngestionRepository()
+    rollup = FakeRollupRepository()
+    service = CostIngestionService(repository, rollup_repository=rollup, batch_size=1)  # type: ignore[arg-type]
+
+    report = service.ingest(io.BytesIO(CSV_PAYLOAD.encode("utf-8")), "csv")
+
+    assert report.rows_read == 4
+    assert report.rows_inserted == 2
+    assert report.rows_rejected == 2
+    assert repository.batches == [1, 1]
+    assert [error.line for error in report.errors] == [4, 5]
+    assert "unknown cost_center_code" in report.errors[0].error
+    assert rollup.refreshed == [date(2025, 1, 1), date(2025, 2, 1)]
+    assert repository.partition_months == [date(2025, 1, 1), date(2025, 2, 1)]
+
+
+def test_reingesting_same_file_is_idempotent() -> None:
+    repository = FakeIngestionRepository()
+    service = CostIngestionService(repository)  # type: ignore[arg-type]
+    payload = (
+        '{"cost_center_code": "CC-OPS", "project_code": "PRJ-ERP", "category_code": "CAT-LOG", '
+        '"reference_date": "2025-03-01", "amount": 10.10}\n'
+        "{broken\n"
+    ).encode("utf-8")
+
+    first = service.ingest(io.BytesIO(payload), "ndjson")
+    second = service.ingest(io.BytesIO(payload), "ndjson")
+
+    assert first.rows_inserted == 1
+    assert first.errors[0].error.startswith("invalid JSON")
+    assert second.rows_inserted == 0
+    assert second.rows_duplicated == 1
+    assert second.months_refreshed == []
+
+
+def test_ingest_csv_requires_header_columns() -> None:
+    service = CostIngestionService(FakeIngestionRepository())  # type: ignore[arg-type]
+
+    with pytest.raises(DomainValidationError):
+        service.ingest(io.BytesIO(b"cost_center_code,amount\nCC-OPS,10\n"), "csv")
@@ -0,0 +1,54 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.api import responses
+from app.core.cache import RedisCache
+from app.core.config import Settings
+from tests.test_cache import FakeRedis
+
+PAYLOAD = {"items": [{"cost_center": f"Centro {index:03d}", "total_amount": index * 2.5} for index in range(200)]}
+
+
+@pytest.fixture()
+def client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    redis = FakeRedis()
+    settings = Settings(cache_enabled=True, cache_swr_policies="", cache_compression="gzip")
+    monkeypatch.setattr(responses, "cache", RedisCache(settings=settings, client=redis, binary_client=redis))
+    app = FastAPI()
+    app.state.loads = 0
+
+    async def loader() -> dict:
+        app.state.loads += 1
+        return PAYLOAD
+
+    @app.get("/overview")
+    async def overview(request: Request):
+        return await responses.cached_json_response(request, "costs:overview:abc", loader)
+
+    return TestClient(app)
+
+
+def test_cached_response_carries_etag_and_cache_control(client: TestClient) -> None:
+    identity = client.get("/overview", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/overview", headers={"Accept-Encoding": "gzip"})
+
+    assert identity.json() == compressed.json() == PAYLOAD
+    assert identity.headers["cache-control"] == "no-cache"
+    assert identity.headers["etag"] == responses.entity_tag("costs:overview:abc")
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == identity.headers["etag"][:-1] + '-gzip"'
+    assert client.app.state.loads == 1  # type: ignore[attr-defined]
+
+
+def test_matching_if_none_match_returns_304_without_loading(client: TestClient) -> None:
+    etag = responses.entity_tag("costs:overview:abc")
+
+    not_modified = client.get("/overview", headers={"If-None-Match": f'W/"other", {etag[:-1]}-gzip"'})
+    modified = client.get("/overview", headers={"If-None-Match": '"other"'})
+
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    assert modified.status_code == 200
+    assert client.app.state.loads == 1  # type: ignore[attr-defined]
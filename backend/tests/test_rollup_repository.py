@@ -0,0 +1,48 @@
+from datetime import date
+
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.rollup_repository import CostRollupRepository
+
+
+class _Result:
+    rowcount = 3
+
+    def all(self) -> list:
+        return []
+
+
+class RecordingSession:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.committed = False
+
+    def execute(self, stmt) -> _Result:
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Result()
+
+    def commit(self) -> None:
+        self.committed = True
+
+    def rollback(self) -> None:
+        raise AssertionError("unexpected rollback")
+
+
+def test_refresh_clears_dirty_mark_before_reading_entries() -> None:
+    session = RecordingSession()
+
+    written = CostRollupRepository(session).refresh_months([date(2025, 3, 14)])  # type: ignore[arg-type]
+
+    assert written == 3
+    assert session.committed
+    assert session.statements[0].startswith("DELETE FROM cost_rollup_dirty_months")
+    assert session.statements[1].startswith("DELETE FROM cost_monthly_rollup")
+    assert session.statements[2].startswith("INSERT INTO cost_monthly_rollup")
+
+
+def test_stale_months_include_trigger_marked_months() -> None:
+    session = RecordingSession()
+
+    CostRollupRepository(session).find_stale_months()  # type: ignore[arg-type]
+
+    assert "UNION SELECT cost_rollup_dirty_months.month" in session.statements[0]
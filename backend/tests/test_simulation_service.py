@@ -1,16 +1,29 @@
+import asyncio
+import copy
 from datetime import date
 
 import pytest
 from pydantic import ValidationError
 
+from app.api.v1 import routes_simulations
+from app.core.cache import RedisCache
+from app.core.config import Settings
+from app.core.exceptions import ServiceUnavailableError
 from app.schemas.simulations import (
+    CategoryCutBound,
+    CenterCutBound,
     CutByCenter,
     CutByCategory,
+    SavingsTargetRequest,
     SimulationComparisonRequest,
     SimulationRequest,
     SimulationScenarioInput,
+    SimulationSweepRequest,
+    SweepAxis,
 )
 from app.services import SimulationService
+from app.services.simulation_matrix import SimulationMatrix
+from app.services.simulation_session import SimulationSession
 
 
 class FakeRepository:
@@ -116,3 +129,309 @@ def test_simulation_compare_ranks_best_scenario() -> None:
     assert result.best_scenario == "Agressivo"
     assert result.items[0].rank == 1
     assert result.items[0].estimated_savings >= result.items[1].estimated_savings
+
+
+def test_simulation_applies_absolute_cut_after_percent_cuts() -> None:
+    service = SimulationService(FakeRepository())  # type: ignore[arg-type]
+    payload = SimulationRequest(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 1, 31),
+        center_cuts=[CutByCenter(cost_center_id=1, percent_cut=10, absolute_cut=100)],
+        category_cuts=[CutByCategory(category_id=1, percent_cut=20), CutByCategory(category_id=99, percent_cut=50)],
+    )
+
+    result = service.run(payload)
+
+    assert result.projected_total == 2320.0
+    assert [(item.entity_id, item.projected_amount) for item in result.center_impact_ranking] == [(1, 1520.0), (2, 800.0)]
+    assert [(item.entity_id, item.projected_amount) for item in result.category_impact_ranking] == [(1, 1475.56), (2, 844.44)]
+
+
+def test_simulation_compare_matches_individual_runs() -> None:
+    service = SimulationService(FakeRepository())  # type: ignore[arg-type]
+    scenarios = [
+        SimulationScenarioInput(
+            scenario_name="Absoluto",
+            center_cuts=[CutByCenter(cost_center_id=2, absolute_cut=250)],
+            category_cuts=[CutByCategory(category_id=2, percent_cut=30, absolute_cut=5000)],
+        ),
+        SimulationScenarioInput(
+            scenario_name="Percentual",
+            center_cuts=[CutByCenter(cost_center_id=1, percent_cut=12.5)],
+            category_cuts=[CutByCategory(category_id=1, percent_cut=7, absolute_cut=40)],
+        ),
+    ]
+
+    result = service.compare(
+        SimulationComparisonRequest(start_date=date(2025, 1, 1), end_date=date(2025, 1, 31), scenarios=scenarios)
+    )
+
+    for scenario in scenarios:
+        single = service.run(
+            SimulationRequest(
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 1, 31),
+                center_cuts=scenario.center_cuts,
+                category_cuts=scenario.category_cuts,
+            )
+        )
+        item = next(item for item in result.items if item.scenario_name == scenario.scenario_name)
+        assert item.projected_total == single.projected_total
+        assert item.estimated_savings == single.estimated_savings
+
+
+def test_simulation_matrix_round_trips_through_bytes() -> None:
+    matrix = SimulationMatrix.from_rows(FakeRepository().get_simulation_matrix(None))
+
+    restored = SimulationMatrix.from_bytes(matrix.to_bytes())
+
+    assert restored.center_names == matrix.center_names
+    assert restored.category_names == matrix.category_names
+    assert restored.center_ids.tolist() == [1, 2]
+    assert restored.center_index.tolist() == matrix.center_index.tolist()
+    assert restored.baseline.tolist() == matrix.baseline.tolist()
+    payload = SimulationRequest(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 1, 31),
+        category_cuts=[CutByCategory(category_id=2, percent_cut=25, absolute_cut=50)],
+    )
+    assert SimulationService().run(payload, restored) == SimulationService(FakeRepository()).run(payload)  # type: ignore[arg-type]
+
+
+def test_simulation_sweep_matches_individual_runs() -> None:
+    service = SimulationService(FakeRepository())  # type: ignore[arg-type]
+    payload = SimulationSweepRequest(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 1, 31),
+        center_cuts=[CutByCenter(cost_center_id=2, percent_cut=50, absolute_cut=100)],
+        axes=[
+            SweepAxis(target="cost_center", entity_ids=[1, 2], percent_from=0, percent_to=20, percent_step=10),
+            SweepAxis(target="category", entity_ids=[2], percent_from=5, percent_to=15, percent_step=5, label="Energia"),
+        ],
+    )
+
+    result = service.sweep(payload)
+
+    assert result.scenario_count == 9
+    assert result.axes == ["cost_center:1,2", "Energia"]
+    assert result.percent_cuts[0] == [0.0, 0.0, 0.0, 10.0, 10.0, 10.0, 20.0, 20.0, 20.0]
+    assert result.percent_cuts[1] == [5.0, 10.0, 15.0] * 3
+    for index, (center_percent, category_percent) in enumerate(zip(*result.percent_cuts)):
+        single = service.run(
+            SimulationRequest(
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 1, 31),
+                center_cuts=[
+                    CutByCenter(cost_center_id=1, percent_cut=center_percent),
+                    CutByCenter(cost_center_id=2, percent_cut=center_percent, absolute_cut=100),
+                ],
+                category_cuts=[CutByCategory(category_id=2, percent_cut=category_percent)],
+            )
+        )
+        assert result.projected_total[index] == single.projected_total
+        assert result.estimated_savings[index] == single.estimated_savings
+    assert result.best_scenario_index == 8
+
+
+def test_simulation_sweep_request_limits_grid_size() -> None:
+    with pytest.raises(ValidationError):
+        SimulationSweepRequest(
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 31),
+            axes=[
+                SweepAxis(target="cost_center", entity_ids=[1], percent_to=100, percent_step=0.5),
+                SweepAxis(target="category", entity_ids=[1], percent_to=100, percent_step=0.5),
+            ],
+        )
+
+
+def test_simulation_optimize_prefers_lowest_weighted_disruption() -> None:
+    service = SimulationService(FakeRepository())  # type: ignore[arg-type]
+    payload = SavingsTargetRequest(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 1, 31),
+        target_savings=300,
+        center_bounds=[CenterCutBound(cost_center_id=1, max_percent_cut=10)],
+        category_bounds=[CategoryCutBound(category_id=1, max_percent_cut=50, weight=4)],
+    )
+
+    result = service.optimize(payload)
+
+    assert [(cut.cost_center_id, cut.percent_cut) for cut in result.center_cuts] == [(1, 10.0)]
+    assert [(cut.category_id, cut.percent_cut) for cut in result.category_cuts] == [(1, 5.2632)]
+    assert result.target_met is True
+    assert result.estimated_savings == 300.0
+    assert result.disruption == 31.0528
+    check = service.run(
+        SimulationRequest(
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 31),
+            center_cuts=result.center_cuts,
+            category_cuts=result.category_cuts,
+        )
+    )
+    assert check.projected_total == result.projected_total
+
+
+def test_simulation_optimize_reports_unreachable_target() -> None:
+    service = SimulationService(FakeRepository())  # type: ignore[arg-type]
+    payload = SavingsTargetRequest(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 1, 31),
+        target_savings=5000,
+        default_center_max_percent=20,
+    )
+
+    result = service.optimize(payload)
+
+    assert result.target_met is False
+    assert [(cut.cost_center_id, cut.percent_cut) for cut in result.center_cuts] == [(1, 20.0), (2, 20.0)]
+    assert result.estimated_savings == 600.0
+
+
+def test_simulation_session_edits_match_full_runs() -> None:
+    repository = FakeRepository()
+    service = SimulationService(repository)  # type: ignore[arg-type]
+    matrix = SimulationMatrix.from_rows(repository.get_simulation_matrix(None))
+    start = SimulationRequest(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 1, 31),
+        center_cuts=[CutByCenter(cost_center_id=1, percent_cut=10, absolute_cut=100)],
+    )
+    session = service.start_session(start, matrix)
+    edits = [
+        ([], [CutByCategory(category_id=1, percent_cut=20)]),
+        ([CutByCenter(cost_center_id=2, percent_cut=5, absolute_cut=30)], []),
+        ([], [CutByCategory(category_id=2, absolute_cut=250)]),
+        ([CutByCenter(cost_center_id=1)], [CutByCategory(category_id=1, percent_cut=35)]),
+    ]
+
+    for center_cuts, category_cuts in edits:
+        changed_centers, changed_categories = session.apply(matrix, center_cuts, category_cuts)
+        current_centers, current_categories = session.cuts(matrix)
+        expected = service.run(
+            SimulationRequest(
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 1, 31),
+                center_cuts=current_centers,
+                category_cuts=current_categories,
+            )
+        )
+        described = service.describe_session("s1", session, matrix, top_n=1, changed=(changed_centers, changed_categories))
+        assert described.projected_total == expected.projected_total
+        assert described.center_impact_ranking == expected.center_impact_ranking[:1]
+        assert described.category_impact_ranking == expected.category_impact_ranking[:1]
+
+    assert [(cut.cost_center_id, cut.percent_cut) for cut in session.cuts(matrix)[0]] == [(2, 5.0)]
+    restored = SimulationSession.from_bytes(session.to_bytes())
+    assert restored.projected_total == session.projected_total
+    assert restored.refresh(matrix) is False
+
+
+def _grid_rows(centers: int, categories: int) -> list[dict]:
+    return [
+        {
+            "cost_center_id": center,
+            "cost_center_name": f"Centro {center}",
+            "category_id": category,
+            "category_name": f"Categoria {category}",
+            "total_amount": float((center * 7 + category * 3) % 11 * 100),
+        }
+        for center in range(1, centers + 1)
+        for category in range(1, categories + 1)
+    ]
+
+
+def test_simulation_session_edits_patch_rankings_and_bytes_incrementally() -> None:
+    matrix = SimulationMatrix.from_rows(_grid_rows(40, 12))
+    session = SimulationSession.start(matrix, date(2025, 1, 1), date(2025, 1, 31), [], [])
+    session.rankings(matrix)
+    edits = [
+        ([CutByCenter(cost_center_id=3, percent_cut=10)], []),
+        ([CutByCenter(cost_center_id=3), CutByCenter(cost_center_id=17, absolute_cut=200)], []),
+        ([], [CutByCategory(category_id=5, percent_cut=15)]),
+        ([CutByCenter(cost_center_id=40, percent_cut=100)], [CutByCategory(category_id=5)]),
+    ]
+
+    for center_cuts, category_cuts in edits:
+        previous = copy.copy(session)
+        previous_bytes = previous.to_bytes()
+        session.apply(matrix, center_cuts, category_cuts)
+
+        assert previous.to_bytes() == previous_bytes
+        patches = session.patches_since(previous)
+        assert patches is not None
+        patched = bytearray(previous_bytes)
+        for offset, chunk in patches:
+            patched[offset : offset + len(chunk)] = chunk
+        assert bytes(patched) == session.to_bytes()
+
+        center_ranking, category_ranking = session.rankings(matrix)
+        rebuilt = SimulationSession.from_bytes(session.to_bytes())
+        expected_center, expected_category = rebuilt.rankings(matrix)
+        assert center_ranking.order.tolist() == expected_center.order.tolist()
+        assert category_ranking.order.tolist() == expected_category.order.tolist()
+        assert session.projected_total == pytest.approx(float(session.center_weight @ session.center_sums))
+
+
+class LocalOnlyCache:
+    enabled = False
+
+
+def test_session_save_rejects_a_stale_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(routes_simulations, "cache", LocalOnlyCache())
+    matrix = SimulationMatrix.from_rows(_grid_rows(3, 2))
+    session = SimulationSession.start(matrix, date(2025, 1, 1), date(2025, 1, 31), [], [])
+
+    async def scenario() -> None:
+        assert await routes_simulations.save_session("s1", session, version=0)
+        loaded, version = await routes_simulations.load_session("s1")
+        first, second = copy.copy(loaded), copy.copy(loaded)
+        first.apply(matrix, [CutByCenter(cost_center_id=1, percent_cut=10)], [])
+        second.apply(matrix, [CutByCenter(cost_center_id=2, percent_cut=10)], [])
+
+        assert await routes_simulations.save_session("s1", first, version, loaded)
+        assert not await routes_simulations.save_session("s1", second, version, loaded)
+        current, current_version = await routes_simulations.load_session("s1")
+        assert current is first
+        assert current_version == version + 1
+        assert loaded.center_factor.tolist() == [1.0, 1.0, 1.0]
+
+    asyncio.run(scenario())
+
+
+class UnreachableRedis:
+    async def get(self, _key: str) -> None:
+        raise ConnectionError("redis down")
+
+    async def mget(self, _keys: list[str]) -> None:
+        raise ConnectionError("redis down")
+
+    async def eval(self, *_args: object) -> None:
+        raise ConnectionError("redis down")
+
+
+def test_sessions_fall_back_to_this_process_while_redis_is_down(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = UnreachableRedis()
+    settings = Settings(cache_enabled=True, cache_l1_enabled=False)
+    monkeypatch.setattr(routes_simulations, "cache", RedisCache(settings=settings, client=client, binary_client=client))
+    matrix = SimulationMatrix.from_rows(_grid_rows(3, 2))
+    session = SimulationSession.start(matrix, date(2025, 1, 1), date(2025, 1, 31), [], [])
+
+    async def scenario() -> None:
+        assert await routes_simulations.save_session("down", session, version=0)
+        loaded, version = await routes_simulations.load_session("down")
+        assert loaded is session
+        edited = copy.copy(loaded)
+        edited.apply(matrix, [CutByCenter(cost_center_id=1, percent_cut=10)], [])
+
+        assert await routes_simulations.save_session("down", edited, version, loaded)
+        assert not await routes_simulations.save_session("down", edited, version, loaded)
+        current, current_version = await routes_simulations.load_session("down")
+        assert current is edited
+        # Never equal to a version stored in Redis, so the copy is revalidated once Redis is back.
+        assert current_version < 0
+        with pytest.raises(ServiceUnavailableError):
+            await routes_simulations.load_session("elsewhere")
+
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+from app.api.uploads import run_with_request_body
+from app.core.exceptions import AppError, DomainValidationError
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+
+    @app.exception_handler(AppError)
+    async def app_error(_request, exc: AppError) -> JSONResponse:
+        return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
+
+    @app.post("/lines")
+    async def lines(request: Request) -> dict:
+        loop_thread = threading.get_ident()
+
+        def count(body) -> dict:
+            header = body.readline()
+            if header != b"amount\n":
+                raise DomainValidationError("bad header")
+            amounts = [int(line) for line in body]
+            return {"sum": sum(amounts), "rows": len(amounts), "off_loop": threading.get_ident() != loop_thread}
+
+        return await run_with_request_body(request, count, buffered_chunks=1)
+
+    return TestClient(app)
+
+
+def test_body_is_read_while_it_streams_in() -> None:
+    payload = b"amount\n" + b"".join(f"{value}\n".encode() for value in range(1000))
+    # Chunk boundaries fall inside lines.
+    chunks = [payload[start : start + 7] for start in range(0, len(payload), 7)]
+
+    response = _client().post("/lines", content=iter(chunks))
+
+    assert response.status_code == 200
+    assert response.json() == {"sum": sum(range(1000)), "rows": 1000, "off_loop": True}
+
+
+def test_early_failure_drops_the_rest_of_the_body() -> None:
+    response = _client().post("/lines", content=(b"nope\n" + b"1\n" * 1000 for _ in range(50)))
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": "bad header"}
+
+
+class DisconnectingRequest:
+    async def stream(self):
+        yield b"amount\n1\n12"
+        raise ClientDisconnect()
+
+
+def test_disconnect_raises_instead_of_ending_the_body() -> None:
+    seen: list[bytes] = []
+
+    def read_all(body) -> None:
+        seen.extend(body)
+
+    with pytest.raises(ClientDisconnect):
+        asyncio.run(run_with_request_body(DisconnectingRequest(), read_all, buffered_chunks=4))  # type: ignore[arg-type]
+    assert seen == [b"amount\n", b"1\n"]
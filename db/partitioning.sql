@@ -0,0 +1,125 @@
+-- Migração de cost_entries para particionamento declarativo mensal por reference_date.
+-- Execute após db/schema.sql em uma base existente:
+--   psql -h localhost -U cost_user -d costintel -v months_ahead=6 -f db/partitioning.sql
+-- A tabela original é preservada como cost_entries_legacy até a validação (ver db/PARTITIONING.md).
+
+\if :{?months_ahead}
+\else
+\set months_ahead 6
+\endif
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION ensure_cost_entry_partitions(p_from DATE, p_to DATE)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_month DATE := date_trunc('month', p_from)::date;
+    v_last DATE := date_trunc('month', p_to)::date;
+    v_name TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    WHILE v_month <= v_last LOOP
+        v_name := format('cost_entries_%s', to_char(v_month, 'YYYY_MM'));
+        IF to_regclass(v_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF cost_entries FOR VALUES FROM (%L) TO (%L)',
+                v_name,
+                v_month,
+                (v_month + interval '1 month')::date
+            );
+            v_created := v_created + 1;
+        END IF;
+        v_month := (v_month + interval '1 month')::date;
+    END LOOP;
+    RETURN v_created;
+END;
+$$;
+
+SELECT set_config('costintel.months_ahead', :'months_ahead', true);
+
+DO $$
+DECLARE
+    v_months_ahead INTEGER := current_setting('costintel.months_ahead')::int;
+    v_first DATE;
+    v_last DATE;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = 'cost_entries'
+    ) THEN
+        RAISE NOTICE 'cost_entries is already partitioned, only ensuring upcoming partitions';
+        PERFORM ensure_cost_entry_partitions(CURRENT_DATE, (CURRENT_DATE + make_interval(months => v_months_ahead))::date);
+        RETURN;
+    END IF;
+
+    LOCK TABLE cost_entries IN ACCESS EXCLUSIVE MODE;
+    ALTER TABLE cost_entries RENAME TO cost_entries_legacy;
+    ALTER INDEX IF EXISTS cost_entries_pkey RENAME TO cost_entries_legacy_pkey;
+    ALTER INDEX IF EXISTS idx_cost_entries_reference_date RENAME TO idx_cost_entries_legacy_reference_date;
+    ALTER INDEX IF EXISTS idx_cost_entries_reference_date_id RENAME TO idx_cost_entries_legacy_reference_date_id;
+    ALTER INDEX IF EXISTS idx_cost_entries_cost_center RENAME TO idx_cost_entries_legacy_cost_center;
+    ALTER INDEX IF EXISTS idx_cost_entries_project RENAME TO idx_cost_entries_legacy_project;
+    ALTER INDEX IF EXISTS idx_cost_entries_category RENAME TO idx_cost_entries_legacy_category;
+    ALTER INDEX IF EXISTS uq_cost_entries_content_hash RENAME TO uq_cost_entries_legacy_content_hash;
+
+    CREATE TABLE cost_entries (
+        id BIGINT NOT NULL DEFAULT nextval('cost_entries_id_seq'),
+        cost_center_id INTEGER NOT NULL REFERENCES cost_centers(id) ON DELETE RESTRICT,
+        project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE RESTRICT,
+        category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE RESTRICT,
+        reference_date DATE NOT NULL,
+        amount NUMERIC(14, 2) NOT NULL CHECK (amount >= 0),
+        currency CHAR(3) NOT NULL DEFAULT 'BRL',
+        description TEXT NULL,
+        content_hash CHAR(64) NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (id, reference_date)
+    ) PARTITION BY RANGE (reference_date);
+
+    ALTER SEQUENCE cost_entries_id_seq OWNED BY cost_entries.id;
+
+    -- Rede de segurança para datas sem partição; deve permanecer vazia (monitorar).
+    CREATE TABLE cost_entries_default PARTITION OF cost_entries DEFAULT;
+
+    -- Índices compostos liderados pela dimensão: o filtro de data é resolvido pelo pruning
+    -- e o restante do predicado usa o índice local de cada partição.
+    CREATE INDEX idx_cost_entries_reference_date_id ON cost_entries(reference_date, id);
+    CREATE INDEX idx_cost_entries_cost_center ON cost_entries(cost_center_id, reference_date);
+    CREATE INDEX idx_cost_entries_project ON cost_entries(project_id, reference_date);
+    CREATE INDEX idx_cost_entries_category ON cost_entries(category_id, reference_date);
+    -- Chave de idempotência da ingestão; precisa conter a chave de partição.
+    CREATE UNIQUE INDEX uq_cost_entries_content_hash ON cost_entries(content_hash, reference_date);
+
+    SELECT MIN(reference_date), MAX(reference_date) INTO v_first, v_last FROM cost_entries_legacy;
+    PERFORM ensure_cost_entry_partitions(
+        COALESCE(v_first, CURRENT_DATE),
+        (GREATEST(COALESCE(v_last, CURRENT_DATE), CURRENT_DATE) + make_interval(months => v_months_ahead))::date
+    );
+
+    INSERT INTO cost_entries (id, cost_center_id, project_id, category_id, reference_date, amount, currency, description, content_hash, created_at)
+    SELECT id, cost_center_id, project_id, category_id, reference_date, amount, currency, description, content_hash, created_at
+    FROM cost_entries_legacy;
+
+    -- Os triggers da rollup seguiram a tabela renomeada; recriados na nova depois da cópia, que
+    -- não altera nenhum mês.
+    DROP TRIGGER IF EXISTS trg_cost_entries_rollup_insert ON cost_entries_legacy;
+    DROP TRIGGER IF EXISTS trg_cost_entries_rollup_update ON cost_entries_legacy;
+    DROP TRIGGER IF EXISTS trg_cost_entries_rollup_delete ON cost_entries_legacy;
+    DROP TRIGGER IF EXISTS trg_cost_entries_rollup_truncate ON cost_entries_legacy;
+    CREATE TRIGGER trg_cost_entries_rollup_insert AFTER INSERT ON cost_entries
+        REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION mark_cost_rollup_dirty_months();
+    CREATE TRIGGER trg_cost_entries_rollup_update AFTER UPDATE ON cost_entries
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION mark_cost_rollup_dirty_months();
+    CREATE TRIGGER trg_cost_entries_rollup_delete AFTER DELETE ON cost_entries
+        REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION mark_cost_rollup_dirty_months();
+    CREATE TRIGGER trg_cost_entries_rollup_truncate AFTER TRUNCATE ON cost_entries
+        FOR EACH STATEMENT EXECUTE FUNCTION mark_cost_rollup_dirty_months();
+END;
+$$;
+
+COMMIT;
+
+ANALYZE cost_entries;
@@ -36,9 +36,71 @@ CREATE TABLE IF NOT EXISTS cost_entries (
     amount NUMERIC(14, 2) NOT NULL CHECK (amount >= 0),
     currency CHAR(3) NOT NULL DEFAULT 'BRL',
     description TEXT NULL,
+    content_hash CHAR(64) NULL,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+ALTER TABLE cost_entries ADD COLUMN IF NOT EXISTS content_hash CHAR(64) NULL;
+
+CREATE TABLE IF NOT EXISTS cost_monthly_rollup (
+    month DATE NOT NULL,
+    cost_center_id INTEGER NOT NULL REFERENCES cost_centers(id) ON DELETE RESTRICT,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE RESTRICT,
+    category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE RESTRICT,
+    currency CHAR(3) NOT NULL,
+    total_amount NUMERIC(16, 2) NOT NULL,
+    entry_count INTEGER NOT NULL,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (month, cost_center_id, project_id, category_id, currency),
+    CONSTRAINT cost_monthly_rollup_month_ck CHECK (month = date_trunc('month', month)::date)
+);
+
+-- Meses da rollup a reconstruir: preenchida por triggers em cost_entries (insert, update, delete e
+-- truncate) e esvaziada por `python -m app.db.refresh_rollup` ao reconstruir cada mês.
+CREATE TABLE IF NOT EXISTS cost_rollup_dirty_months (
+    month DATE PRIMARY KEY,
+    marked_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION mark_cost_rollup_dirty_months()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Triggers por comando com tabelas de transição: um único upsert por comando, inclusive em COPY.
+    IF TG_OP = 'TRUNCATE' THEN
+        INSERT INTO cost_rollup_dirty_months (month)
+        SELECT DISTINCT month FROM cost_monthly_rollup
+        ON CONFLICT (month) DO UPDATE SET marked_at = NOW();
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO cost_rollup_dirty_months (month)
+        SELECT DISTINCT date_trunc('month', reference_date)::date FROM new_rows
+        ON CONFLICT (month) DO UPDATE SET marked_at = NOW();
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO cost_rollup_dirty_months (month)
+        SELECT DISTINCT date_trunc('month', reference_date)::date FROM old_rows
+        ON CONFLICT (month) DO UPDATE SET marked_at = NOW();
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_cost_entries_rollup_insert ON cost_entries;
+CREATE TRIGGER trg_cost_entries_rollup_insert AFTER INSERT ON cost_entries
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION mark_cost_rollup_dirty_months();
+DROP TRIGGER IF EXISTS trg_cost_entries_rollup_update ON cost_entries;
+CREATE TRIGGER trg_cost_entries_rollup_update AFTER UPDATE ON cost_entries
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION mark_cost_rollup_dirty_months();
+DROP TRIGGER IF EXISTS trg_cost_entries_rollup_delete ON cost_entries;
+CREATE TRIGGER trg_cost_entries_rollup_delete AFTER DELETE ON cost_entries
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION mark_cost_rollup_dirty_months();
+DROP TRIGGER IF EXISTS trg_cost_entries_rollup_truncate ON cost_entries;
+CREATE TRIGGER trg_cost_entries_rollup_truncate AFTER TRUNCATE ON cost_entries
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_cost_rollup_dirty_months();
+
 CREATE TABLE IF NOT EXISTS budget_entries (
     id BIGSERIAL PRIMARY KEY,
     cost_center_id INTEGER NULL REFERENCES cost_centers(id) ON DELETE RESTRICT,
@@ -49,10 +111,14 @@ CREATE TABLE IF NOT EXISTS budget_entries (
     CONSTRAINT budget_scope_ck CHECK (cost_center_id IS NOT NULL OR project_id IS NOT NULL)
 );
 
-CREATE INDEX IF NOT EXISTS idx_cost_entries_reference_date ON cost_entries(reference_date);
+CREATE INDEX IF NOT EXISTS idx_cost_entries_reference_date_id ON cost_entries(reference_date, id);
+DROP INDEX IF EXISTS idx_cost_entries_reference_date;
 CREATE INDEX IF NOT EXISTS idx_cost_entries_cost_center ON cost_entries(cost_center_id);
 CREATE INDEX IF NOT EXISTS idx_cost_entries_project ON cost_entries(project_id);
 CREATE INDEX IF NOT EXISTS idx_cost_entries_category ON cost_entries(category_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_cost_entries_content_hash ON cost_entries(content_hash, reference_date);
+CREATE INDEX IF NOT EXISTS idx_cost_monthly_rollup_center ON cost_monthly_rollup(cost_center_id, month);
+CREATE INDEX IF NOT EXISTS idx_cost_monthly_rollup_category ON cost_monthly_rollup(category_id, month);
 CREATE INDEX IF NOT EXISTS idx_budget_entries_month_date ON budget_entries(month_date);
 
 COMMIT;
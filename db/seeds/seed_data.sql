@@ -1,5 +1,6 @@
 BEGIN;
 
+TRUNCATE TABLE cost_monthly_rollup;
 TRUNCATE TABLE budget_entries RESTART IDENTITY CASCADE;
 TRUNCATE TABLE cost_entries RESTART IDENTITY CASCADE;
 TRUNCATE TABLE categories RESTART IDENTITY CASCADE;
@@ -114,5 +115,16 @@ SELECT
 FROM months m
 CROSS JOIN cost_centers cc;
 
-COMMIT;
+INSERT INTO cost_monthly_rollup (month, cost_center_id, project_id, category_id, currency, total_amount, entry_count)
+SELECT
+    date_trunc('month', reference_date)::date,
+    cost_center_id,
+    project_id,
+    category_id,
+    currency,
+    SUM(amount),
+    COUNT(*)
+FROM cost_entries
+GROUP BY 1, 2, 3, 4, 5;
 
+COMMIT;